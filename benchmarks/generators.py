@@ -0,0 +1,86 @@
+import json
+import os
+import random
+import string
+import time
+import typing
+from dataclasses import dataclass, asdict
+
+from command_reminder.config.config import REPOSITORIES_DIR_NAME, MAIN_REPOSITORY_DIR_NAME, \
+    EXTERNAL_REPOSITORIES_DIR_NAME, COMMANDS_FILE_NAME, FISH_FUNCTIONS_DIR_NAME, CONFIG_FILE_NAME, FISH_HISTORY_DIR, \
+    FISH_HISTORY_FILE_NAME
+
+# generated files are dated back, as if the repositories had been pulled a while ago
+GENERATED_FILES_AGE_NS = 3600 * 10 ** 9
+
+
+@dataclass
+class LayoutParams:
+    commands_per_repo: int = 1000
+    external_repos: int = 10
+    tag_cardinality: int = 50
+    tags_per_command: int = 3
+    command_length: int = 60
+    history_entries: int = 10000
+    seed: int = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class Layout:
+    base_dir: str
+    home_dir: str
+    tags: typing.List[str]
+    history_lines: typing.List[str]
+
+
+# Generates a command-reminder directory (main repository, external repositories, fish history) of the given size,
+# the same one for the same parameters.
+def generate_layout(root_dir: str, params: LayoutParams) -> Layout:
+    rnd = random.Random(params.seed)
+    base_dir = os.path.join(root_dir, 'command-reminder')
+    home_dir = os.path.join(root_dir, 'home')
+    tags = [f'#tag{i}' for i in range(params.tag_cardinality)]
+
+    repositories_dir = os.path.join(base_dir, REPOSITORIES_DIR_NAME)
+    main_dir = os.path.join(repositories_dir, MAIN_REPOSITORY_DIR_NAME)
+    _write_repository(main_dir, 'main', rnd, tags, params)
+    with open(os.path.join(main_dir, CONFIG_FILE_NAME), 'w'):
+        pass
+    for i in range(params.external_repos):
+        external_dir = os.path.join(repositories_dir, EXTERNAL_REPOSITORIES_DIR_NAME, f'team_repo_{i}')
+        _write_repository(external_dir, f'ext{i}', rnd, tags, params)
+
+    history_dir = os.path.join(home_dir, FISH_HISTORY_DIR)
+    os.makedirs(history_dir)
+    history_lines = []
+    with open(os.path.join(history_dir, FISH_HISTORY_FILE_NAME), 'w') as f:
+        for i in range(params.history_entries):
+            command = _random_command(rnd, params.command_length)
+            f.write(f'- cmd: {command}\n  when: {1600000000 + i}\n')
+            history_lines.append(f'history_{i}: {command}\n')
+    return Layout(base_dir=base_dir, home_dir=home_dir, tags=tags, history_lines=history_lines)
+
+
+def _write_repository(repo_dir: str, prefix: str, rnd: random.Random, tags: typing.List[str],
+                      params: LayoutParams) -> None:
+    os.makedirs(os.path.join(repo_dir, FISH_FUNCTIONS_DIR_NAME))
+    tags_per_command = min(params.tags_per_command, len(tags))
+    commands = {}
+    for i in range(params.commands_per_repo):
+        commands[f'{prefix}_command_{i}'] = [_random_command(rnd, params.command_length),
+                                             rnd.sample(tags, tags_per_command)]
+    commands_file = os.path.join(repo_dir, COMMANDS_FILE_NAME)
+    with open(commands_file, 'w') as f:
+        json.dump(commands, f)
+    generated_at = time.time_ns() - GENERATED_FILES_AGE_NS
+    os.utime(commands_file, ns=(generated_at, generated_at))
+
+
+def _random_command(rnd: random.Random, length: int) -> str:
+    words = []
+    while sum(len(w) + 1 for w in words) < length:
+        words.append(''.join(rnd.choices(string.ascii_lowercase, k=rnd.randint(2, 10))))
+    return ' '.join(words)[:length]
@@ -0,0 +1,135 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+
+from benchmarks.generators import LayoutParams, Layout, generate_layout
+from command_reminder.cli.initializer import AppContext
+from command_reminder.cli.processors import Operations
+from command_reminder.config.config import COMMAND_REMINDER_DIR_ENV, HOME_DIR_ENV
+from command_reminder.operations.list_commands import ListOperationDto
+from command_reminder.operations.load_command import LoadCommandsListDto
+from command_reminder.operations.record_command import RecordCommandOperationDto
+from command_reminder.operations.remove_command import RemoveCommandDto
+
+STARTUP_SCRIPT = 'from command_reminder.cli.parser import parse_args; parse_args({args!r})'
+
+
+class Benchmarks:
+    def __init__(self, layout: Layout, repeat: int):
+        self._layout = layout
+        self._repeat = repeat
+        self._counter = 0
+
+    def run_all(self) -> typing.Dict[str, dict]:
+        layout = self._layout
+        return {
+            'list_cold_index': self._measure(lambda: self._process(Operations.LIST, ListOperationDto([], False)),
+                                             setup=self._remove_index),
+            'list': self._measure(lambda: self._process(Operations.LIST, ListOperationDto([], False))),
+            'list_by_tags': self._measure(
+                lambda: self._process(Operations.LIST, ListOperationDto(layout.tags[:2], False))),
+            'tags': self._measure(lambda: self._process(Operations.TAGS, None)),
+            'record': self._measure(lambda: self._process(Operations.RECORD, self._next_record())),
+            'remove': self._measure(lambda: self._process(Operations.REMOVE, RemoveCommandDto(self._last_name())),
+                                    setup=lambda: self._process(Operations.RECORD, self._next_record())),
+            'load': self._measure(
+                lambda: self._process(Operations.LOAD, LoadCommandsListDto(iter(layout.history_lines)))),
+            'cold_startup_list': self._measure(lambda: self._run_cli(['list'])),
+            'cold_startup_tags': self._measure(lambda: self._run_cli(['tags'])),
+        }
+
+    def _measure(self, action: typing.Callable[[], None],
+                 setup: typing.Optional[typing.Callable[[], None]] = None) -> dict:
+        samples = []
+        for _ in range(self._repeat):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            action()
+            samples.append(time.perf_counter() - start)
+        return {
+            'runs': len(samples),
+            'min': min(samples),
+            'median': statistics.median(samples),
+            'mean': statistics.mean(samples),
+            'max': max(samples),
+        }
+
+    @staticmethod
+    def _process(operation: str, data) -> None:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            AppContext().compound_processor.process(operation, data)
+
+    @staticmethod
+    def _run_cli(args: typing.List[str]) -> None:
+        subprocess.run([sys.executable, '-c', STARTUP_SCRIPT.format(args=args)], check=True,
+                       stdout=subprocess.DEVNULL)
+
+    def _remove_index(self) -> None:
+        shutil.rmtree(AppContext().config.index_dir, ignore_errors=True)
+
+    def _next_record(self) -> RecordCommandOperationDto:
+        self._counter += 1
+        return RecordCommandOperationDto(command=f'echo benchmark {self._counter}', name=self._last_name(),
+                                         tags=self._layout.tags[:1])
+
+    def _last_name(self) -> str:
+        return f'benchmark_command_{self._counter}'
+
+
+def compare(results: dict, baseline: dict) -> typing.List[str]:
+    lines = []
+    for (name, result) in results['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous:
+            change = (result['median'] - previous['median']) / previous['median'] * 100
+            lines.append(f'{name}: {previous["median"] * 1000:.2f}ms -> {result["median"] * 1000:.2f}ms '
+                         f'({change:+.1f}%)')
+    return lines
+
+
+def main(raw_args: typing.List[str]) -> None:
+    parser = argparse.ArgumentParser(description='Command Reminder benchmarks on synthetic repositories')
+    defaults = LayoutParams()
+    for (field, value) in defaults.to_dict().items():
+        parser.add_argument(f'--{field.replace("_", "-")}', type=int, default=value)
+    parser.add_argument('--repeat', type=int, default=5, help='Runs of every benchmark.')
+    parser.add_argument('--output', type=str, help='File to write JSON results to, stdout by default.')
+    parser.add_argument('--baseline', type=str, help='Previous JSON results to compare medians with.')
+    args = parser.parse_args(raw_args)
+    params = LayoutParams(**{field: getattr(args, field) for field in defaults.to_dict()})
+
+    with tempfile.TemporaryDirectory() as root_dir:
+        layout = generate_layout(root_dir, params)
+        os.environ[COMMAND_REMINDER_DIR_ENV] = layout.base_dir
+        os.environ[HOME_DIR_ENV] = layout.home_dir
+        results = {
+            'params': params.to_dict(),
+            'environment': {'python': platform.python_version(), 'platform': platform.platform()},
+            'timestamp': int(time.time()),
+            'results': Benchmarks(layout, args.repeat).run_all(),
+        }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    if args.baseline:
+        with open(args.baseline) as f:
+            for line in compare(results, json.load(f)):
+                print(line, file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
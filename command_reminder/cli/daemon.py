@@ -0,0 +1,67 @@
+import contextlib
+import io
+import json
+import os
+import socketserver
+import threading
+import typing
+
+from command_reminder.cli.daemon_client import request_daemon
+from command_reminder.exceptions import InvalidArgumentException
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        request = json.loads(self.rfile.readline())
+        response = self.server.daemon.handle(request)
+        self.wfile.write(json.dumps(response).encode() + b'\n')
+
+
+# Long-running process keeping the application context, and so the commands index, in memory.
+class CommandsDaemon:
+    def __init__(self, socket_path: str, handle_args: typing.Callable[[typing.List[str]], None]):
+        self._socket_path = socket_path
+        self._handle_args = handle_args
+        self._server: typing.Optional[socketserver.UnixStreamServer] = None
+        self.requests_served = 0
+
+    def serve(self) -> None:
+        self._remove_stale_socket()
+        with socketserver.UnixStreamServer(self._socket_path, _RequestHandler) as server:
+            server.daemon = self
+            self._server = server
+            try:
+                server.serve_forever()
+            finally:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self._socket_path)
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+
+    def handle(self, request: dict) -> dict:
+        if request.get('stop'):
+            threading.Thread(target=self.stop).start()
+            return {'output': 'Daemon stopped.\n', 'error': None}
+        if request.get('ping'):
+            return {'output': '', 'error': None}
+
+        output = io.StringIO()
+        error = None
+        try:
+            with contextlib.redirect_stdout(output):
+                self._handle_args(request['args'])
+        except SystemExit:
+            error = f'Invalid arguments: {" ".join(request["args"])}'
+        except Exception as e:
+            error = str(e)
+        self.requests_served += 1
+        return {'output': output.getvalue(), 'error': error}
+
+    def _remove_stale_socket(self) -> None:
+        if not os.path.exists(self._socket_path):
+            return
+        if request_daemon(self._socket_path, {'ping': True}) is not None:
+            raise InvalidArgumentException(f'Daemon is already running at {self._socket_path}')
+        os.remove(self._socket_path)
@@ -0,0 +1,36 @@
+import json
+import socket
+import typing
+
+from command_reminder.exceptions import InvalidArgumentException
+from command_reminder.operations.helpers.output import write_text
+
+DAEMON_RESPONSE_TIMEOUT_SECONDS = 30
+
+
+def request_daemon(socket_path: str, request: dict) -> typing.Optional[dict]:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.connect(socket_path)
+            s.settimeout(DAEMON_RESPONSE_TIMEOUT_SECONDS)
+            s.sendall(json.dumps(request).encode() + b'\n')
+            with s.makefile('rb') as f:
+                return json.loads(f.readline())
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None
+
+
+# Returns False when no daemon is running, so the caller can fall back to processing the command itself.
+def run_in_daemon(socket_path: str, raw_args: typing.List[str]) -> bool:
+    response = request_daemon(socket_path, {'args': raw_args})
+    if response is None:
+        return False
+    write_text(response['output'])
+    if response['error']:
+        raise InvalidArgumentException(response['error'])
+    return True
+
+
+def stop_daemon(socket_path: str) -> None:
+    if request_daemon(socket_path, {'stop': True}) is None:
+        print('Daemon is not running.')
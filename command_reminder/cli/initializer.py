@@ -1,40 +1,97 @@
-from command_reminder.cli.parser import Operations
-from command_reminder.cli.processors import CompoundProcessor
+from functools import cached_property
+
+from command_reminder.cli.processors import CompoundProcessor, Operations
 from command_reminder.config.config import Configuration
-from command_reminder.config.peristent_repository_config import PersistentConfig
-from command_reminder.operations.helpers.dir_viewer import DirectoriesViewer
-from command_reminder.operations.helpers.git import GitRepositoryManager
-from command_reminder.operations.init_repository import InitRepositoryProcessor
-from command_reminder.operations.list_commands import ListCommandsProcessor
-from command_reminder.operations.list_tags import TagsProcessor
-from command_reminder.operations.load_command import LoadCommandProcessor
-from command_reminder.operations.pull_external_repo import PullExternalRepoProcessor
-from command_reminder.operations.push_commands import PushCommandsToRepo
-from command_reminder.operations.record_command import RecordCommandProcessor
-from command_reminder.operations.remove_command import RemoveCommandProcessor
+from command_reminder.operations.base_processor import Processor
 
 
 class AppContext:
+    # Operation modules are imported only when their processor is first requested, so that short commands like
+    # `cr list` do not pay for importing yaml, giturlparse or subprocess.
     def __init__(self):
-        config = Configuration.load_config()
-        persistent_repo_config = PersistentConfig(config)
-        git_repository_manager = GitRepositoryManager()
-        dir_viewer = DirectoriesViewer(config)
-        init_processor = InitRepositoryProcessor(config, git_repository_manager, dir_viewer)
-        record_processor = RecordCommandProcessor(config)
-        list_processor = ListCommandsProcessor(config)
-        load_processor = LoadCommandProcessor(config)
-        tags_processor = TagsProcessor(config, dir_viewer)
-        remove_processor = RemoveCommandProcessor(config)
-        pull_processor = PullExternalRepoProcessor(config, persistent_repo_config, git_repository_manager)
-        push_processor = PushCommandsToRepo(config, git_repository_manager)
+        self.config = Configuration.load_config()
         self.compound_processor = CompoundProcessor([
-            (Operations.INIT, init_processor),
-            (Operations.RECORD, record_processor),
-            (Operations.LIST, list_processor),
-            (Operations.LOAD, load_processor),
-            (Operations.TAGS, tags_processor),
-            (Operations.REMOVE, remove_processor),
-            (Operations.PULL, pull_processor),
-            (Operations.PUSH, push_processor)
+            (Operations.INIT, self._init_processor),
+            (Operations.RECORD, self._record_processor),
+            (Operations.LIST, self._list_processor),
+            (Operations.LOAD, self._load_processor),
+            (Operations.TAGS, self._tags_processor),
+            (Operations.REMOVE, self._remove_processor),
+            (Operations.PULL, self._pull_processor),
+            (Operations.PUSH, self._push_processor),
+            (Operations.SUGGEST, self._suggest_processor),
+            (Operations.SEARCH, self._search_processor),
+            (Operations.SHOW, self._show_processor),
+            (Operations.RUN, self._show_processor)
         ])
+
+    @cached_property
+    def dir_viewer(self):
+        from command_reminder.operations.helpers.dir_viewer import DirectoriesViewer
+        return DirectoriesViewer(self.config)
+
+    @cached_property
+    def command_store(self):
+        from command_reminder.operations.helpers.store import open_main_store
+        return open_main_store(self.config)
+
+    @cached_property
+    def commands_index(self):
+        from command_reminder.operations.helpers.index import CommandsIndex
+        return CommandsIndex(self.config, self.dir_viewer, self.command_store)
+
+    @cached_property
+    def git_repository_manager(self):
+        from command_reminder.operations.helpers.git import GitRepositoryManager
+        return GitRepositoryManager()
+
+    @cached_property
+    def persistent_repo_config(self):
+        from command_reminder.config.peristent_repository_config import PersistentConfig
+        return PersistentConfig(self.config)
+
+    def _init_processor(self) -> Processor:
+        from command_reminder.operations.init_repository import InitRepositoryProcessor
+        return InitRepositoryProcessor(self.config, self.git_repository_manager, self.dir_viewer,
+                                       self.commands_index)
+
+    def _record_processor(self) -> Processor:
+        from command_reminder.operations.record_command import RecordCommandProcessor
+        return RecordCommandProcessor(self.config, self.command_store, self.commands_index)
+
+    def _list_processor(self) -> Processor:
+        from command_reminder.operations.list_commands import ListCommandsProcessor
+        return ListCommandsProcessor(self.config, self.commands_index)
+
+    def _load_processor(self) -> Processor:
+        from command_reminder.operations.load_command import LoadCommandProcessor
+        return LoadCommandProcessor(self.config, self.commands_index)
+
+    def _tags_processor(self) -> Processor:
+        from command_reminder.operations.list_tags import TagsProcessor
+        return TagsProcessor(self.config, self.commands_index)
+
+    def _remove_processor(self) -> Processor:
+        from command_reminder.operations.remove_command import RemoveCommandProcessor
+        return RemoveCommandProcessor(self.config, self.command_store, self.commands_index)
+
+    def _pull_processor(self) -> Processor:
+        from command_reminder.operations.pull_external_repo import PullExternalRepoProcessor
+        return PullExternalRepoProcessor(self.config, self.persistent_repo_config, self.git_repository_manager,
+                                         self.commands_index)
+
+    def _push_processor(self) -> Processor:
+        from command_reminder.operations.push_commands import PushCommandsToRepo
+        return PushCommandsToRepo(self.config, self.git_repository_manager, self.command_store)
+
+    def _suggest_processor(self) -> Processor:
+        from command_reminder.operations.suggest_commands import SuggestCommandsProcessor
+        return SuggestCommandsProcessor(self.config, self.commands_index)
+
+    def _search_processor(self) -> Processor:
+        from command_reminder.operations.search_commands import SearchCommandsProcessor
+        return SearchCommandsProcessor(self.config, self.commands_index)
+
+    def _show_processor(self) -> Processor:
+        from command_reminder.operations.show_command import ShowCommandProcessor
+        return ShowCommandProcessor(self.config, self.commands_index)
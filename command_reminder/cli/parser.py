@@ -1,89 +1,225 @@
+import os
 import re
 import sys
+import typing
 import argparse
 from argparse import ArgumentParser
 
+from command_reminder import tracing
 from command_reminder.cli.processors import Operations
+from command_reminder.common import TAGS_SPLITTER, normalize_command_name, split_tags
 from command_reminder.config.config import DEFAULT_REPOSITORY_DIR
+from command_reminder.operations.helpers.command_formats import IMPORT_FORMATS, LIST_FORMATS, TEXT_FORMAT
 
 from command_reminder.cli.initializer import AppContext
-from command_reminder.operations.init_repository import InitOperationDto
-from command_reminder.operations.list_commands import ListOperationDto
-from command_reminder.operations.load_command import LoadCommandsListDto
-from command_reminder.operations.pull_external_repo import PullExternalRepositoryDto
-from command_reminder.operations.record_command import RecordCommandOperationDto
-from command_reminder.operations.remove_command import RemoveCommandDto
 
-TAGS_SPLITTER = '[\\s,]+'
-NAME_REPLACER = '[\\s+-]'
+TAGS_ALTERNATIVE_JOINER = '\\s*\\|\\s*'
+DAEMON_OPERATIONS = [Operations.LIST, Operations.TAGS, Operations.RECORD, Operations.REMOVE, Operations.SEARCH,
+                     Operations.SHOW]
 
 
-def parse_args(raw_args) -> None:
-    app_context = AppContext()
+# `started_at` is given by the `cr` script, measured before anything got imported. Other callers, e.g. tests running
+# many commands in one process, have no imports of their own to report.
+def parse_args(raw_args, started_at: typing.Optional[float] = None) -> None:
     parser = define_parser()
     args = parser.parse_args(raw_args)
+    tracing.tracer.configure(to_stderr=args.timings, trace_file=os.getenv(tracing.TRACE_FILE_ENV),
+                             started_at=started_at)
+    if started_at is not None:
+        tracing.tracer.record('imports', started_at)
+    try:
+        if args.operation == Operations.INIT and args.emit_cached and _emit_cached_init_script(parser, args):
+            return
+        with tracing.span('app_context'):
+            app_context = AppContext()
+        if _is_served_by_daemon(app_context, args, raw_args):
+            return
+        dispatch(app_context, parser, args)
+    finally:
+        tracing.tracer.report()
+
+
+def dispatch(app_context: AppContext, parser: ArgumentParser, args: argparse.Namespace) -> None:
     operation = args.operation
 
+    # DTOs are imported per operation, so only the modules of the requested operation get loaded
     if operation == Operations.INIT:
-        app_context.compound_processor.process(operation, InitOperationDto(repo=args.repo))
+        from command_reminder.operations.init_repository import InitOperationDto
+        app_context.compound_processor.process(operation, InitOperationDto(repo=args.repo, bundle=args.bundle))
+    elif operation == Operations.RECORD and args.from_file:
+        from command_reminder.operations.record_command import ImportCommandsOperationDto
+        if args.name or args.command:
+            parser.error('--from-file cannot be combined with --name and --command')
+        app_context.compound_processor.process(operation, ImportCommandsOperationDto(
+            path=args.from_file, format=args.format))
     elif operation == Operations.RECORD:
+        from command_reminder.operations.record_command import RecordCommandOperationDto
+        if not args.name or not args.command:
+            parser.error('the following arguments are required: -n/--name, -c/--command')
         app_context.compound_processor.process(operation, RecordCommandOperationDto(
-            command=args.command, name=re.sub(NAME_REPLACER, '_', args.name), tags=re.split(TAGS_SPLITTER, args.tags)))
+            command=args.command, name=normalize_command_name(args.name), tags=split_tags(args.tags)))
     elif operation == Operations.LIST:
+        from command_reminder.operations.list_commands import ListOperationDto
         app_context.compound_processor.process(operation, ListOperationDto(
-            tags=re.split(TAGS_SPLITTER, args.tags) if args.tags else [], pretty=args.pretty))
+            tags=_parse_tags_query(args.tags),
+            pretty=args.pretty, limit=args.limit, offset=args.offset, format=args.format))
+    elif operation == Operations.LOAD and args.tags:
+        from command_reminder.operations.load_command import LoadTaggedCommandsDto
+        app_context.compound_processor.process(operation, LoadTaggedCommandsDto(
+            tags=_parse_tags_query(args.tags), window=args.window))
     elif operation == Operations.LOAD:
-        app_context.compound_processor.process(operation, LoadCommandsListDto(commands=sys.stdin.readlines()))
+        from command_reminder.operations.load_command import LoadCommandsListDto
+        app_context.compound_processor.process(operation, LoadCommandsListDto(
+            commands=sys.stdin, window=args.window, format=args.format))
     elif operation == Operations.TAGS:
         app_context.compound_processor.process(operation, None)
     elif operation == Operations.REMOVE:
+        from command_reminder.operations.remove_command import RemoveCommandDto
         app_context.compound_processor.process(operation, RemoveCommandDto(command_name=args.command))
     elif operation == Operations.PULL:
-        app_context.compound_processor.process(operation, PullExternalRepositoryDto(repo=args.repo, refresh_all=args.update_all))
+        from command_reminder.operations.pull_external_repo import PullExternalRepositoryDto
+        app_context.compound_processor.process(operation, PullExternalRepositoryDto(
+            repo=args.repo, refresh_all=args.update_all, jobs=args.jobs, timeout=args.timeout))
     elif operation == Operations.PUSH:
         app_context.compound_processor.process(operation, None)
+    elif operation == Operations.SUGGEST:
+        from command_reminder.operations.suggest_commands import SuggestCommandsDto
+        app_context.compound_processor.process(operation, SuggestCommandsDto(
+            limit=args.limit, min_count=args.min_count, tracked=args.tracked))
+    elif operation == Operations.SEARCH:
+        from command_reminder.operations.search_commands import SearchCommandsDto
+        app_context.compound_processor.process(operation, SearchCommandsDto(
+            query=' '.join(args.query), limit=args.limit))
+    elif operation == Operations.SHOW:
+        from command_reminder.operations.show_command import ShowCommandDto
+        app_context.compound_processor.process(operation, ShowCommandDto(name=args.name, repo=args.repo))
+    elif operation == Operations.RUN:
+        from command_reminder.operations.show_command import RunCommandDto
+        app_context.compound_processor.process(operation, RunCommandDto(name=args.name, repo=args.repo))
+    elif operation == Operations.DAEMON:
+        _run_daemon(app_context, args)
     else:
         parser.print_help()
 
 
+def _parse_tags_query(tags: str) -> typing.List[str]:
+    return re.split(TAGS_SPLITTER, re.sub(TAGS_ALTERNATIVE_JOINER, '|', tags)) if tags else []
+
+
+def _emit_cached_init_script(parser: ArgumentParser, args: argparse.Namespace) -> bool:
+    # runs before the app context is built, so a valid cache is printed without any further imports or writes
+    if args.repo:
+        parser.error('--emit-cached cannot be combined with --repo')
+    from command_reminder.config.config import Configuration
+    from command_reminder.operations.helpers.init_script import InitScriptCache
+    with tracing.span('init.read_cached_script'):
+        script = InitScriptCache(Configuration.load_config()).read(args.bundle)
+    if script is None:
+        return False
+    sys.stdout.write(script)
+    return True
+
+
+def _is_served_by_daemon(app_context: AppContext, args: argparse.Namespace, raw_args) -> bool:
+    if args.operation not in DAEMON_OPERATIONS or getattr(args, 'from_file', None):
+        return False
+    from command_reminder.cli.daemon_client import run_in_daemon
+    with tracing.span('daemon.request'):
+        return run_in_daemon(app_context.config.daemon_socket_file, raw_args)
+
+
+def _run_daemon(app_context: AppContext, args: argparse.Namespace) -> None:
+    if args.stop:
+        from command_reminder.cli.daemon_client import stop_daemon
+        stop_daemon(app_context.config.daemon_socket_file)
+        return
+    from command_reminder.cli.daemon import CommandsDaemon
+    parser = define_parser()
+    CommandsDaemon(app_context.config.daemon_socket_file,
+                   lambda raw_args: _dispatch_in_daemon(app_context, parser, raw_args)).serve()
+
+
+def _dispatch_in_daemon(app_context: AppContext, parser: ArgumentParser, raw_args) -> None:
+    # the client prints its own breakdown, the daemon only appends its spans to the trace file
+    args = parser.parse_args(raw_args)
+    tracing.tracer.configure(to_stderr=False, trace_file=os.getenv(tracing.TRACE_FILE_ENV))
+    try:
+        dispatch(app_context, parser, args)
+    finally:
+        tracing.tracer.report()
+
+
 def define_parser():
     parser = argparse.ArgumentParser(description='Command Reminder CLI')
+    parser.add_argument('--timings', action='store_true',
+                        help=f'Prints a breakdown of where the command spent its time to stderr. Set '
+                             f'{tracing.TRACE_FILE_ENV}=FILE to append the same spans as JSON lines to a file.')
     subparsers = parser.add_subparsers(help="Command Reminder command to execute", dest="operation")
     init_parser = subparsers.add_parser(Operations.INIT, description='Initializes command-reminder project')
     record_parser = subparsers.add_parser(Operations.RECORD, description='Adds command to registry')
     list_parser = subparsers.add_parser(Operations.LIST, description='Adds command to registry')
     remove_parser = subparsers.add_parser(Operations.REMOVE, description="Removes a command")
-    subparsers.add_parser(Operations.LOAD, description='Loads command to history')
+    load_parser = subparsers.add_parser(Operations.LOAD, description='Loads command to history')
     subparsers.add_parser(Operations.TAGS, description='Lists available tags')
     pull_subparser = subparsers.add_parser(Operations.PULL, description='Pulls external commands repository')
     subparsers.add_parser(Operations.PUSH, description='Pushes changes to main repository')
+    suggest_parser = subparsers.add_parser(Operations.SUGGEST, description='Suggests frequently used commands from '
+                                                                           'the fish history worth recording')
+    search_parser = subparsers.add_parser(Operations.SEARCH, description='Searches commands by a fragment of their '
+                                                                         'name or body')
+    show_parser = subparsers.add_parser(Operations.SHOW, description='Prints a command by its name')
+    run_parser = subparsers.add_parser(Operations.RUN, description='Runs a command by its name')
+    daemon_parser = subparsers.add_parser(Operations.DAEMON, description='Serves list, tags, record, rm, search and '
+                                                                         'show from memory over a local socket')
     _init_subparser(init_parser)
     _record_subparser(record_parser)
     _list_subparser(list_parser)
     _remove_subparser(remove_parser)
+    _load_subparser(load_parser)
     _pull_subparser(pull_subparser)
+    _suggest_subparser(suggest_parser)
+    _search_subparser(search_parser)
+    _named_command_subparser(show_parser)
+    _named_command_subparser(run_parser)
+    _daemon_subparser(daemon_parser)
     return parser
 
 
 def _init_subparser(parser: ArgumentParser) -> None:
     parser.add_argument('-r', '--repo', type=str, default='',
                         help=f'Repository to which save commands. If empty, default "~/{DEFAULT_REPOSITORY_DIR}" will be used')
+    parser.add_argument('-b', '--bundle', action='store_true',
+                        help='Sources one generated file with all functions per repository instead of adding the '
+                             'repositories\' fish directories to the function path.')
+    parser.add_argument('--emit-cached', action='store_true',
+                        help='Prints the script cached by the previous init when no repository changed since, '
+                             'otherwise initializes as usual.')
 
 
 def _record_subparser(parser: ArgumentParser) -> None:
     parser.add_argument('-n', '--name', type=str,
-                        help='Name of the command. It will be used to reference it during different operations.',
-                        required=True)
+                        help='Name of the command. It will be used to reference it during different operations.')
     parser.add_argument('-t', '--tags', type=str, default='',
                         help='Tags to search command for.')
     parser.add_argument('-c', '--command', type=str,
-                        help='Command to record', required=True)
+                        help='Command to record')
+    parser.add_argument('-f', '--from-file', type=str,
+                        help='Imports name/command/tags records from a file ("-" for stdin) in a single write.')
+    parser.add_argument('--format', type=str, choices=IMPORT_FORMATS,
+                        help='Format of the --from-file records. Detected from the file extension by default.')
 
 
 def _list_subparser(parser: ArgumentParser) -> None:
     parser.add_argument('-t', '--tags', type=str,
-                        help='Tags to search commands for.', default='')
+                        help='Tags to search commands for. Commands must have all tags separated by "," or spaces, '
+                             '"|" matches any of the alternatives and "!" excludes a tag, e.g. "#k8s,!#prod|#staging".',
+                        default='')
     parser.add_argument('-p', '--pretty', action='store_true')
+    parser.add_argument('-l', '--limit', type=int, help='Maximal number of listed commands.')
+    parser.add_argument('-o', '--offset', type=int, default=0, help='Skips that many first matching commands.')
+    parser.add_argument('-f', '--format', type=str, choices=LIST_FORMATS, default=TEXT_FORMAT,
+                        help='Output format. json, jsonl, tsv and nul include tags and the repository, nul separates '
+                             'tab separated records with NUL characters, e.g. for `fzf --read0`.')
 
 
 def _remove_subparser(parser: ArgumentParser) -> None:
@@ -91,11 +227,53 @@ def _remove_subparser(parser: ArgumentParser) -> None:
                         help='Command name to remove.', required=True)
 
 
+def _load_subparser(parser: ArgumentParser) -> None:
+    parser.add_argument('-w', '--window', type=int, default=1000,
+                        help='Skips commands found among that many most recent history items, 0 disables it.')
+    parser.add_argument('-f', '--format', type=str, choices=LIST_FORMATS,
+                        help='Format of the commands read from stdin, as written by `cr list`. Detected when not given.')
+    parser.add_argument('-t', '--tags', type=str, default='',
+                        help='Loads commands with the given tags straight from the repositories instead of stdin, '
+                             'with the same syntax as `cr list --tags`.')
+
+
 def _pull_subparser(parser: ArgumentParser) -> None:
     parser.add_argument('-r', '--repo', type=str,
                         help='Pulls external commands repository.', required=False)
     parser.add_argument('-ua', '--update_all',
                         help='Refreshes all external repositories,', action='store_true')
+    parser.add_argument('-j', '--jobs', type=int, default=4,
+                        help='Number of external repositories refreshed in parallel.')
+    parser.add_argument('--timeout', type=float, default=300,
+                        help='Seconds after which refreshing a single repository is abandoned.')
+
+
+def _suggest_subparser(parser: ArgumentParser) -> None:
+    parser.add_argument('-l', '--limit', type=int, default=10,
+                        help='Maximal number of suggested commands.')
+    parser.add_argument('-m', '--min-count', type=int, default=3,
+                        help='Suggests only commands used at least that many times.')
+    parser.add_argument('--tracked', type=int, default=10000,
+                        help='Number of distinct commands counted at once. Bounds memory used for large histories, '
+                             'counts of rarely used commands become approximate.')
+
+
+def _search_subparser(parser: ArgumentParser) -> None:
+    parser.add_argument('query', type=str, nargs='+',
+                        help='Text to look for. Best matches come first, commands with a few typos are found too.')
+    parser.add_argument('-l', '--limit', type=int, default=10,
+                        help='Maximal number of found commands.')
+
+
+def _named_command_subparser(parser: ArgumentParser) -> None:
+    parser.add_argument('name', type=str, help='Command name.')
+    parser.add_argument('-r', '--repo', type=str,
+                        help='Repository directory to take the command from, e.g. "main". By default the main '
+                             'repository takes precedence over the external ones, which are tried alphabetically.')
+
+
+def _daemon_subparser(parser: ArgumentParser) -> None:
+    parser.add_argument('--stop', help='Stops the running daemon.', action='store_true')
 
 
 if __name__ == '__main__':
@@ -1,5 +1,6 @@
 import typing
 
+from command_reminder.tracing import span
 from command_reminder.operations.base_processor import Processor, OperationData
 
 
@@ -12,11 +13,29 @@ class Operations:
     REMOVE = 'rm'
     PULL = 'pull'
     PUSH = 'push'
+    DAEMON = 'daemon'
+    SUGGEST = 'suggest'
+    SEARCH = 'search'
+    SHOW = 'show'
+    RUN = 'run'
+
+
+ProcessorFactory = typing.Callable[[], Processor]
 
 
 class CompoundProcessor:
-    def __init__(self, processors: typing.List[typing.Tuple[str, Processor]]):
-        self.processors = dict(processors)
+    def __init__(self, factories: typing.List[typing.Tuple[str, ProcessorFactory]]):
+        self._factories = dict(factories)
+        self.processors: typing.Dict[str, Processor] = {}
 
     def process(self, operation_name: str, data: OperationData) -> None:
-        self.processors[operation_name].process(data)
+        with span(f'process.{operation_name}'):
+            self._get_processor(operation_name).process(data)
+
+    def _get_processor(self, operation_name: str) -> Processor:
+        processor = self.processors.get(operation_name)
+        if processor is None:
+            with span('build_processor'):
+                processor = self._factories[operation_name]()
+            self.processors[operation_name] = processor
+        return processor
@@ -1,11 +1,24 @@
 import os
+import re
+import typing
 from datetime import datetime
 
+TAGS_SPLITTER = '[\\s,]+'
+NAME_REPLACER = '[\\s+-]'
+
 
 def get_timestamp() -> int:
     return int(datetime.now().timestamp())
 
 
+def normalize_command_name(name: str) -> str:
+    return re.sub(NAME_REPLACER, '_', name)
+
+
+def split_tags(tags: str) -> typing.List[str]:
+    return re.split(TAGS_SPLITTER, tags)
+
+
 class FilesMixin(object):
     @staticmethod
     def _create_dir(path: str) -> None:
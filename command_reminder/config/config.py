@@ -5,18 +5,39 @@ from command_reminder.exceptions import InvalidArgumentException
 
 COMMAND_REMINDER_DIR_ENV = "COMMAND_REMINDER_DIR"
 FISH_FUNCTIONS_PATH_ENV = 'fish_function_path'
+FISH_COMPLETE_PATH_ENV = 'fish_complete_path'
 HOME_DIR_ENV = "HOME"
+COMMAND_STORE_ENV = 'COMMAND_REMINDER_STORE'
 
 DEFAULT_REPOSITORY_DIR = '.command-reminder'
 REPOSITORIES_DIR_NAME = 'repositories'
 MAIN_REPOSITORY_DIR_NAME = 'main'
 EXTERNAL_REPOSITORIES_DIR_NAME = 'external'
 COMMANDS_FILE_NAME = 'commands.json'
+COMMANDS_JOURNAL_FILE_NAME = 'commands.journal'
+COMMANDS_LOCK_FILE_NAME = '.commands.lock'
 FISH_FUNCTIONS_DIR_NAME = 'fish'
+FISH_FUNCTION_EXTENSION = '.fish'
+FISH_COMPLETIONS_DIR_NAME = 'completions'
+FISH_COMPLETIONS_FILE_NAME = 'cr.fish'
+FISH_COMPLETION_NAMES_DIR_NAME = 'names'
+FISH_COMPLETION_TAGS_FILE_NAME = 'tags'
+FISH_COMPLETION_STATE_FILE_NAME = 'names.json'
 FISH_HISTORY_DIR = '.local/share/fish'
 FISH_HISTORY_FILE_NAME = 'fish_history'
 HISTORY_LOAD_FILE_NAME = 'h.fish'
 CONFIG_FILE_NAME = 'config.yaml'
+INDEX_DIR_NAME = 'index'
+INDEX_MANIFEST_FILE_NAME = 'manifest.json'
+INDEX_SHARDS_DIR_NAME = 'shards'
+SEARCH_INDEX_DIR_NAME = 'trigrams'
+NAME_INDEX_FILE_NAME = 'names.json'
+HISTORY_INDEX_FILE_NAME = 'history.json'
+BUNDLES_DIR_NAME = 'bundles'
+INIT_SCRIPT_CACHE_FILE_NAME = 'init.fish'
+EXTERNAL_HEADS_FILE_NAME = 'external_heads.json'
+SQLITE_STORE_FILE_NAME = 'commands.sqlite'
+DAEMON_SOCKET_FILE_NAME = 'daemon.sock'
 
 
 @dataclass
@@ -53,10 +74,74 @@ class Configuration:
     def main_repository_fish_functions(self) -> str:
         return os.path.join(self.main_repository_dir, FISH_FUNCTIONS_DIR_NAME)
 
+    @property
+    def main_repository_fish_completions(self) -> str:
+        return os.path.join(self.main_repository_fish_functions, FISH_COMPLETIONS_DIR_NAME)
+
+    @property
+    def fish_completions_file(self) -> str:
+        return os.path.join(self.main_repository_fish_completions, FISH_COMPLETIONS_FILE_NAME)
+
+    @property
+    def fish_completion_names_dir(self) -> str:
+        return os.path.join(self.main_repository_fish_completions, FISH_COMPLETION_NAMES_DIR_NAME)
+
+    @property
+    def fish_completion_tags_file(self) -> str:
+        return os.path.join(self.main_repository_fish_completions, FISH_COMPLETION_TAGS_FILE_NAME)
+
+    @property
+    def fish_completion_state_file(self) -> str:
+        return os.path.join(self.main_repository_fish_completions, FISH_COMPLETION_STATE_FILE_NAME)
+
     @property
     def config_file(self) -> str:
         return os.path.join(self.base_dir, self.main_repository_dir, CONFIG_FILE_NAME)
 
+    @property
+    def index_dir(self) -> str:
+        return os.path.join(self.base_dir, INDEX_DIR_NAME)
+
+    @property
+    def index_manifest_file(self) -> str:
+        return os.path.join(self.index_dir, INDEX_MANIFEST_FILE_NAME)
+
+    @property
+    def index_shards_dir(self) -> str:
+        return os.path.join(self.index_dir, INDEX_SHARDS_DIR_NAME)
+
+    @property
+    def name_index_file(self) -> str:
+        return os.path.join(self.index_dir, NAME_INDEX_FILE_NAME)
+
+    @property
+    def search_index_dir(self) -> str:
+        return os.path.join(self.index_dir, SEARCH_INDEX_DIR_NAME)
+
+    @property
+    def history_index_file(self) -> str:
+        return os.path.join(self.index_dir, HISTORY_INDEX_FILE_NAME)
+
+    @property
+    def init_script_cache_file(self) -> str:
+        return os.path.join(self.index_dir, INIT_SCRIPT_CACHE_FILE_NAME)
+
+    @property
+    def external_heads_file(self) -> str:
+        return os.path.join(self.index_dir, EXTERNAL_HEADS_FILE_NAME)
+
+    @property
+    def sqlite_store_file(self) -> str:
+        return os.path.join(self.base_dir, SQLITE_STORE_FILE_NAME)
+
+    @property
+    def bundles_dir(self) -> str:
+        return os.path.join(self.base_dir, BUNDLES_DIR_NAME)
+
+    @property
+    def daemon_socket_file(self) -> str:
+        return os.path.join(self.base_dir, DAEMON_SOCKET_FILE_NAME)
+
     @property
     def fish_history_file(self) -> str:
         home = os.getenv(HOME_DIR_ENV)
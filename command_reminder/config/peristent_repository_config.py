@@ -1,3 +1,5 @@
+import os
+
 import yaml
 from command_reminder.config.config import Configuration
 
@@ -7,11 +9,12 @@ from command_reminder.common import FilesMixin
 class PersistentConfig(FilesMixin):
     def __init__(self, config: Configuration):
         self._config = config
+        self._external_repositories_cache = None
 
     def save_external_repo(self, repo: str):
         with open(self._config.config_file, 'r+') as f:
             data = f.read()
-            parsed_data = yaml.compose(data)
+            parsed_data = yaml.safe_load(data)
             if not parsed_data:
                 parsed_data = self._get_initial_config_content()
             external_repos = set(parsed_data['repositories']['external'])
@@ -21,14 +24,20 @@ class PersistentConfig(FilesMixin):
             f.seek(0)
             f.write(output)
             f.truncate()
+        self._external_repositories_cache = None
 
     def get_external_repositories(self):
+        mtime = os.stat(self._config.config_file).st_mtime_ns
+        if self._external_repositories_cache and self._external_repositories_cache[0] == mtime:
+            return self._external_repositories_cache[1]
+        repositories = []
         with open(self._config.config_file, 'r') as f:
             data = f.read()
             parsed_data = yaml.safe_load(data)
             if parsed_data:
-                return parsed_data['repositories']['external']
-        return []
+                repositories = parsed_data['repositories']['external']
+        self._external_repositories_cache = (mtime, repositories)
+        return repositories
 
     @staticmethod
     def _get_initial_config_content():
@@ -1,2 +1,6 @@
 class InvalidArgumentException(ValueError):
-    pass
\ No newline at end of file
+    pass
+
+
+class RefreshFailedException(RuntimeError):
+    pass
@@ -1,7 +1,5 @@
 from abc import ABC, abstractmethod
 
-from termcolor import colored
-
 from command_reminder.common import FilesMixin
 
 
@@ -15,4 +13,5 @@ class Processor(ABC, FilesMixin):
 
     @staticmethod
     def _print_colored(text):
+        from termcolor import colored
         print(colored(text, 'blue'))
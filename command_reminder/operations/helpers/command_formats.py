@@ -0,0 +1,155 @@
+import itertools
+import json
+import os
+import re
+import typing
+
+from command_reminder.exceptions import InvalidArgumentException
+
+TEXT_FORMAT = 'text'
+JSON_FORMAT = 'json'
+JSONL_FORMAT = 'jsonl'
+YAML_FORMAT = 'yaml'
+TSV_FORMAT = 'tsv'
+NUL_FORMAT = 'nul'
+IMPORT_FORMATS = [JSONL_FORMAT, YAML_FORMAT, TSV_FORMAT]
+# formats written by `cr list` and read back by `cr load`
+LIST_FORMATS = [TEXT_FORMAT, JSON_FORMAT, JSONL_FORMAT, TSV_FORMAT, NUL_FORMAT]
+FORMAT_EXTENSIONS = {
+    '.jsonl': JSONL_FORMAT,
+    '.ndjson': JSONL_FORMAT,
+    '.yaml': YAML_FORMAT,
+    '.yml': YAML_FORMAT,
+    '.tsv': TSV_FORMAT,
+}
+TSV_SEPARATOR = '\t'
+NUL_SEPARATOR = '\0'
+TSV_TAGS_SEPARATOR = ','
+# a line written by `cr list` in the text format
+TEXT_LINE_REGEX = re.compile("[\\w+-]+: (.+)")
+# name, command, tags and optionally the repository
+TSV_FIELDS_COUNTS = (3, 4)
+
+RawRecord = typing.Tuple[str, typing.Any]
+
+
+def detect_format(path: str) -> str:
+    (_, extension) = os.path.splitext(path)
+    if extension.lower() not in FORMAT_EXTENSIONS:
+        raise InvalidArgumentException(
+            f'Cannot detect format of {path}, use --format with one of: {", ".join(IMPORT_FORMATS)}.')
+    return FORMAT_EXTENSIONS[extension.lower()]
+
+
+# Tells the list formats apart by the first line of the input. Returns the input again, with that line put back.
+def detect_list_format(source: typing.Iterable[str]) -> typing.Tuple[str, typing.Iterable[str]]:
+    lines = iter(source)
+    first_line = next(lines, '')
+    source = itertools.chain([first_line], lines)
+    stripped = first_line.strip()
+    if NUL_SEPARATOR in first_line:
+        return NUL_FORMAT, source
+    if stripped.startswith('['):
+        return JSON_FORMAT, source
+    if stripped.startswith('{'):
+        return JSONL_FORMAT, source
+    # a tab may as well be part of a command listed in the text format
+    if not TEXT_LINE_REGEX.match(stripped) and \
+            len(first_line.rstrip('\r\n').split(TSV_SEPARATOR)) in TSV_FIELDS_COUNTS:
+        return TSV_FORMAT, source
+    return TEXT_FORMAT, source
+
+
+# Yields raw records, each with its location in the source used in validation messages.
+def read_command_records(source: typing.Iterable[str], fmt: str) -> typing.Iterator[RawRecord]:
+    if fmt == JSONL_FORMAT:
+        yield from _read_jsonl(source)
+    elif fmt == JSON_FORMAT:
+        yield from _read_json(source)
+    elif fmt == YAML_FORMAT:
+        yield from _read_yaml(source)
+    elif fmt == TSV_FORMAT:
+        yield from _read_tsv(source)
+    elif fmt == NUL_FORMAT:
+        yield from _read_tsv(_split_nul(source), location='record')
+    else:
+        raise InvalidArgumentException(f'Unsupported format {fmt}.')
+
+
+# Formats records with name, command, tags and repo. A command containing a newline is only preserved by json, jsonl
+# and nul, the latter being tsv fields with records terminated by NUL instead of a newline.
+def format_command_records(records: typing.Iterable[dict], fmt: str) -> typing.Iterator[str]:
+    if fmt == JSONL_FORMAT:
+        return (json.dumps(r) for r in records)
+    if fmt == JSON_FORMAT:
+        return _json_array_lines(records)
+    if fmt in (TSV_FORMAT, NUL_FORMAT):
+        return (TSV_SEPARATOR.join([r['name'], r['command'], TSV_TAGS_SEPARATOR.join(r['tags']), r['repo']])
+                for r in records)
+    raise InvalidArgumentException(f'Unsupported format {fmt}.')
+
+
+def _json_array_lines(records: typing.Iterable[dict]) -> typing.Iterator[str]:
+    # one element per line, each but the last followed by a comma, so the array is still written as it is produced
+    yield '['
+    previous = None
+    for r in records:
+        if previous is not None:
+            yield previous + ','
+        previous = '  ' + json.dumps(r)
+    if previous is not None:
+        yield previous
+    yield ']'
+
+
+def _read_jsonl(source: typing.Iterable[str]) -> typing.Iterator[RawRecord]:
+    for (number, line) in enumerate(source, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise InvalidArgumentException(f'line {number}: invalid JSON: {e}')
+        yield f'line {number}', record
+
+
+def _read_json(source: typing.Iterable[str]) -> typing.Iterator[RawRecord]:
+    try:
+        items = json.loads(''.join(source) or '[]')
+    except ValueError as e:
+        raise InvalidArgumentException(f'Invalid JSON: {e}')
+    if not isinstance(items, list):
+        raise InvalidArgumentException('JSON document must be a list of commands.')
+    for (number, item) in enumerate(items, start=1):
+        yield f'item {number}', item
+
+
+def _read_yaml(source: typing.Iterable[str]) -> typing.Iterator[RawRecord]:
+    import yaml
+    try:
+        items = yaml.safe_load(source) or []
+    except yaml.YAMLError as e:
+        raise InvalidArgumentException(f'Invalid YAML: {e}')
+    if not isinstance(items, list):
+        raise InvalidArgumentException('YAML document must be a list of commands.')
+    for (number, item) in enumerate(items, start=1):
+        yield f'item {number}', item
+
+
+def _read_tsv(source: typing.Iterable[str], location: str = 'line') -> typing.Iterator[RawRecord]:
+    for (number, line) in enumerate(source, start=1):
+        line = line.rstrip('\r\n')
+        if not line.strip():
+            continue
+        # the optional fourth field is the repository written by `cr list`
+        fields = line.split(TSV_SEPARATOR, 3)
+        yield f'{location} {number}', dict(zip(('name', 'command', 'tags', 'repo'), fields))
+
+
+def _split_nul(source: typing.Iterable[str]) -> typing.Iterator[str]:
+    pending = ''
+    for chunk in source:
+        (*records, pending) = (pending + chunk).split(NUL_SEPARATOR)
+        yield from records
+    if pending.strip():
+        yield pending
@@ -1,7 +1,19 @@
 import json
+import os
 import typing
 
 
+FileFingerprint = typing.Optional[typing.List[int]]
+
+
+def file_fingerprint(path: str) -> FileFingerprint:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size, stat.st_ino]
+
+
 def read_file_content(f) -> typing.Dict[str, typing.List[typing.List[str]]]:
     s = f.read()
     if not s:
@@ -9,3 +21,16 @@ def read_file_content(f) -> typing.Dict[str, typing.List[typing.List[str]]]:
     else:
         commands = json.loads(s)
     return commands
+
+
+def atomic_write(path: str, content: str) -> None:
+    # readers see either the previous or the new content, never a partially written file
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
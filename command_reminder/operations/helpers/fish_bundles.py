@@ -0,0 +1,85 @@
+import os
+import typing
+
+from command_reminder.common import FilesMixin
+from command_reminder.config.config import Configuration, FISH_FUNCTIONS_DIR_NAME, FISH_FUNCTION_EXTENSION
+from command_reminder.operations.helpers.files import atomic_write
+from command_reminder.operations.helpers.fish_functions import fish_function
+from command_reminder.operations.helpers.index import CommandsIndex, IndexedRepository
+from command_reminder.operations.helpers.tag_query import TagQuery
+
+BUNDLE_HEADER_PREFIX = '# command-reminder bundle '
+BUNDLE_EXTENSION = '.fish'
+
+
+# One generated fish file per repository with its commands' and hand-written functions, sourced at startup.
+class FishBundles(FilesMixin):
+    def __init__(self, config: Configuration, index: CommandsIndex):
+        self._config = config
+        self._index = index
+
+    def bundle_files(self) -> typing.List[str]:
+        self._create_dir(self._config.bundles_dir)
+        bundles = []
+        for repo in self._index.repositories():
+            bundle_file = os.path.join(self._config.bundles_dir, self._bundle_name(repo))
+            fingerprint = self._fingerprint(repo)
+            if self._read_fingerprint(bundle_file) != fingerprint:
+                self._write_bundle(bundle_file, fingerprint, repo)
+            bundles.append(bundle_file)
+        self._remove_stale_bundles(bundles)
+        return bundles
+
+    def _write_bundle(self, bundle_file: str, fingerprint: str, repo: IndexedRepository) -> None:
+        names = set()
+        parts = [BUNDLE_HEADER_PREFIX + fingerprint]
+        for (name, command, _) in self._index.find(repo, TagQuery.parse([])):
+            names.add(name)
+            parts.append(fish_function(name, command))
+        fish_dir = os.path.join(repo.repo_dir, FISH_FUNCTIONS_DIR_NAME)
+        for file_name in sorted(self._list_dir(fish_dir)):
+            (name, extension) = os.path.splitext(file_name)
+            if extension == BUNDLE_EXTENSION and name not in names:
+                with open(os.path.join(fish_dir, file_name), 'r') as f:
+                    parts.append(f.read())
+        atomic_write(bundle_file, '\n'.join(parts) + '\n')
+
+    def _remove_stale_bundles(self, bundles: typing.List[str]) -> None:
+        current = {os.path.basename(b) for b in bundles}
+        for file_name in self._list_dir(self._config.bundles_dir):
+            if file_name not in current:
+                os.remove(os.path.join(self._config.bundles_dir, file_name))
+
+    @staticmethod
+    def _bundle_name(repo: IndexedRepository) -> str:
+        return os.path.splitext(os.path.basename(repo.shard_file))[0] + BUNDLE_EXTENSION
+
+    @staticmethod
+    def _fingerprint(repo: IndexedRepository) -> str:
+        # adding or removing a hand-written function changes the directory's mtime, editing one in place only its own
+        fish_dir = os.path.join(repo.repo_dir, FISH_FUNCTIONS_DIR_NAME)
+        try:
+            fish_dir_mtime = os.stat(fish_dir).st_mtime_ns
+            with os.scandir(fish_dir) as entries:
+                stats = [e.stat() for e in entries if e.name.endswith(FISH_FUNCTION_EXTENSION) and e.is_file()]
+        except FileNotFoundError:
+            (fish_dir_mtime, stats) = (0, [])
+        files_mtime = max((s.st_mtime_ns for s in stats), default=0)
+        files_size = sum(s.st_size for s in stats)
+        return f'{repo.indexed_at}:{fish_dir_mtime}:{files_mtime}:{files_size}'
+
+    @staticmethod
+    def _read_fingerprint(bundle_file: str) -> typing.Optional[str]:
+        try:
+            with open(bundle_file, 'r') as f:
+                header = f.readline().rstrip('\n')
+        except FileNotFoundError:
+            return None
+        return header[len(BUNDLE_HEADER_PREFIX):] if header.startswith(BUNDLE_HEADER_PREFIX) else None
+
+    @staticmethod
+    def _list_dir(directory: str) -> typing.List[str]:
+        try:
+            return os.listdir(directory)
+        except FileNotFoundError:
+            return []
@@ -0,0 +1,129 @@
+import json
+import os
+import typing
+
+from command_reminder.cli.processors import Operations
+from command_reminder.common import FilesMixin
+from command_reminder.config.config import Configuration
+from command_reminder.operations.helpers.files import atomic_write
+from command_reminder.operations.helpers.index import CommandsIndex, IndexedRepository
+from command_reminder.operations.helpers.store import StoredCommand
+from command_reminder.operations.helpers.tag_query import TagQuery
+
+COMPLETED_PROGRAM = 'cr'
+SUBCOMMANDS = [value for (key, value) in vars(Operations).items() if key.isupper()]
+# subcommands completing commands' names and tags, with the option taking them
+NAME_OPTIONS = {Operations.REMOVE: ('c', 'command')}
+# subcommands taking a name of a command from any repository as their argument
+NAME_ARGUMENT_SUBCOMMANDS = [Operations.SHOW, Operations.RUN]
+TAG_OPTIONS = {Operations.LIST: ('t', 'tags'), Operations.LOAD: ('t', 'tags'), Operations.RECORD: ('t', 'tags')}
+DESCRIPTION_MAX_LENGTH = 50
+
+
+# Fish completions of `cr` reading names and tags at TAB time from plain files, one names file per repository.
+class FishCompletions(FilesMixin):
+    def __init__(self, config: Configuration, index: CommandsIndex):
+        self._config = config
+        self._index = index
+
+    def update(self) -> None:
+        repos = self._index.repositories()
+        self._create_dir(self._config.fish_completion_names_dir)
+        written = self._read_state()
+        indexed = {}
+        for repo in repos:
+            file_name = os.path.basename(repo.repo_dir)
+            indexed[file_name] = repo.indexed_at
+            # only repositories whose shard was rebuilt since get their names file rewritten
+            if written.get(file_name) != repo.indexed_at or not os.path.exists(self._names_file(file_name)):
+                self._write_names(file_name, repo)
+        for file_name in os.listdir(self._config.fish_completion_names_dir):
+            if file_name not in indexed:
+                os.remove(self._names_file(file_name))
+        if not os.path.exists(self._main_names_file()):
+            atomic_write(self._main_names_file(), '')
+        tags = sorted({t for repo in repos for t in repo.tags})
+        self._write_if_changed(self._config.fish_completion_tags_file, ''.join(t + '\n' for t in tags))
+        self._write_if_changed(self._config.fish_completions_file, self._script())
+        if indexed != written:
+            atomic_write(self._config.fish_completion_state_file, json.dumps(indexed))
+
+    # record and rm patch the main repository's names and tags, the next update regenerates them from the index
+    def add_commands(self, commands: typing.List[StoredCommand]) -> None:
+        names = {name for (name, _, _) in commands}
+        lines = [line for line in self._read_lines(self._main_names_file()) if line.split('\t', 1)[0] not in names]
+        lines.extend(f'{name}\t{_describe(command)}' for (name, command, _) in commands)
+        self._create_dir(self._config.fish_completion_names_dir)
+        atomic_write(self._main_names_file(), ''.join(line + '\n' for line in lines))
+        tags = self._read_lines(self._config.fish_completion_tags_file)
+        new_tags = {t for (_, _, command_tags) in commands for t in command_tags} - set(tags)
+        if new_tags:
+            atomic_write(self._config.fish_completion_tags_file, ''.join(t + '\n' for t in sorted([*tags, *new_tags])))
+
+    def remove_command(self, name: str) -> None:
+        lines = self._read_lines(self._main_names_file())
+        kept = [line for line in lines if line.split('\t', 1)[0] != name]
+        if len(kept) != len(lines):
+            atomic_write(self._main_names_file(), ''.join(line + '\n' for line in kept))
+
+    def _write_names(self, file_name: str, repo: IndexedRepository) -> None:
+        lines = (f'{name}\t{_describe(command)}\n' for (name, command, _) in self._index.find(repo, TagQuery.parse([])))
+        atomic_write(self._names_file(file_name), ''.join(lines))
+
+    def _script(self) -> str:
+        names_condition = _quote('__fish_seen_subcommand_from ' + ' '.join(NAME_ARGUMENT_SUBCOMMANDS))
+        all_names = f'(cat {_quote(self._config.fish_completion_names_dir)}/*)'
+        lines = [f'complete -c {COMPLETED_PROGRAM} -f -n __fish_use_subcommand -a {_quote(" ".join(SUBCOMMANDS))}',
+                 f'complete -c {COMPLETED_PROGRAM} -n {names_condition} -f -a {_quote(all_names)}']
+        lines.extend(self._complete(NAME_OPTIONS, f'(cat {_quote(self._main_names_file())})'))
+        lines.extend(self._complete(TAG_OPTIONS, f'(cat {_quote(self._config.fish_completion_tags_file)})'))
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _complete(options: typing.Dict[str, typing.Tuple[str, str]], values: str) -> typing.Iterator[str]:
+        for (subcommand, (short, long)) in options.items():
+            yield (f'complete -c {COMPLETED_PROGRAM} -n {_quote("__fish_seen_subcommand_from " + subcommand)} '
+                   f'-s {short} -l {long} -x -a {_quote(values)}')
+
+    def _names_file(self, file_name: str) -> str:
+        return os.path.join(self._config.fish_completion_names_dir, file_name)
+
+    def _main_names_file(self) -> str:
+        return self._names_file(os.path.basename(self._config.main_repository_dir))
+
+    def _read_state(self) -> typing.Dict[str, int]:
+        try:
+            with open(self._config.fish_completion_state_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    @staticmethod
+    def _read_lines(path: str) -> typing.List[str]:
+        try:
+            with open(path, 'r') as f:
+                return f.read().splitlines()
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    def _write_if_changed(path: str, content: str) -> None:
+        try:
+            with open(path, 'r') as f:
+                if f.read() == content:
+                    return
+        except FileNotFoundError:
+            pass
+        atomic_write(path, content)
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+# a names file line is the completed value and its description separated by a tab
+def _describe(command: str) -> str:
+    first_line = command.split('\n')[0].replace('\t', ' ')
+    if len(first_line) <= DESCRIPTION_MAX_LENGTH:
+        return first_line
+    return first_line[:DESCRIPTION_MAX_LENGTH - 3] + '...'
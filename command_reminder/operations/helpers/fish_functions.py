@@ -0,0 +1,8 @@
+ECHO_COLOR = 'blue'
+
+
+def fish_function(name: str, command: str) -> str:
+    return f'''
+function {name}
+    set color {ECHO_COLOR}; echo '{command}'
+end'''
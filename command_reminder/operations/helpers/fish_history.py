@@ -0,0 +1,88 @@
+import heapq
+import mmap
+import re
+import typing
+from dataclasses import dataclass
+
+# fish writes every history item as a `- cmd:` line optionally followed by `when:` and `paths:` lines
+HISTORY_ITEM_REGEX = re.compile(rb'^- cmd: (.*)$(?:\n  when: (\d+)$)?', re.MULTILINE)
+FISH_ESCAPE_REGEX = re.compile(r'\\(.)')
+
+
+@dataclass
+class HistoryItem:
+    command: str
+    when: int
+
+
+def read_history(path: str) -> typing.Iterator[HistoryItem]:
+    # the file is memory-mapped and scanned with a regex, so only the items themselves are ever decoded
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        try:
+            history = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # an empty file cannot be mapped
+            return
+        with history:
+            for match in HISTORY_ITEM_REGEX.finditer(history):
+                (command, when) = match.groups()
+                yield HistoryItem(_unescape(command.decode('utf-8', errors='replace')), int(when) if when else 0)
+
+
+# fish keeps every history item on a single line
+def escape_command(command: str) -> str:
+    return command.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _unescape(command: str) -> str:
+    if '\\' not in command:
+        return command
+    return FISH_ESCAPE_REGEX.sub(lambda m: '\n' if m.group(1) == 'n' else m.group(1), command)
+
+
+@dataclass
+class CommandFrequency:
+    command: str
+    count: int
+    last_used: int
+
+
+# Approximate top-k of a stream in bounded memory (the Space-Saving algorithm).
+class CommandFrequencies:
+    def __init__(self, capacity: int):
+        self._capacity = capacity
+        self._counters: typing.Dict[str, typing.List[int]] = {}
+        # one (count, command) pair per tracked command, counts only grow, so they are refreshed lazily on eviction
+        self._heap: typing.List[typing.Tuple[int, str]] = []
+
+    def add(self, command: str, when: int) -> None:
+        counter = self._counters.get(command)
+        if counter:
+            counter[0] += 1
+            if when > counter[1]:
+                counter[1] = when
+            return
+        count = 1
+        if len(self._counters) >= self._capacity:
+            count += self._evict_least_frequent()
+        self._counters[command] = [count, when]
+        heapq.heappush(self._heap, (count, command))
+
+    def most_frequent(self) -> typing.List[CommandFrequency]:
+        frequencies = [CommandFrequency(command, count, last_used)
+                       for (command, (count, last_used)) in self._counters.items()]
+        return sorted(frequencies, key=lambda f: (f.count, f.last_used), reverse=True)
+
+    def _evict_least_frequent(self) -> int:
+        while True:
+            (count, command) = self._heap[0]
+            current = self._counters[command][0]
+            if current == count:
+                heapq.heappop(self._heap)
+                del self._counters[command]
+                return count
+            heapq.heapreplace(self._heap, (current, command))
@@ -1,12 +1,19 @@
 import os
 import subprocess
+import time
+import typing
 from dataclasses import dataclass
 
 import giturlparse
-from command_reminder.config.config import FISH_FUNCTIONS_DIR_NAME, COMMANDS_FILE_NAME, CONFIG_FILE_NAME
+from command_reminder.config.config import FISH_FUNCTIONS_DIR_NAME, COMMANDS_FILE_NAME
 
 from command_reminder.exceptions import InvalidArgumentException
 
+FILE_URL_PREFIX = 'file://'
+GIT_SUFFIX = '.git'
+# the only paths of external repositories ever read
+SPARSE_CHECKOUT_PATHS = [f'/{COMMANDS_FILE_NAME}', f'/{FISH_FUNCTIONS_DIR_NAME}/']
+
 
 @dataclass
 class ParsedGitRepository:
@@ -14,10 +21,25 @@ class ParsedGitRepository:
     name: str
 
 
+# Shares a timeout among consecutive git commands, each one is given what the previous ones left.
+class Deadline:
+    def __init__(self, timeout: typing.Optional[float]):
+        self._timeout = timeout
+        self._at = time.monotonic() + timeout if timeout is not None else None
+
+    def remaining(self) -> typing.Optional[float]:
+        if self._at is None:
+            return None
+        remaining = self._at - time.monotonic()
+        if remaining <= 0:
+            raise subprocess.TimeoutExpired('git', self._timeout)
+        return remaining
+
+
 class GitRepositoryManager:
-    def init_repo(self, directory: str, repo: str) -> None:
+    def init_repo(self, directory: str, repo: str, timeout: typing.Optional[float] = None, quiet: bool = False) -> None:
         self.init_git(directory, repo)
-        self.pull_changes_from_remote(directory)
+        self.pull_changes_from_remote(directory, timeout, quiet)
 
     @staticmethod
     def init_git(directory: str, repo: str):
@@ -26,26 +48,111 @@ class GitRepositoryManager:
                         f' git remote add origin {repo}'],
                        shell=True, check=True)
 
+    def clone_external_repo(self, directory: str, repo: str, timeout: typing.Optional[float] = None,
+                            quiet: bool = False) -> None:
+        deadline = Deadline(timeout)
+        self.init_git(directory, repo)
+        try:
+            self._run_git(directory, ['sparse-checkout', 'set', '--no-cone', *SPARSE_CHECKOUT_PATHS],
+                          deadline.remaining(), quiet)
+            self._run_git(directory, ['fetch', '--depth', '1', 'origin', 'main'], deadline.remaining(), quiet)
+            self._run_git(directory, ['checkout', '-B', 'main', 'FETCH_HEAD'], deadline.remaining(), quiet)
+        except subprocess.CalledProcessError:
+            # git versions without sparse checkout and servers without shallow fetch get the whole repository
+            subprocess.run(['git', 'sparse-checkout', 'disable'], cwd=directory, capture_output=True,
+                           timeout=deadline.remaining())
+            self.pull_changes_from_remote(directory, deadline.remaining(), quiet)
+
+    def refresh_external_repo(self, directory: str, timeout: typing.Optional[float] = None,
+                              quiet: bool = False) -> None:
+        # fetching into a shallow clone transfers only the commits after its shallow boundary
+        deadline = Deadline(timeout)
+        try:
+            self._run_git(directory, ['fetch', 'origin', 'main'], deadline.remaining(), quiet)
+            self._run_git(directory, ['merge', '--ff-only', 'FETCH_HEAD'], deadline.remaining(), quiet)
+        except subprocess.CalledProcessError:
+            self.pull_changes_from_remote(directory, deadline.remaining(), quiet)
+
     @staticmethod
-    def pull_changes_from_remote(directory: str):
-        subprocess.run([f'cd {directory} &&'
-                        f' git pull origin main &&'
-                        f' git checkout main'],
-                       shell=True, check=True)
+    def remote_head(directory: str, timeout: typing.Optional[float] = None) -> typing.Optional[str]:
+        result = subprocess.run(['git', 'ls-remote', 'origin', 'refs/heads/main'], cwd=directory, check=True,
+                                timeout=timeout, capture_output=True, text=True)
+        return result.stdout.split()[0] if result.stdout else None
+
+    @staticmethod
+    def local_head(directory: str) -> typing.Optional[str]:
+        result = subprocess.run(['git', 'rev-parse', '--verify', '--quiet', 'HEAD'], cwd=directory,
+                                capture_output=True, text=True)
+        return result.stdout.strip() or None
+
+    @staticmethod
+    def pull_changes_from_remote(directory: str, timeout: typing.Optional[float] = None, quiet: bool = False):
+        # a local commit made by push gets merged, whatever pull strategy the user configured
+        deadline = Deadline(timeout)
+        for args in (['pull', '--no-rebase', '--no-edit', 'origin', 'main'], ['checkout', 'main']):
+            GitRepositoryManager._run_git(directory, args, deadline.remaining(), quiet)
+
+    @staticmethod
+    def changed_paths(directory: str, pathspecs: typing.List[str]) -> typing.List[str]:
+        result = subprocess.run(['git', 'status', '--porcelain', '-z', '--untracked-files=all', '--', *pathspecs],
+                                cwd=directory, check=True, capture_output=True, text=True)
+        entries = iter(result.stdout.split('\0'))
+        paths = []
+        for entry in entries:
+            if not entry:
+                continue
+            (status, path) = (entry[:2], entry[3:])
+            paths.append(path)
+            # a rename or a copy is followed by the path it was made from, a renamed one is gone, so it changed too
+            if 'R' in status or 'C' in status:
+                original = next(entries)
+                if 'R' in status:
+                    paths.append(original)
+        return paths
+
+    @staticmethod
+    def file_at_head(directory: str, path: str) -> typing.Optional[str]:
+        result = subprocess.run(['git', 'show', f'HEAD:{path}'], cwd=directory, capture_output=True, text=True)
+        return result.stdout if result.returncode == 0 else None
+
+    @staticmethod
+    def commit_paths(directory: str, paths: typing.List[str], message: str) -> None:
+        # only the given paths are committed, whatever else is staged stays as it was
+        present = [p for p in paths if os.path.lexists(os.path.join(directory, p))]
+        # `add` rejects a path whose removal is already staged, e.g. the source of a rename
+        removed = [p for p in paths if p not in present]
+        if present:
+            GitRepositoryManager._run_git(directory, ['add', '-A', '--', *present], None, True)
+        if removed:
+            GitRepositoryManager._run_git(directory, ['rm', '--cached', '--quiet', '--ignore-unmatch', '--', *removed],
+                                          None, True)
+        GitRepositoryManager._run_git(directory, ['commit', '-m', message, '--', *paths], None, True)
+
+    @staticmethod
+    def has_unpushed_commits(directory: str) -> bool:
+        head = GitRepositoryManager.local_head(directory)
+        tracked = GitRepositoryManager._tracked_remote_head(directory)
+        return bool(head) and head != tracked
+
+    @staticmethod
+    def remote_moved(directory: str) -> bool:
+        remote = GitRepositoryManager.remote_head(directory)
+        return bool(remote) and remote != GitRepositoryManager._tracked_remote_head(directory)
 
     @staticmethod
     def push_changes_to_remote(directory: str):
-        subprocess.run([f'cd {directory} &&'
-                        f' git checkout main &&'
-                        f' git add {FISH_FUNCTIONS_DIR_NAME}/* &&'
-                        f' git add {COMMANDS_FILE_NAME} &&'
-                        f' git add {CONFIG_FILE_NAME} &&'
-                        f' git commit -a -m \'update repo\' &&'
-                        f' git push origin main'],
-                       shell=True, check=True)
+        GitRepositoryManager._run_git(directory, ['push', 'origin', 'main'], None, False)
+
+    @staticmethod
+    def _tracked_remote_head(directory: str) -> typing.Optional[str]:
+        result = subprocess.run(['git', 'rev-parse', '--verify', '--quiet', 'refs/remotes/origin/main'],
+                                cwd=directory, capture_output=True, text=True)
+        return result.stdout.strip() or None
 
     @staticmethod
     def validate(repo_url: str) -> ParsedGitRepository:
+        if repo_url.startswith(FILE_URL_PREFIX):
+            return GitRepositoryManager._validate_file_url(repo_url)
         parsed = giturlparse.parse(repo_url)
         if not parsed.valid:
             raise InvalidArgumentException("Invalid git repository url")
@@ -54,3 +161,17 @@ class GitRepositoryManager:
     @staticmethod
     def is_git_repo(directory: str):
         return '.git' in os.listdir(directory)
+
+    @staticmethod
+    def _run_git(directory: str, args: typing.List[str], timeout: typing.Optional[float], quiet: bool) -> None:
+        subprocess.run(['git', *args], cwd=directory, check=True, timeout=timeout, capture_output=quiet, text=True)
+
+    @staticmethod
+    def _validate_file_url(repo_url: str) -> ParsedGitRepository:
+        path = repo_url[len(FILE_URL_PREFIX):].rstrip('/')
+        (parent, name) = os.path.split(path)
+        if not os.path.isabs(path) or not name:
+            raise InvalidArgumentException("Invalid git repository url")
+        if name.endswith(GIT_SUFFIX):
+            name = name[:-len(GIT_SUFFIX)]
+        return ParsedGitRepository(os.path.basename(parent), name)
@@ -0,0 +1,90 @@
+import collections
+import hashlib
+import json
+import os
+import typing
+
+from command_reminder.operations.helpers.files import atomic_write
+from command_reminder.operations.helpers.fish_history import HISTORY_ITEM_REGEX, escape_command
+
+HISTORY_ITEM_PREFIX = b'\n- cmd: '
+TAIL_SCAN_BLOCK_BYTES = 64 * 1024
+
+
+def hash_command(command: bytes) -> str:
+    return hashlib.blake2b(command, digest_size=8).hexdigest()
+
+
+# Hashes of the last `window` commands of the fish history, read incrementally from where the last run stopped.
+class RecentHistory:
+    def __init__(self, history_file: str, state_file: str, window: int):
+        self._history_file = history_file
+        self._state_file = state_file
+        self._window = window
+        self._hashes: typing.Deque[str] = collections.deque()
+        self._counts: typing.Counter[str] = collections.Counter()
+
+    def read(self) -> None:
+        if not self._window:
+            return
+        try:
+            stat = os.stat(self._history_file)
+        except FileNotFoundError:
+            return
+        state = self._read_state()
+        with open(self._history_file, 'rb') as f:
+            if self._covers(state, stat):
+                self._extend(state['hashes'])
+                f.seek(state['offset'])
+                self._extend(hash_command(m.group(1)) for m in HISTORY_ITEM_REGEX.finditer(f.read()))
+            else:
+                self._extend(self._read_tail(f, stat.st_size))
+
+    def add(self, command: str) -> bool:
+        # history items are hashed as written to the file, so the command is escaped the same way first
+        command_hash = hash_command(escape_command(command).encode())
+        if self._counts[command_hash]:
+            return False
+        self._extend([command_hash])
+        return True
+
+    def save(self) -> None:
+        try:
+            stat = os.stat(self._history_file)
+        except FileNotFoundError:
+            return
+        os.makedirs(os.path.dirname(self._state_file), exist_ok=True)
+        atomic_write(self._state_file, json.dumps({'inode': stat.st_ino, 'offset': stat.st_size,
+                                                   'window': self._window, 'hashes': list(self._hashes)}))
+
+    def _covers(self, state: typing.Optional[dict], stat: os.stat_result) -> bool:
+        return bool(state) and state['inode'] == stat.st_ino and state['offset'] <= stat.st_size \
+            and state['window'] >= self._window
+
+    def _extend(self, hashes: typing.Iterable[str]) -> None:
+        for command_hash in hashes:
+            self._hashes.append(command_hash)
+            self._counts[command_hash] += 1
+            if len(self._hashes) > self._window:
+                oldest = self._hashes.popleft()
+                self._counts[oldest] -= 1
+
+    def _read_tail(self, f: typing.BinaryIO, size: int) -> typing.List[str]:
+        # reads blocks from the end until the window is filled, one extra item is needed to know the first is whole
+        start = size
+        tail = b''
+        while start > 0 and tail.count(HISTORY_ITEM_PREFIX) <= self._window:
+            end = start
+            start = max(0, start - TAIL_SCAN_BLOCK_BYTES)
+            f.seek(start)
+            tail = f.read(end - start) + tail
+        if start > 0:
+            tail = tail[tail.index(HISTORY_ITEM_PREFIX) + 1:]
+        return [hash_command(m.group(1)) for m in HISTORY_ITEM_REGEX.finditer(tail)]
+
+    def _read_state(self) -> typing.Optional[dict]:
+        try:
+            with open(self._state_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import time
+import typing
+from dataclasses import dataclass
+
+from command_reminder.common import FilesMixin
+from command_reminder.config.config import Configuration, COMMANDS_FILE_NAME
+from command_reminder.operations.helpers.dir_viewer import DirectoriesViewer
+from command_reminder.operations.helpers.files import atomic_write, FileFingerprint
+from command_reminder.operations.helpers.store import CommandStore, JsonCommandStore
+from command_reminder.operations.helpers.tag_query import TagQuery
+from command_reminder.tracing import span
+
+INDEX_VERSION = 4
+# A commands file modified this close to the moment its shard was built may have been changed again within the
+# filesystem timestamp granularity, so such shards are not trusted and get rebuilt on the next read.
+RACY_WINDOW_NS = 2 * 10 ** 9
+# Tags attached to fewer commands than count / SPARSE_POSTINGS_RATIO keep their postings as a sorted list of positions,
+# the others as a hex encoded bitset. Both are turned into integer bitsets when queried.
+SPARSE_POSTINGS_RATIO = 32
+
+IndexedCommand = typing.Tuple[str, str, typing.List[str]]
+
+
+@dataclass
+class IndexedRepository:
+    repo_dir: str
+    commands_file: str
+    shard_file: str
+    count: int
+    tags: typing.List[str]
+    indexed_at: int
+
+
+class _LoadedShard:
+    def __init__(self, header: dict, lines: typing.List[str]):
+        self.header = header
+        self._lines = lines
+        self._records: typing.List[typing.Optional[IndexedCommand]] = [None] * len(lines)
+
+    def record(self, position: int) -> IndexedCommand:
+        record = self._records[position]
+        if record is None:
+            record = self._records[position] = json.loads(self._lines[position])
+        return record
+
+
+# On-disk index of commands of all repositories, one shard per repository rebuilt only when its files change.
+class CommandsIndex(FilesMixin):
+    def __init__(self, config: Configuration, dir_viewer: DirectoriesViewer, main_store: CommandStore):
+        self._config = config
+        self._dir_viewer = dir_viewer
+        self._main_store = main_store
+        self._manifest: typing.Optional[dict] = None
+        self._shards: typing.Dict[str, typing.Tuple[int, _LoadedShard]] = {}
+
+    def repositories(self) -> typing.List[IndexedRepository]:
+        with span('index.read_manifest'):
+            manifest = self._load_manifest()
+        entries = manifest['repos']
+        refreshed = {}
+        changed = False
+        with span('index.list_repo_directories'):
+            repo_dirs = self._dir_viewer.list_all_repo_directories()
+        for repo_dir in repo_dirs:
+            commands_file = os.path.join(repo_dir, COMMANDS_FILE_NAME)
+            store = self._store(repo_dir)
+            fingerprint = store.fingerprint()
+            if not fingerprint[0]:
+                continue
+            entry = entries.get(commands_file)
+            if not entry or not self._is_fresh(entry, fingerprint):
+                with span('index.build_shard'):
+                    entry = self._build_shard(repo_dir, commands_file, store, fingerprint, entry)
+                changed = True
+            refreshed[commands_file] = entry
+
+        for commands_file in entries.keys() - refreshed.keys():
+            self._remove_shard(entries[commands_file])
+            changed = True
+
+        if changed:
+            manifest['repos'] = refreshed
+            with span('index.write_manifest'):
+                self._save_manifest(manifest)
+        return [self._to_repository(commands_file, entry) for (commands_file, entry) in refreshed.items()]
+
+    def tags(self) -> typing.Set[str]:
+        all_tags = set()
+        for repo in self.repositories():
+            all_tags.update(repo.tags)
+        return all_tags
+
+    def find(self, repo: IndexedRepository, query: TagQuery) -> typing.Iterator[IndexedCommand]:
+        if not repo.count or not query.may_match(repo.tags):
+            return
+        if query.is_empty():
+            positions = range(repo.count)
+        else:
+            header = self._load_shard(repo).header
+            count = header['count']
+            postings = header['postings']
+            positions = _set_bits(query.evaluate(lambda tag: _to_bitset(postings.get(tag), count), count))
+        yield from self.commands_at(repo, positions)
+
+    # commands at the given positions of the repository's shard, i.e. in the order `find` yields them for an empty query
+    def commands_at(self, repo: IndexedRepository, positions: typing.Iterable[int]) -> typing.Iterator[IndexedCommand]:
+        shard = self._load_shard(repo)
+        for position in positions:
+            yield shard.record(position)
+
+    def _load_shard(self, repo: IndexedRepository) -> _LoadedShard:
+        cached = self._shards.get(repo.shard_file)
+        if cached and cached[0] == repo.indexed_at:
+            return cached[1]
+        with span('index.read_shard'), open(repo.shard_file, 'r') as f:
+            header = json.loads(f.readline())
+            shard = _LoadedShard(header, f.readlines())
+        self._shards[repo.shard_file] = (repo.indexed_at, shard)
+        return shard
+
+    def _store(self, repo_dir: str) -> CommandStore:
+        if repo_dir == self._config.main_repository_dir:
+            return self._main_store
+        return JsonCommandStore(repo_dir)
+
+    def _build_shard(self, repo_dir: str, commands_file: str, store: CommandStore,
+                     fingerprint: typing.List[FileFingerprint], previous: typing.Optional[dict]) -> dict:
+        positions = {}
+        lines = []
+        for (position, (name, content, tags)) in enumerate(store.iterate()):
+            for t in set(tags):
+                positions.setdefault(t, []).append(position)
+            lines.append(json.dumps([name, content, tags]))
+        count = len(lines)
+        postings = {t: _encode_postings(p, count) for (t, p) in positions.items()}
+        lines.insert(0, json.dumps({'repo': repo_dir, 'count': count, 'postings': postings}))
+
+        shard_name = hashlib.blake2b(commands_file.encode(), digest_size=8).hexdigest() + '.jsonl'
+        shard_file = os.path.join(self._config.index_shards_dir, shard_name)
+        content = '\n'.join(lines) + '\n'
+        content_hash = hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+        checked_at = time.time_ns()
+        if previous and previous.get('content_hash') == content_hash and os.path.exists(shard_file):
+            indexed_at = previous['indexed_at']
+        else:
+            self._create_dir(self._config.index_shards_dir)
+            atomic_write(shard_file, content)
+            indexed_at = checked_at
+        return {
+            'repo': repo_dir,
+            'files': fingerprint,
+            'indexed_at': indexed_at,
+            'checked_at': checked_at,
+            'shard': shard_name,
+            'count': count,
+            'tags': sorted(positions),
+            'content_hash': content_hash,
+        }
+
+    @staticmethod
+    def _is_fresh(entry: dict, fingerprint: typing.List[FileFingerprint]) -> bool:
+        if entry['files'] != fingerprint:
+            return False
+        last_modified = max(f[0] for f in fingerprint if f)
+        return last_modified + RACY_WINDOW_NS <= entry['checked_at']
+
+    def _remove_shard(self, entry: dict) -> None:
+        try:
+            os.remove(os.path.join(self._config.index_shards_dir, entry['shard']))
+        except FileNotFoundError:
+            pass
+
+    def _to_repository(self, commands_file: str, entry: dict) -> IndexedRepository:
+        return IndexedRepository(repo_dir=entry['repo'], commands_file=commands_file,
+                                 shard_file=os.path.join(self._config.index_shards_dir, entry['shard']),
+                                 count=entry['count'], tags=entry['tags'], indexed_at=entry['indexed_at'])
+
+    def _load_manifest(self) -> dict:
+        if self._manifest is None:
+            self._manifest = self._read_manifest()
+        return self._manifest
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self._config.index_manifest_file, 'r') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == INDEX_VERSION:
+                return manifest
+        except (FileNotFoundError, ValueError):
+            pass
+        return {'version': INDEX_VERSION, 'repos': {}}
+
+    def _save_manifest(self, manifest: dict) -> None:
+        self._create_dir(self._config.index_dir)
+        atomic_write(self._config.index_manifest_file, json.dumps(manifest))
+
+
+# Changes whenever any of the repositories' commands do, or a repository is added or removed.
+def repositories_fingerprint(repos: typing.List[IndexedRepository]) -> str:
+    versions = '\n'.join(f'{r.repo_dir}:{r.indexed_at}' for r in repos)
+    return hashlib.blake2b(versions.encode(), digest_size=8).hexdigest()
+
+
+def _encode_postings(positions: typing.List[int], count: int) -> typing.Union[typing.List[int], str]:
+    if len(positions) * SPARSE_POSTINGS_RATIO < count:
+        return positions
+    return format(_to_bitset(positions, count), 'x')
+
+
+def _to_bitset(postings: typing.Union[typing.List[int], str, None], count: int) -> int:
+    if not postings:
+        return 0
+    if isinstance(postings, str):
+        return int(postings, 16)
+    bits = bytearray((count + 7) // 8)
+    for position in postings:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def _set_bits(mask: int) -> typing.Iterator[int]:
+    bits = bin(mask)[:1:-1]
+    position = bits.find('1')
+    while position != -1:
+        yield position
+        position = bits.find('1', position + 1)
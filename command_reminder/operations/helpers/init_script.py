@@ -0,0 +1,53 @@
+import json
+import os
+import time
+import typing
+
+from command_reminder.config.config import Configuration
+from command_reminder.operations.helpers.files import atomic_write
+
+CACHE_HEADER_PREFIX = '# command-reminder init '
+
+
+# The last generated init script with the mtimes of the paths it was generated from.
+class InitScriptCache:
+    def __init__(self, config: Configuration):
+        self._config = config
+
+    def read(self, bundle: bool) -> typing.Optional[str]:
+        try:
+            with open(self._config.init_script_cache_file, 'r') as f:
+                header = json.loads(f.readline()[len(CACHE_HEADER_PREFIX):])
+                script = f.read()
+        except (FileNotFoundError, ValueError):
+            return None
+        if header.get('bundle') != bundle:
+            return None
+        for (path, mtime) in header['dependencies']:
+            if self._mtime(path) != mtime:
+                return None
+        return script
+
+    def write(self, script: str, bundle: bool, dependencies: typing.List[str]) -> None:
+        from command_reminder.operations.helpers.index import RACY_WINDOW_NS
+        mtimes = [[path, self._mtime(path)] for path in dependencies]
+        # a path modified within the timestamp granularity may change again unnoticed
+        if any(mtime and mtime + RACY_WINDOW_NS > time.time_ns() for (_, mtime) in mtimes):
+            self.invalidate()
+            return
+        os.makedirs(os.path.dirname(self._config.init_script_cache_file), exist_ok=True)
+        header = CACHE_HEADER_PREFIX + json.dumps({'bundle': bundle, 'dependencies': mtimes}) + '\n'
+        atomic_write(self._config.init_script_cache_file, header + script)
+
+    def invalidate(self) -> None:
+        try:
+            os.remove(self._config.init_script_cache_file)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _mtime(path: str) -> typing.Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
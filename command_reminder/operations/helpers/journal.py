@@ -0,0 +1,140 @@
+import fcntl
+import json
+import os
+import typing
+from contextlib import contextmanager
+
+from command_reminder.config.config import COMMANDS_FILE_NAME, COMMANDS_JOURNAL_FILE_NAME, COMMANDS_LOCK_FILE_NAME
+from command_reminder.operations.helpers.files import read_file_content, atomic_write
+
+COMPACTION_THRESHOLD_BYTES = 256 * 1024
+# a reader racing with this many compactions in a row reads under the writers' lock instead
+MAX_LOCK_FREE_READS = 5
+
+PUT_ENTRY = 'put'
+DELETE_ENTRY = 'del'
+
+Commands = typing.Dict[str, typing.List]
+
+
+# Commands of a repository kept as a `commands.json` snapshot plus an append-only journal.
+class CommandsJournal:
+    def __init__(self, repo_dir: str):
+        self.commands_file = os.path.join(repo_dir, COMMANDS_FILE_NAME)
+        self.journal_file = os.path.join(repo_dir, COMMANDS_JOURNAL_FILE_NAME)
+        self.lock_file = os.path.join(repo_dir, COMMANDS_LOCK_FILE_NAME)
+
+    def load(self) -> Commands:
+        for _ in range(MAX_LOCK_FREE_READS):
+            commands = self._try_load()
+            if commands is not None:
+                return commands
+        with self._locked():
+            return self._try_load()
+
+    def put(self, name: str, command: str, tags: typing.List[str]) -> None:
+        self._append([PUT_ENTRY, name, command, tags])
+
+    def delete(self, name: str) -> None:
+        self._append([DELETE_ENTRY, name])
+
+    def put_many(self, entries: typing.Iterable[typing.Tuple[str, str, typing.List[str]]]) -> None:
+        with self._locked():
+            commands = self._try_load()
+            for (name, command, tags) in entries:
+                commands[name] = [command, tags]
+            self._replace_snapshot(commands)
+
+    def replace_all(self, commands: Commands) -> None:
+        with self._locked():
+            self._replace_snapshot(commands)
+
+    def compact(self) -> None:
+        if not os.path.exists(self.journal_file):
+            return
+        with self._locked():
+            self._compact()
+
+    def _try_load(self) -> typing.Optional[Commands]:
+        # the journal is opened before the snapshot, so a compaction in between gives a newer snapshot and an older
+        # journal, which replays to the same state. Only once the opened journal got unlinked, the snapshot read may
+        # already contain entries of a newer journal that the older one would override, so the read is repeated.
+        journal = self._open_if_exists(self.journal_file)
+        try:
+            commands = self._read_snapshot()
+            if journal:
+                self._replay(commands, journal)
+                if os.fstat(journal.fileno()).st_nlink == 0:
+                    return None
+        finally:
+            if journal:
+                journal.close()
+        return commands
+
+    def _append(self, entry: list) -> None:
+        with self._locked():
+            if not os.path.exists(self.commands_file):
+                atomic_write(self.commands_file, json.dumps({}))
+            with open(self.journal_file, 'ab+') as f:
+                # an interrupted writer may have left a partial line, the entry goes on a line of its own
+                f.seek(0, os.SEEK_END)
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        f.write(b'\n')
+                f.write(json.dumps(entry).encode('utf-8') + b'\n')
+                size = f.tell()
+            if size > COMPACTION_THRESHOLD_BYTES:
+                self._compact()
+
+    def _compact(self) -> None:
+        if os.path.exists(self.journal_file):
+            self._replace_snapshot(self._try_load())
+
+    def _replace_snapshot(self, commands: Commands) -> None:
+        # the new snapshot is published before the journal folded into it disappears
+        atomic_write(self.commands_file, json.dumps(commands))
+        self._remove_journal()
+
+    @contextmanager
+    def _locked(self) -> typing.Iterator[None]:
+        with open(self.lock_file, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_snapshot(self) -> Commands:
+        try:
+            with open(self.commands_file, 'r') as f:
+                return read_file_content(f)
+        except FileNotFoundError:
+            return {}
+
+    def _remove_journal(self) -> None:
+        try:
+            os.remove(self.journal_file)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _replay(commands: Commands, journal: typing.TextIO) -> None:
+        for line in journal:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # a line being appended right now or left by an interrupted writer
+                continue
+            if entry[0] == PUT_ENTRY:
+                (_, name, command, tags) = entry
+                commands[name] = [command, tags]
+            elif entry[0] == DELETE_ENTRY:
+                commands.pop(entry[1], None)
+
+    @staticmethod
+    def _open_if_exists(path: str) -> typing.Optional[typing.TextIO]:
+        try:
+            return open(path, 'r')
+        except FileNotFoundError:
+            return None
@@ -0,0 +1,81 @@
+import json
+import os
+import typing
+from dataclasses import dataclass
+
+from command_reminder.common import FilesMixin
+from command_reminder.config.config import Configuration
+from command_reminder.operations.helpers.files import atomic_write
+from command_reminder.operations.helpers.index import CommandsIndex, IndexedRepository, repositories_fingerprint
+from command_reminder.tracing import span
+
+# name -> [shard file name, byte offset of the command's line] for every repository having it, by precedence
+NameLocations = typing.Dict[str, typing.List[typing.List]]
+
+
+@dataclass
+class NamedCommand:
+    name: str
+    command: str
+    tags: typing.List[str]
+    repo: str
+
+
+# Persisted map of command names to the lines of the index's shards holding them.
+class NameIndex(FilesMixin):
+    def __init__(self, config: Configuration, index: CommandsIndex):
+        self._config = config
+        self._index = index
+        self._loaded: typing.Optional[typing.Tuple[str, NameLocations]] = None
+
+    def lookup(self, name: str, repo_name: typing.Optional[str] = None) -> typing.Optional[NamedCommand]:
+        repos = self._by_precedence(self._index.repositories())
+        shards = {os.path.basename(r.shard_file): r for r in repos}
+        for (shard_name, offset) in self._load_names(repos).get(name, []):
+            repo = shards[shard_name]
+            if repo_name and os.path.basename(repo.repo_dir) != repo_name:
+                continue
+            with span('names.read_command'), open(repo.shard_file, 'rb') as f:
+                f.seek(offset)
+                (found_name, command, tags) = json.loads(f.readline())
+            if found_name == name:
+                return NamedCommand(name=name, command=command, tags=tags, repo=os.path.basename(repo.repo_dir))
+        return None
+
+    def _by_precedence(self, repos: typing.List[IndexedRepository]) -> typing.List[IndexedRepository]:
+        main_dir = self._config.main_repository_dir
+        return sorted(repos, key=lambda r: (r.repo_dir != main_dir, os.path.basename(r.repo_dir)))
+
+    def _load_names(self, repos: typing.List[IndexedRepository]) -> NameLocations:
+        fingerprint = repositories_fingerprint(repos)
+        if self._loaded and self._loaded[0] == fingerprint:
+            return self._loaded[1]
+        with span('names.read'):
+            names = self._read_names(fingerprint)
+        if names is None:
+            with span('names.build'):
+                names = self._build_names(repos, fingerprint)
+        self._loaded = (fingerprint, names)
+        return names
+
+    def _build_names(self, repos: typing.List[IndexedRepository], fingerprint: str) -> NameLocations:
+        names = {}
+        for repo in repos:
+            shard_name = os.path.basename(repo.shard_file)
+            with open(repo.shard_file, 'rb') as f:
+                offset = len(f.readline())
+                for line in f:
+                    names.setdefault(json.loads(line)[0], []).append([shard_name, offset])
+                    offset += len(line)
+        self._create_dir(self._config.index_dir)
+        atomic_write(self._config.name_index_file, json.dumps({'fingerprint': fingerprint}) + '\n' + json.dumps(names))
+        return names
+
+    def _read_names(self, fingerprint: str) -> typing.Optional[NameLocations]:
+        try:
+            with open(self._config.name_index_file, 'r') as f:
+                if json.loads(f.readline()).get('fingerprint') != fingerprint:
+                    return None
+                return json.loads(f.readline())
+        except (FileNotFoundError, ValueError):
+            return None
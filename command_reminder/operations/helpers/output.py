@@ -0,0 +1,45 @@
+import os
+import sys
+import typing
+
+OUTPUT_CHUNK_LINES = 256
+
+
+# Writes lines as they are produced, a chunk at a time, so e.g. `cr list | head` gets the first screen without waiting
+# for the rest. Stops quietly once the reader closes the pipe.
+def write_lines(lines: typing.Iterable[str], terminator: str = '\n') -> None:
+    chunk = []
+    try:
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) >= OUTPUT_CHUNK_LINES:
+                _write_chunk(chunk, terminator)
+                chunk = []
+        if chunk:
+            _write_chunk(chunk, terminator)
+    except BrokenPipeError:
+        close_stdout()
+
+
+def write_text(text: str) -> None:
+    try:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        close_stdout()
+
+
+# Points stdout at /dev/null, otherwise flushing it at exit raises BrokenPipeError again.
+def close_stdout() -> None:
+    try:
+        fd = sys.stdout.fileno()
+    except (AttributeError, ValueError, OSError):
+        return
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, fd)
+    os.close(devnull)
+
+
+def _write_chunk(chunk: typing.List[str], terminator: str) -> None:
+    sys.stdout.write(terminator.join(chunk) + terminator)
+    sys.stdout.flush()
@@ -0,0 +1,124 @@
+import json
+import math
+import os
+import typing
+from collections import Counter
+from dataclasses import dataclass
+
+from command_reminder.common import FilesMixin
+from command_reminder.config.config import Configuration
+from command_reminder.operations.helpers.files import atomic_write
+from command_reminder.operations.helpers.index import CommandsIndex, IndexedRepository
+from command_reminder.operations.helpers.tag_query import TagQuery
+from command_reminder.tracing import span
+
+TRIGRAM_LENGTH = 3
+# share of the query's trigrams a command has to contain to be a fuzzy match
+MIN_SIMILARITY = 0.5
+NAME_MATCH_SCORE = 3
+COMMAND_MATCH_SCORE = 2
+
+Postings = typing.Dict[str, typing.List[int]]
+
+
+@dataclass
+class SearchMatch:
+    name: str
+    command: str
+    repo: str
+    score: float
+
+
+def trigrams(text: str) -> typing.Set[str]:
+    return {text[i:i + TRIGRAM_LENGTH] for i in range(len(text) - TRIGRAM_LENGTH + 1)}
+
+
+# Trigram postings of commands' names and bodies, one file per repository next to the commands index.
+class SearchIndex(FilesMixin):
+    def __init__(self, config: Configuration, index: CommandsIndex):
+        self._config = config
+        self._index = index
+        self._postings: typing.Dict[str, typing.Tuple[int, Postings]] = {}
+
+    # Commands containing the query score above the fuzzy matches, those containing it in their name the highest.
+    # Within a group, the larger the share of the name or command the query covers, the higher the score.
+    def search(self, query: str) -> typing.List[SearchMatch]:
+        needle = query.strip().lower()
+        if not needle:
+            return []
+        needle_trigrams = trigrams(needle)
+        min_shared = math.ceil(len(needle_trigrams) * MIN_SIMILARITY)
+        repos = self._index.repositories()
+        matches = []
+        for repo in repos:
+            shared = Counter()
+            if needle_trigrams:
+                postings = self._load_postings(repo)
+                for trigram in needle_trigrams:
+                    shared.update(postings.get(trigram, ()))
+                positions = sorted(p for (p, count) in shared.items() if count >= min_shared)
+            else:
+                # too short to have a trigram, matched as a substring only
+                positions = range(repo.count)
+            repo_name = os.path.basename(repo.repo_dir)
+            for (position, (name, command, _)) in zip(positions, self._index.commands_at(repo, positions)):
+                similarity = shared[position] / len(needle_trigrams) if needle_trigrams else 0
+                score = self._score(needle, name.lower(), command.lower(), similarity)
+                if score:
+                    matches.append(SearchMatch(name=name, command=command, repo=repo_name, score=score))
+        self._remove_stale_files(repos)
+        return sorted(matches, key=lambda m: -m.score)
+
+    @staticmethod
+    def _score(needle: str, name: str, command: str, similarity: float) -> float:
+        if needle in name:
+            return NAME_MATCH_SCORE + len(needle) / len(name)
+        if needle in command:
+            return COMMAND_MATCH_SCORE + len(needle) / len(command)
+        return similarity if similarity >= MIN_SIMILARITY else 0
+
+    def _load_postings(self, repo: IndexedRepository) -> Postings:
+        path = self._postings_file(repo)
+        cached = self._postings.get(path)
+        if cached and cached[0] == repo.indexed_at:
+            return cached[1]
+        with span('search.read_postings'):
+            postings = self._read_postings(path, repo.indexed_at)
+        if postings is None:
+            with span('search.build_postings'):
+                postings = self._build_postings(repo, path)
+        self._postings[path] = (repo.indexed_at, postings)
+        return postings
+
+    def _build_postings(self, repo: IndexedRepository, path: str) -> Postings:
+        postings = {}
+        for (position, (name, command, _)) in enumerate(self._index.find(repo, TagQuery.parse([]))):
+            for trigram in trigrams(f'{name}\n{command}'.lower()):
+                postings.setdefault(trigram, []).append(position)
+        self._create_dir(self._config.search_index_dir)
+        atomic_write(path, json.dumps({'indexed_at': repo.indexed_at}) + '\n' + json.dumps(postings) + '\n')
+        return postings
+
+    @staticmethod
+    def _read_postings(path: str, indexed_at: int) -> typing.Optional[Postings]:
+        try:
+            with open(path, 'r') as f:
+                if json.loads(f.readline()).get('indexed_at') != indexed_at:
+                    return None
+                return json.loads(f.readline())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _postings_file(self, repo: IndexedRepository) -> str:
+        return os.path.join(self._config.search_index_dir, os.path.basename(repo.shard_file))
+
+    def _remove_stale_files(self, repos: typing.List[IndexedRepository]) -> None:
+        current = {os.path.basename(r.shard_file) for r in repos}
+        try:
+            file_names = os.listdir(self._config.search_index_dir)
+        except FileNotFoundError:
+            return
+        for file_name in file_names:
+            if file_name not in current:
+                os.remove(os.path.join(self._config.search_index_dir, file_name))
+                self._postings.pop(os.path.join(self._config.search_index_dir, file_name), None)
@@ -0,0 +1,171 @@
+import json
+import sqlite3
+import typing
+from contextlib import contextmanager
+
+from command_reminder.operations.helpers.files import file_fingerprint, FileFingerprint
+from command_reminder.operations.helpers.journal import CommandsJournal, Commands
+from command_reminder.operations.helpers.store import CommandStore, StoredCommand
+from command_reminder.operations.helpers.tag_query import TagQuery
+
+BUSY_TIMEOUT_SECONDS = 10
+# fingerprints of the repository's commands file and journal as of the last import or export
+EXPORTED_FINGERPRINT_KEY = 'exported_fingerprint'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS commands (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    command TEXT NOT NULL,
+    tags TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    command_id INTEGER NOT NULL,
+    PRIMARY KEY (tag, command_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tags_command_id ON tags (command_id);
+CREATE TABLE IF NOT EXISTS exported (
+    name TEXT PRIMARY KEY,
+    entry TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+'''
+
+
+# Commands of the main repository kept in an SQLite database, merged with `commands.json` shared via git.
+class SqliteCommandStore(CommandStore):
+    def __init__(self, db_file: str, repo_dir: str):
+        self._db_file = db_file
+        self._journal = CommandsJournal(repo_dir)
+        self._connection: typing.Optional[sqlite3.Connection] = None
+
+    def get(self, name: str) -> typing.Optional[StoredCommand]:
+        row = self._connect().execute('SELECT name, command, tags FROM commands WHERE name = ?', (name,)).fetchone()
+        return self._to_command(row) if row else None
+
+    def put(self, name: str, command: str, tags: typing.List[str]) -> None:
+        self.put_many([(name, command, tags)])
+
+    def put_many(self, entries: typing.Iterable[StoredCommand]) -> None:
+        with self._transaction() as connection:
+            self._upsert(connection, entries)
+
+    def delete(self, name: str) -> None:
+        with self._transaction() as connection:
+            self._delete(connection, name)
+
+    def query(self, query: TagQuery) -> typing.Iterator[StoredCommand]:
+        conditions = []
+        parameters = []
+        for clause in query.clauses:
+            literals = []
+            for literal in clause:
+                operator = 'NOT IN' if literal.negated else 'IN'
+                literals.append(f'id {operator} (SELECT command_id FROM tags WHERE tag = ?)')
+                parameters.append(literal.tag)
+            conditions.append('(' + ' OR '.join(literals) + ')')
+        where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+        rows = self._connect().execute(f'SELECT name, command, tags FROM commands{where} ORDER BY id', parameters)
+        return (self._to_command(row) for row in rows)
+
+    def iterate(self) -> typing.Iterator[StoredCommand]:
+        return self.query(TagQuery([]))
+
+    def fingerprint(self) -> typing.List[FileFingerprint]:
+        # the JSON files are included, so an import pending on the next use is noticed too
+        return [*self._json_fingerprint(), file_fingerprint(self._db_file)]
+
+    def export(self) -> None:
+        with self._transaction() as connection:
+            rows = connection.execute('SELECT name, command, tags FROM commands ORDER BY id')
+            commands = {name: [command, json.loads(tags)] for (name, command, tags) in rows}
+            self._journal.replace_all(commands)
+            self._set_exported(connection, commands, json.dumps(self._json_fingerprint()))
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self._db_file, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+            self._connection.executescript(SCHEMA)
+        # a long-running process keeps the connection, so the JSON files are re-checked on every use
+        self._import_if_changed()
+        return self._connection
+
+    def _transaction(self) -> typing.ContextManager[sqlite3.Connection]:
+        return self._immediate_transaction(self._connect())
+
+    @staticmethod
+    @contextmanager
+    def _immediate_transaction(connection: sqlite3.Connection) -> typing.Iterator[sqlite3.Connection]:
+        # takes the write lock upfront, so concurrent writers wait on the busy timeout instead of failing mid-way
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def _import_if_changed(self) -> None:
+        if self._exported_fingerprint(self._connection) == json.dumps(self._json_fingerprint()):
+            return
+        with self._immediate_transaction(self._connection) as connection:
+            # another process may have imported it in the meantime
+            if self._exported_fingerprint(connection) == json.dumps(self._json_fingerprint()):
+                return
+            self._journal.compact()
+            # taken before the read, so a change made meanwhile is merged again on the next use
+            fingerprint = json.dumps(self._json_fingerprint())
+            commands = self._journal.load()
+            exported = dict(connection.execute('SELECT name, entry FROM exported'))
+            self._upsert(connection, [(name, command, tags) for (name, (command, tags)) in commands.items()
+                                      if exported.get(name) != json.dumps([command, tags])])
+            for name in exported.keys() - commands.keys():
+                self._delete(connection, name)
+            self._set_exported(connection, commands, fingerprint)
+
+    @staticmethod
+    def _upsert(connection: sqlite3.Connection, entries: typing.Iterable[StoredCommand]) -> None:
+        for (name, command, tags) in entries:
+            # updating in place keeps the id, so the command stays where it was recorded. Plain statements rather than
+            # an upsert with RETURNING, which SQLite bundled with older Pythons does not support.
+            row = connection.execute('SELECT id FROM commands WHERE name = ?', (name,)).fetchone()
+            if row:
+                (command_id,) = row
+                connection.execute('UPDATE commands SET command = ?, tags = ? WHERE id = ?',
+                                   (command, json.dumps(tags), command_id))
+                connection.execute('DELETE FROM tags WHERE command_id = ?', (command_id,))
+            else:
+                command_id = connection.execute('INSERT INTO commands (name, command, tags) VALUES (?, ?, ?)',
+                                                (name, command, json.dumps(tags))).lastrowid
+            connection.executemany('INSERT INTO tags (tag, command_id) VALUES (?, ?)',
+                                   [(t, command_id) for t in set(tags)])
+
+    @staticmethod
+    def _delete(connection: sqlite3.Connection, name: str) -> None:
+        connection.execute('DELETE FROM tags WHERE command_id IN (SELECT id FROM commands WHERE name = ?)', (name,))
+        connection.execute('DELETE FROM commands WHERE name = ?', (name,))
+
+    @staticmethod
+    def _exported_fingerprint(connection: sqlite3.Connection) -> typing.Optional[str]:
+        row = connection.execute('SELECT value FROM meta WHERE key = ?', (EXPORTED_FINGERPRINT_KEY,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _set_exported(connection: sqlite3.Connection, commands: Commands, fingerprint: str) -> None:
+        connection.execute('DELETE FROM exported')
+        connection.executemany('INSERT INTO exported (name, entry) VALUES (?, ?)',
+                               [(name, json.dumps(entry)) for (name, entry) in commands.items()])
+        connection.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                           (EXPORTED_FINGERPRINT_KEY, fingerprint))
+
+    def _json_fingerprint(self) -> typing.List[FileFingerprint]:
+        return [file_fingerprint(self._journal.commands_file), file_fingerprint(self._journal.journal_file)]
+
+    @staticmethod
+    def _to_command(row: typing.Tuple[str, str, str]) -> StoredCommand:
+        (name, command, tags) = row
+        return name, command, json.loads(tags)
@@ -0,0 +1,94 @@
+import os
+import typing
+from abc import ABC, abstractmethod
+
+from command_reminder.config.config import Configuration, COMMAND_STORE_ENV
+from command_reminder.exceptions import InvalidArgumentException
+from command_reminder.operations.helpers.files import file_fingerprint, FileFingerprint
+from command_reminder.operations.helpers.journal import CommandsJournal
+from command_reminder.operations.helpers.tag_query import TagQuery
+
+JSON_STORE = 'json'
+SQLITE_STORE = 'sqlite'
+STORE_BACKENDS = [JSON_STORE, SQLITE_STORE]
+
+StoredCommand = typing.Tuple[str, str, typing.List[str]]
+
+
+# Commands of a repository, as (name, command, tags), kept in recording order.
+class CommandStore(ABC):
+    @abstractmethod
+    def get(self, name: str) -> typing.Optional[StoredCommand]:
+        pass
+
+    @abstractmethod
+    def put(self, name: str, command: str, tags: typing.List[str]) -> None:
+        pass
+
+    @abstractmethod
+    def put_many(self, entries: typing.Iterable[StoredCommand]) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, name: str) -> None:
+        pass
+
+    @abstractmethod
+    def query(self, query: TagQuery) -> typing.Iterator[StoredCommand]:
+        pass
+
+    @abstractmethod
+    def iterate(self) -> typing.Iterator[StoredCommand]:
+        pass
+
+    # stats of the files backing the store, starting with the commands file, they change whenever the commands do
+    @abstractmethod
+    def fingerprint(self) -> typing.List[FileFingerprint]:
+        pass
+
+    # brings the repository's `commands.json` up to date, so it can be shared via git
+    @abstractmethod
+    def export(self) -> None:
+        pass
+
+
+class JsonCommandStore(CommandStore):
+    def __init__(self, repo_dir: str):
+        self.journal = CommandsJournal(repo_dir)
+
+    def get(self, name: str) -> typing.Optional[StoredCommand]:
+        stored = self.journal.load().get(name)
+        return (name, stored[0], stored[1]) if stored else None
+
+    def put(self, name: str, command: str, tags: typing.List[str]) -> None:
+        self.journal.put(name, command, tags)
+
+    def put_many(self, entries: typing.Iterable[StoredCommand]) -> None:
+        self.journal.put_many(entries)
+
+    def delete(self, name: str) -> None:
+        self.journal.delete(name)
+
+    def query(self, query: TagQuery) -> typing.Iterator[StoredCommand]:
+        return (c for c in self.iterate() if query.matches(c[2]))
+
+    def iterate(self) -> typing.Iterator[StoredCommand]:
+        for (name, (command, tags)) in self.journal.load().items():
+            yield name, command, tags
+
+    def fingerprint(self) -> typing.List[FileFingerprint]:
+        return [file_fingerprint(self.journal.commands_file), file_fingerprint(self.journal.journal_file)]
+
+    def export(self) -> None:
+        self.journal.compact()
+
+
+def open_main_store(config: Configuration) -> CommandStore:
+    backend = os.getenv(COMMAND_STORE_ENV) or JSON_STORE
+    if backend == JSON_STORE:
+        return JsonCommandStore(config.main_repository_dir)
+    if backend == SQLITE_STORE:
+        from command_reminder.operations.helpers.sqlite_store import SqliteCommandStore
+        return SqliteCommandStore(config.sqlite_store_file, config.main_repository_dir)
+    raise InvalidArgumentException(
+        f'Unknown commands store "{backend}" in ${COMMAND_STORE_ENV}, use one of: {", ".join(STORE_BACKENDS)}')
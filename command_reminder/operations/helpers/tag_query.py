@@ -0,0 +1,55 @@
+import typing
+from dataclasses import dataclass
+
+OR_SEPARATOR = '|'
+NOT_PREFIX = '!'
+
+
+@dataclass
+class TagLiteral:
+    tag: str
+    negated: bool
+
+
+# Tags query in conjunctive form, e.g. ['k8s', '!prod|staging'] means k8s AND (NOT prod OR staging).
+@dataclass
+class TagQuery:
+    clauses: typing.List[typing.List[TagLiteral]]
+
+    @staticmethod
+    def parse(terms: typing.List[str]) -> 'TagQuery':
+        clauses = []
+        for term in terms:
+            literals = [TagQuery._parse_literal(t) for t in term.split(OR_SEPARATOR) if t and t != NOT_PREFIX]
+            if literals:
+                clauses.append(literals)
+        return TagQuery(clauses)
+
+    def is_empty(self) -> bool:
+        return not self.clauses
+
+    def matches(self, tags: typing.List[str]) -> bool:
+        return all(any((literal.tag in tags) != literal.negated for literal in clause) for clause in self.clauses)
+
+    # False when no command with tags from the given set can match, e.g. for a repository lacking a required tag
+    def may_match(self, all_tags: typing.Iterable[str]) -> bool:
+        return all(any(literal.negated or literal.tag in all_tags for literal in clause) for clause in self.clauses)
+
+    def evaluate(self, postings: typing.Callable[[str], int], count: int) -> int:
+        universe = (1 << count) - 1
+        result = universe
+        for clause in self.clauses:
+            clause_mask = 0
+            for literal in clause:
+                mask = postings(literal.tag)
+                clause_mask |= (universe & ~mask) if literal.negated else mask
+            result &= clause_mask
+            if not result:
+                break
+        return result
+
+    @staticmethod
+    def _parse_literal(term: str) -> TagLiteral:
+        if term.startswith(NOT_PREFIX):
+            return TagLiteral(term[len(NOT_PREFIX):], negated=True)
+        return TagLiteral(term, negated=False)
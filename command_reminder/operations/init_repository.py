@@ -1,34 +1,54 @@
 import os
+import typing
 from dataclasses import dataclass
 
 from command_reminder.config.config import Configuration, FISH_FUNCTIONS_PATH_ENV, FISH_FUNCTIONS_DIR_NAME, \
-    HISTORY_LOAD_FILE_NAME
+    HISTORY_LOAD_FILE_NAME, COMMANDS_FILE_NAME, COMMANDS_JOURNAL_FILE_NAME, FISH_COMPLETE_PATH_ENV, \
+    FISH_FUNCTION_EXTENSION
 from command_reminder.operations.base_processor import Processor, OperationData
 from command_reminder.operations.helpers.dir_viewer import DirectoriesViewer
+from command_reminder.operations.helpers.fish_completions import FishCompletions
 from command_reminder.operations.helpers.git import GitRepositoryManager
+from command_reminder.operations.helpers.index import CommandsIndex
+from command_reminder.operations.helpers.init_script import InitScriptCache
+from command_reminder.tracing import span
 
 
 @dataclass
 class InitOperationDto(OperationData):
     repo: str
+    bundle: bool = False
 
 
 class InitRepositoryProcessor(Processor):
-    def __init__(self, config: Configuration, git_repo: GitRepositoryManager, dir_viewer: DirectoriesViewer):
+    def __init__(self, config: Configuration, git_repo: GitRepositoryManager, dir_viewer: DirectoriesViewer,
+                 index: CommandsIndex):
         self._config = config
         self._git_repo = git_repo
         self._dir_viewer = dir_viewer
+        self._index = index
 
     def process(self, data: OperationData) -> None:
         if not isinstance(data, InitOperationDto):
             return
         self._validate(data)
         self._create_dir(self._config.main_repository_fish_functions)
-        self._init_git_repo(self._config.main_repository_dir, data.repo)
+        with span('init.git'):
+            self._init_git_repo(self._config.main_repository_dir, data.repo)
         self._create_empty_file(self._config.main_repository_commands_file)
         self._create_empty_file(self._config.config_file)
         self._create_load_history_alias()
-        self._generate_init_script()
+        with span('init.completions'):
+            FishCompletions(self._config, self._index).update()
+        with span('init.script'):
+            if data.bundle:
+                script = self._bundled_script()
+            else:
+                script = self._script_with_functions_dirs()
+            script += '\n' + self._completions_script()
+            print(script)
+        with span('init.cache_script'):
+            self._cache_script(script, data.bundle)
 
     def _validate(self, data: InitOperationDto) -> None:
         if data.repo:
@@ -38,8 +58,35 @@ class InitRepositoryProcessor(Processor):
         if repo:
             self._git_repo.init_repo(directory, repo)
 
-    def _generate_init_script(self) -> None:
-        print(self._script_with_functions_dirs())
+    def _bundled_script(self) -> str:
+        from command_reminder.operations.helpers.fish_bundles import FishBundles
+        return '\n'.join(f'source {b}' for b in FishBundles(self._config, self._index).bundle_files())
+
+    def _cache_script(self, script: str, bundle: bool) -> None:
+        # new or removed external repositories change the external directory, a new fish directory its repository
+        dependencies = [self._config.external_repositories_directory()]
+        for repo_dir in self._dir_viewer.list_all_repo_directories():
+            dependencies.append(repo_dir)
+            if bundle:
+                dependencies.extend(os.path.join(repo_dir, f) for f in
+                                    (COMMANDS_FILE_NAME, COMMANDS_JOURNAL_FILE_NAME, FISH_FUNCTIONS_DIR_NAME))
+                # a hand-written function edited in place changes only its own mtime
+                dependencies.extend(self._fish_files(os.path.join(repo_dir, FISH_FUNCTIONS_DIR_NAME)))
+        if bundle:
+            # the sqlite store keeps the main repository's commands outside of its directory
+            dependencies.append(self._config.sqlite_store_file)
+        InitScriptCache(self._config).write(script + '\n', bundle, dependencies)
+
+    @staticmethod
+    def _fish_files(fish_dir: str) -> typing.List[str]:
+        try:
+            with os.scandir(fish_dir) as entries:
+                return [e.path for e in entries if e.name.endswith(FISH_FUNCTION_EXTENSION) and e.is_file()]
+        except FileNotFoundError:
+            return []
+
+    def _completions_script(self) -> str:
+        return f'set -gx {FISH_COMPLETE_PATH_ENV} ${FISH_COMPLETE_PATH_ENV} {self._config.main_repository_fish_completions}'
 
     def _script_with_functions_dirs(self) -> str:
         script = f'set -gx {FISH_FUNCTIONS_PATH_ENV} ${FISH_FUNCTIONS_PATH_ENV}'
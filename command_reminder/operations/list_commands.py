@@ -1,64 +1,67 @@
+import itertools
 import os
 import typing
 from dataclasses import dataclass
 
-from command_reminder.config.config import Configuration, COMMANDS_FILE_NAME
+from command_reminder.config.config import Configuration
+from command_reminder.exceptions import InvalidArgumentException
 from command_reminder.operations.base_processor import Processor, OperationData
-from command_reminder.operations.helpers.files import read_file_content
-from command_reminder.operations.helpers.dir_viewer import DirectoriesViewer
+from command_reminder.operations.helpers.command_formats import TEXT_FORMAT, NUL_FORMAT, NUL_SEPARATOR, \
+    format_command_records
+from command_reminder.operations.helpers.index import CommandsIndex
+from command_reminder.operations.helpers.output import write_lines
+from command_reminder.operations.helpers.tag_query import TagQuery
+from command_reminder.tracing import span
 
 
 @dataclass
 class ListOperationDto(OperationData):
     tags: typing.List[str]
     pretty: bool
+    limit: typing.Optional[int] = None
+    offset: int = 0
+    format: str = TEXT_FORMAT
 
 
 @dataclass
 class FoundCommandDto(OperationData):
     command: str
     name: str
+    tags: typing.List[str]
+    repo: str
 
 
 class ListCommandsProcessor(Processor):
-    def __init__(self, config: Configuration):
+    def __init__(self, config: Configuration, index: CommandsIndex):
         self._config = config
-        self._dict_viewer = DirectoriesViewer(config)
+        self._index = index
 
     def process(self, data: OperationData) -> None:
         if not isinstance(data, ListOperationDto):
             return
+        if data.offset < 0 or (data.limit is not None and data.limit < 0):
+            raise InvalidArgumentException('Limit and offset cannot be negative.')
 
-        results = self._get_commands_from_repos(data)
-        self._print_results(results, data.pretty)
-
-    def _get_commands_from_repos(self, data: ListOperationDto) -> typing.List[FoundCommandDto]:
-        results = []
-        for dir_path in self._dict_viewer.list_all_repo_directories():
-            if self._has_commands_file(dir_path):
-                with open(os.path.join(dir_path, COMMANDS_FILE_NAME), 'r') as f:
-                    commands = read_file_content(f)
-                    results.extend(self._search_for_commands_with_tags(commands, data.tags))
-        return results
+        # commands are searched, formatted and written lazily, one chunk at a time
+        with span('list.search_and_print'):
+            stop = data.offset + data.limit if data.limit is not None else None
+            results = itertools.islice(self._find_commands(data), data.offset, stop)
+            terminator = NUL_SEPARATOR if data.format == NUL_FORMAT else '\n'
+            write_lines(self._format_results(results, data), terminator)
 
-    def _print_results(self, results: typing.List[FoundCommandDto], pretty: bool):
-        for r in results:
-            if pretty:
-                self._print_colored(f"{r.name}: {r.command}")
-            else:
-                print(f"{r.name}: {r.command}")
-
-    @staticmethod
-    def _has_commands_file(external_dir_path: str):
-        return COMMANDS_FILE_NAME in os.listdir(external_dir_path)
+    def _find_commands(self, data: ListOperationDto) -> typing.Iterator[FoundCommandDto]:
+        query = TagQuery.parse(data.tags)
+        for repo in self._index.repositories():
+            repo_name = os.path.basename(repo.repo_dir)
+            for (name, content, tags) in self._index.find(repo, query):
+                yield FoundCommandDto(command=content, name=name, tags=tags, repo=repo_name)
 
     @staticmethod
-    def _search_for_commands_with_tags(commands: typing.Dict[str, typing.List[typing.List[str]]],
-                                       search_tags: typing.List[str]) -> typing.List[FoundCommandDto]:
-        results = []
-        search_tags = set(search_tags)
-        for (name, (content, tags)) in commands.items():
-            tags = set(tags)
-            if not search_tags or search_tags.issubset(tags):
-                results.append(FoundCommandDto(command=content, name=name))
-        return results
+    def _format_results(results: typing.Iterable[FoundCommandDto], data: ListOperationDto) -> typing.Iterator[str]:
+        if data.format != TEXT_FORMAT:
+            return format_command_records(({'name': r.name, 'command': r.command, 'tags': r.tags, 'repo': r.repo}
+                                           for r in results), data.format)
+        if not data.pretty:
+            return (f"{r.name}: {r.command}" for r in results)
+        from termcolor import colored
+        return (colored(f"{r.name}: {r.command}", 'blue') for r in results)
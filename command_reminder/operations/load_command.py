@@ -1,39 +1,89 @@
-import re
+import itertools
 import typing
 from dataclasses import dataclass
 
 from command_reminder import common
 
 from command_reminder.config.config import Configuration
+from command_reminder.exceptions import InvalidArgumentException
 from command_reminder.operations.base_processor import Processor, OperationData
+from command_reminder.operations.helpers.command_formats import TEXT_FORMAT, TEXT_LINE_REGEX, detect_list_format, \
+    read_command_records
+from command_reminder.operations.helpers.fish_history import escape_command
+from command_reminder.operations.helpers.history_index import RecentHistory
+from command_reminder.operations.helpers.index import CommandsIndex
+from command_reminder.operations.helpers.tag_query import TagQuery
+from command_reminder.tracing import span
+
+HISTORY_BATCH_SIZE = 1000
+HISTORY_WRITE_BUFFER_BYTES = 1024 * 1024
+DEFAULT_DEDUP_WINDOW = 1000
 
 
 @dataclass
 class LoadCommandsListDto(OperationData):
-    commands: typing.List[str]
+    commands: typing.Iterable[str]
+    window: int = DEFAULT_DEDUP_WINDOW
+    format: typing.Optional[str] = None
+
+
+@dataclass
+class LoadTaggedCommandsDto(OperationData):
+    tags: typing.List[str]
+    window: int = DEFAULT_DEDUP_WINDOW
 
 
 class LoadCommandProcessor(Processor):
-    COMMAND_LINE_REGEX = "[\\w+-]+: (.+)"
+    COMMAND_LINE_REGEX = TEXT_LINE_REGEX
 
-    def __init__(self, config: Configuration):
+    def __init__(self, config: Configuration, index: CommandsIndex):
         self._config = config
+        self._index = index
 
     def process(self, data: OperationData) -> None:
-        if not isinstance(data, LoadCommandsListDto):
-            return
-        self._populate_fish_history(data.commands)
+        if isinstance(data, LoadCommandsListDto):
+            self._load(self._read_commands(data.commands, data.format), data.window)
+        elif isinstance(data, LoadTaggedCommandsDto):
+            self._load(self._find_commands(data.tags), data.window)
+
+    def _load(self, commands: typing.Iterable[str], window: int) -> None:
+        if window < 0:
+            raise InvalidArgumentException('Deduplication window cannot be negative.')
+        with span('load.read_recent_history'):
+            recent_history = RecentHistory(self._config.fish_history_file, self._config.history_index_file, window)
+            recent_history.read()
+        with span('load.write_history'):
+            self._populate_fish_history(commands, recent_history)
+        with span('load.save_recent_history'):
+            recent_history.save()
 
-    def _populate_fish_history(self, commands: typing.List[str]):
-        with open(self._config.fish_history_file, 'a') as f:
-            for c in self._preprocess(commands):
-                f.writelines([f'- cmd: {c}\n',
-                              f'  when: {common.get_timestamp()}\n'])
+    def _populate_fish_history(self, commands: typing.Iterable[str], recent_history: RecentHistory):
+        # commands already among the recent history items are skipped, also when repeated within the input
+        parsed_commands = (c for c in commands if recent_history.add(c))
+        with open(self._config.fish_history_file, 'a', buffering=HISTORY_WRITE_BUFFER_BYTES) as f:
+            while batch := list(itertools.islice(parsed_commands, HISTORY_BATCH_SIZE)):
+                timestamp = common.get_timestamp()
+                f.write(''.join(f'- cmd: {escape_command(c)}\n  when: {timestamp}\n' for c in batch))
 
-    def _preprocess(self, commands: typing.List[str]) -> typing.Iterable[str]:
-        filtered_commands = filter(lambda s: s.strip() and not s.strip().isspace(), commands)
-        parsed_commands = list(map(lambda s: s.strip(), filtered_commands))
+    def _read_commands(self, source: typing.Iterable[str], fmt: typing.Optional[str]) -> typing.Iterator[str]:
+        if not fmt:
+            (fmt, source) = detect_list_format(source)
+        if fmt == TEXT_FORMAT:
+            yield from self._parse_text(source)
+            return
+        for (location, record) in read_command_records(source, fmt):
+            command = record.get('command') if isinstance(record, dict) else None
+            if not isinstance(command, str) or not command.strip():
+                raise InvalidArgumentException(f'{location}: command must be a non empty string')
+            yield command
 
-        for fc in parsed_commands:
-            if match := re.match(self.COMMAND_LINE_REGEX, fc):
+    def _parse_text(self, lines: typing.Iterable[str]) -> typing.Iterator[str]:
+        for line in lines:
+            if match := self.COMMAND_LINE_REGEX.match(line.strip()):
                 yield match.group(1)
+
+    def _find_commands(self, tags: typing.List[str]) -> typing.Iterator[str]:
+        query = TagQuery.parse(tags)
+        for repo in self._index.repositories():
+            for (_, command, _) in self._index.find(repo, query):
+                yield command
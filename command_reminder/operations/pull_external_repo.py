@@ -1,25 +1,47 @@
+import json
 import os
+import subprocess
+import typing
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 
 from command_reminder.config.config import Configuration
-from command_reminder.exceptions import InvalidArgumentException
+from command_reminder.exceptions import InvalidArgumentException, RefreshFailedException
 from command_reminder.operations.base_processor import Processor, OperationData
-from command_reminder.operations.helpers.git import GitRepositoryManager, ParsedGitRepository
+from command_reminder.operations.helpers.files import atomic_write
+from command_reminder.operations.helpers.fish_completions import FishCompletions
+from command_reminder.operations.helpers.git import GitRepositoryManager, ParsedGitRepository, Deadline
+from command_reminder.operations.helpers.index import CommandsIndex
 from command_reminder.config.peristent_repository_config import PersistentConfig
+from command_reminder.tracing import span
+
+DEFAULT_REFRESH_JOBS = 4
+DEFAULT_REFRESH_TIMEOUT_SECONDS = 300
 
 
 @dataclass
 class PullExternalRepositoryDto:
     repo: str
     refresh_all: bool
+    jobs: int = DEFAULT_REFRESH_JOBS
+    timeout: typing.Optional[float] = DEFAULT_REFRESH_TIMEOUT_SECONDS
+
+
+@dataclass
+class RefreshResult:
+    repo: str
+    error: typing.Optional[str] = None
+    head: typing.Optional[str] = None
+    changed: bool = True
 
 
 class PullExternalRepoProcessor(Processor):
     def __init__(self, config: Configuration, persistent_config: PersistentConfig,
-                 git_repo_manager: GitRepositoryManager):
+                 git_repo_manager: GitRepositoryManager, index: CommandsIndex):
         self._config = config
         self._git_repo_manager = git_repo_manager
         self._persistent_config = persistent_config
+        self._completions = FishCompletions(config, index)
 
     def process(self, data: OperationData) -> None:
         if not isinstance(data, PullExternalRepositoryDto):
@@ -27,31 +49,103 @@ class PullExternalRepoProcessor(Processor):
         if data.repo and data.refresh_all:
             raise InvalidArgumentException(
                 'Use only one option --update_all or --repo while pulling external repositories.')
+        if data.jobs < 1:
+            raise InvalidArgumentException('Number of jobs must be positive.')
         if data.repo:
             self._pull_single_repository(data.repo)
         elif data.refresh_all:
-            self._refresh_all_repositories()
+            self._refresh_all_repositories(data.jobs, data.timeout)
 
     def _pull_single_repository(self, repo_url: str):
         parsed_repo = self._git_repo_manager.validate(repo_url)
         external_repo_directory = self._get_target_dir_path(parsed_repo)
-        self._prepare_external_repo_dir(repo_url, external_repo_directory)
+        with span('pull.clone'):
+            self._prepare_external_repo_dir(repo_url, external_repo_directory)
         self._persistent_config.save_external_repo(repo_url)
+        self._save_heads({repo_url: self._git_repo_manager.local_head(external_repo_directory)})
+        with span('pull.completions'):
+            self._completions.update()
 
-    def _prepare_external_repo_dir(self, repo: str, external_repo_directory: str):
+    def _prepare_external_repo_dir(self, repo: str, external_repo_directory: str,
+                                   timeout: typing.Optional[float] = None, quiet: bool = False):
         self._create_dir(external_repo_directory)
-        self._git_repo_manager.init_repo(external_repo_directory, repo)
+        self._git_repo_manager.clone_external_repo(external_repo_directory, repo, timeout, quiet)
 
     def _get_target_dir_path(self, parsed_repo: ParsedGitRepository):
         external_repo_dir_name = (parsed_repo.owner + '_' + parsed_repo.name).replace('-', '_')
         target_directory = os.path.join(self._config.external_repository_directory(external_repo_dir_name))
         return target_directory
 
-    def _refresh_all_repositories(self):
-        for repo_url in self._persistent_config.get_external_repositories():
+    def _refresh_all_repositories(self, jobs: int, timeout: typing.Optional[float]):
+        repo_urls = self._persistent_config.get_external_repositories()
+        heads = self._read_heads()
+        with span('pull.refresh_repositories'), ThreadPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(lambda url: self._refresh_repository(url, heads.get(url), timeout),
+                                        repo_urls))
+        self._save_heads({r.repo: r.head for r in results if r.changed})
+        if any(r.changed and not r.error for r in results):
+            with span('pull.completions'):
+                self._completions.update()
+        self._print_summary(results)
+
+    def _refresh_repository(self, repo_url: str, last_head: typing.Optional[str],
+                            timeout: typing.Optional[float]) -> RefreshResult:
+        # the timeout is for the whole repository, every git command gets what the previous ones left
+        deadline = Deadline(timeout)
+        try:
             parsed_repo = self._git_repo_manager.validate(repo_url)
             external_repo_directory = self._get_target_dir_path(parsed_repo)
             if os.path.exists(external_repo_directory):
-                self._git_repo_manager.pull_changes_from_remote(external_repo_directory)
+                # a single ref lookup instead of a fetch when the remote did not move since the last refresh
+                remote_head = self._git_repo_manager.remote_head(external_repo_directory, deadline.remaining())
+                if remote_head and remote_head == last_head:
+                    return RefreshResult(repo_url, head=remote_head, changed=False)
+                self._git_repo_manager.refresh_external_repo(external_repo_directory, deadline.remaining(),
+                                                             quiet=True)
+            else:
+                self._prepare_external_repo_dir(repo_url, external_repo_directory, deadline.remaining(), quiet=True)
+            return RefreshResult(repo_url, head=self._git_repo_manager.local_head(external_repo_directory))
+        except subprocess.TimeoutExpired:
+            return RefreshResult(repo_url, f'timed out after {timeout}s')
+        except subprocess.CalledProcessError as e:
+            return RefreshResult(repo_url, self._describe_git_error(e))
+        except InvalidArgumentException as e:
+            return RefreshResult(repo_url, str(e))
+        except OSError as e:
+            # e.g. git not installed, reported with the other repositories rather than aborting the refresh
+            return RefreshResult(repo_url, str(e))
+
+    def _read_heads(self) -> typing.Dict[str, str]:
+        try:
+            with open(self._config.external_heads_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_heads(self, changed: typing.Dict[str, typing.Optional[str]]) -> None:
+        heads = self._read_heads()
+        for (repo_url, head) in changed.items():
+            if head:
+                heads[repo_url] = head
+            else:
+                heads.pop(repo_url, None)
+        self._create_dir(self._config.index_dir)
+        atomic_write(self._config.external_heads_file, json.dumps(heads))
+
+    @staticmethod
+    def _describe_git_error(error: subprocess.CalledProcessError) -> str:
+        output = (error.stderr or '').strip()
+        if output:
+            return output.splitlines()[-1]
+        return str(error)
+
+    @staticmethod
+    def _print_summary(results: typing.List[RefreshResult]):
+        failed = [r for r in results if r.error]
+        for r in results:
+            if r.error:
+                print(f'{r.repo}: failed ({r.error})')
             else:
-                self._prepare_external_repo_dir(repo_url, external_repo_directory)
+                print(f'{r.repo}: updated' if r.changed else f'{r.repo}: unchanged')
+        if failed:
+            raise RefreshFailedException(f'Failed to refresh {len(failed)} of {len(results)} external repositories.')
@@ -1,19 +1,70 @@
+import json
+import typing
+
 from command_reminder.exceptions import InvalidArgumentException
 
 from command_reminder.operations.base_processor import Processor, OperationData
 
-from command_reminder.config.config import Configuration
+from command_reminder.config.config import Configuration, COMMANDS_FILE_NAME, CONFIG_FILE_NAME, \
+    FISH_FUNCTIONS_DIR_NAME, FISH_COMPLETIONS_DIR_NAME
 from command_reminder.operations.helpers.git import GitRepositoryManager
+from command_reminder.operations.helpers.store import CommandStore
+from command_reminder.tracing import span
+
+# generated completions are local to the machine
+PUSHED_PATHS = [COMMANDS_FILE_NAME, CONFIG_FILE_NAME, FISH_FUNCTIONS_DIR_NAME,
+                f':(exclude){FISH_FUNCTIONS_DIR_NAME}/{FISH_COMPLETIONS_DIR_NAME}']
+MAX_NAMED_COMMANDS = 3
 
 
 class PushCommandsToRepo(Processor):
-    def __init__(self, configuration: Configuration, git: GitRepositoryManager):
+    def __init__(self, configuration: Configuration, git: GitRepositoryManager, store: CommandStore):
         self._config = configuration
         self._git = git
+        self._store = store
 
     def process(self, operation: OperationData) -> None:
         main_dir = self._config.main_repository_dir
         if not self._git.is_git_repo(main_dir):
             raise InvalidArgumentException(f'Main directory: {main_dir} is not a git repo')
-        self._git.pull_changes_from_remote(main_dir)
-        self._git.push_changes_to_remote(main_dir)
+        with span('push.export'):
+            self._store.export()
+        with span('push.commit'):
+            changed_paths = self._git.changed_paths(main_dir, PUSHED_PATHS)
+            if changed_paths:
+                self._git.commit_paths(main_dir, changed_paths, self._commit_message(main_dir, changed_paths))
+            elif not self._git.has_unpushed_commits(main_dir):
+                print('Nothing to push.')
+                return
+        with span('push.pull'):
+            if self._git.remote_moved(main_dir):
+                self._git.pull_changes_from_remote(main_dir)
+        with span('push.push'):
+            self._git.push_changes_to_remote(main_dir)
+
+    def _commit_message(self, main_dir: str, changed_paths: typing.List[str]) -> str:
+        if COMMANDS_FILE_NAME not in changed_paths:
+            return 'Update ' + ', '.join(sorted({p.split('/')[0] for p in changed_paths}))
+        committed = self._parse_commands(self._git.file_at_head(main_dir, COMMANDS_FILE_NAME))
+        current = {name: [command, tags] for (name, command, tags) in self._store.iterate()}
+        parts = [
+            self._describe('Add', [n for n in current if n not in committed]),
+            self._describe('Remove', [n for n in committed if n not in current]),
+            self._describe('Update', [n for n in current if n in committed and current[n] != committed[n]]),
+        ]
+        return '; '.join(p for p in parts if p) or f'Update {COMMANDS_FILE_NAME}'
+
+    @staticmethod
+    def _parse_commands(content: typing.Optional[str]) -> dict:
+        try:
+            return json.loads(content) if content else {}
+        except ValueError:
+            return {}
+
+    @staticmethod
+    def _describe(verb: str, names: typing.List[str]) -> str:
+        if not names:
+            return ''
+        if len(names) > MAX_NAMED_COMMANDS:
+            return f'{verb} {len(names)} commands'
+        return f'{verb} ' + ', '.join(sorted(names))
@@ -1,11 +1,21 @@
-import json
 import os
+import sys
 import typing
 from dataclasses import dataclass
 
+from command_reminder.common import normalize_command_name, split_tags
 from command_reminder.config.config import Configuration
+from command_reminder.exceptions import InvalidArgumentException
 from command_reminder.operations.base_processor import Processor, OperationData
-from command_reminder.operations.helpers.files import read_file_content
+from command_reminder.operations.helpers.command_formats import detect_format, read_command_records
+from command_reminder.operations.helpers.fish_completions import FishCompletions
+from command_reminder.operations.helpers.fish_functions import fish_function
+from command_reminder.operations.helpers.index import CommandsIndex
+from command_reminder.operations.helpers.store import CommandStore
+from command_reminder.tracing import span
+
+STDIN_PATH = '-'
+MAX_REPORTED_ERRORS = 10
 
 
 @dataclass
@@ -15,41 +25,91 @@ class RecordCommandOperationDto(OperationData):
     tags: typing.List[str]
 
 
-class RecordCommandProcessor(Processor):
-    ECHO_COLOR = 'blue'
+@dataclass
+class ImportCommandsOperationDto(OperationData):
+    path: str
+    format: typing.Optional[str]
 
-    def __init__(self, config: Configuration):
+
+class RecordCommandProcessor(Processor):
+    def __init__(self, config: Configuration, store: CommandStore, index: CommandsIndex):
         self._config = config
+        self._store = store
+        self._completions = FishCompletions(config, index)
 
     def process(self, data: OperationData) -> None:
-        if not isinstance(data, RecordCommandOperationDto):
-            return
-        self._append_command(data)
-        self._create_fish_function(data)
+        if isinstance(data, RecordCommandOperationDto):
+            with span('record.store_put'):
+                self._append_command(data)
+            with span('record.fish_function'):
+                self._create_fish_function(data)
+        elif isinstance(data, ImportCommandsOperationDto):
+            self._import_commands(data)
 
     def _append_command(self, data: RecordCommandOperationDto) -> None:
-        flags = 'w+'
-        if os.path.exists(self._config.main_repository_commands_file):
-            flags = 'r+'
-        with open(self._config.main_repository_commands_file, flags) as f:
-            commands = read_file_content(f)
-            f.seek(0)
-            commands[data.name] = (data.command, self._preprocess_tags(data.tags))
-            json.dump(commands, f)
-            f.truncate()
+        tags = self._preprocess_tags(data.tags)
+        self._store.put(data.name, data.command, tags)
+        with span('record.completions'):
+            self._completions.add_commands([(data.name, data.command, tags)])
+
+    def _import_commands(self, data: ImportCommandsOperationDto) -> None:
+        fmt = data.format or detect_format(data.path)
+        with span('record.read_records'):
+            if data.path == STDIN_PATH:
+                records = self._validate_records(read_command_records(sys.stdin, fmt))
+            else:
+                with open(data.path, 'r') as f:
+                    records = self._validate_records(read_command_records(f, fmt))
+
+        commands = [(r.name, r.command, self._preprocess_tags(r.tags)) for r in records]
+        with span('record.store_put_many'):
+            self._store.put_many(commands)
+        with span('record.completions'):
+            self._completions.add_commands(commands)
+        with span('record.fish_functions'):
+            self._create_dir(self._config.main_repository_fish_functions)
+            for r in records:
+                self._create_fish_function(r)
+        print(f'Imported {len(records)} commands.')
+
+    def _validate_records(self, raw_records) -> typing.List[RecordCommandOperationDto]:
+        records = []
+        errors = []
+        for (location, raw) in raw_records:
+            try:
+                records.append(self._to_record(raw))
+            except InvalidArgumentException as e:
+                errors.append(f'{location}: {e}')
+        if errors:
+            reported = '\n'.join(errors[:MAX_REPORTED_ERRORS])
+            raise InvalidArgumentException(f'Nothing imported, {len(errors)} invalid records:\n{reported}')
+        return records
+
+    @staticmethod
+    def _to_record(raw: typing.Any) -> RecordCommandOperationDto:
+        if not isinstance(raw, dict):
+            raise InvalidArgumentException('record must have name, command and optional tags')
+        name = raw.get('name')
+        command = raw.get('command')
+        tags = raw.get('tags') or []
+        if not isinstance(name, str) or not name.strip():
+            raise InvalidArgumentException('name must be a non empty string')
+        if not isinstance(command, str) or not command.strip():
+            raise InvalidArgumentException('command must be a non empty string')
+        if isinstance(tags, str):
+            tags = split_tags(tags)
+        if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+            raise InvalidArgumentException('tags must be a string or a list of strings')
+        return RecordCommandOperationDto(command=command, name=normalize_command_name(name.strip()), tags=tags)
 
     def _create_fish_function(self, data: RecordCommandOperationDto) -> None:
         fish_func_file = self._config.internal_fish_function_file(data.name)
         if os.path.exists(fish_func_file):
             return
         with open(fish_func_file, 'w+') as f:
-            f.write(f'''
-function {data.name}
-    set color {self.ECHO_COLOR}; echo '{data.command}'
-end''')
+            f.write(fish_function(data.name, data.command))
 
     @staticmethod
     def _preprocess_tags(tags: typing.List[str]) -> typing.List[str]:
         stripped = [t.strip() for t in tags]
         return [t for t in stripped if t]
-
@@ -1,11 +1,13 @@
-import json
 import os
 from dataclasses import dataclass
 
 from command_reminder.config.config import Configuration
 from command_reminder.operations.base_processor import Processor, OperationData
-from command_reminder.operations.helpers.files import read_file_content
+from command_reminder.operations.helpers.fish_completions import FishCompletions
+from command_reminder.operations.helpers.index import CommandsIndex
+from command_reminder.operations.helpers.store import CommandStore
 from command_reminder.exceptions import InvalidArgumentException
+from command_reminder.tracing import span
 
 
 @dataclass
@@ -14,28 +16,28 @@ class RemoveCommandDto:
 
 
 class RemoveCommandProcessor(Processor):
-    def __init__(self, config: Configuration):
+    def __init__(self, config: Configuration, store: CommandStore, index: CommandsIndex):
         super().__init__()
         self._config = config
+        self._store = store
+        self._completions = FishCompletions(config, index)
 
     def process(self, data: OperationData) -> None:
         if not isinstance(data, RemoveCommandDto):
             return
         if not os.path.exists(self._config.main_repository_commands_file):
             return
-        self.remove_command(data)
-        self.remove_fish_function(data)
+        with span('rm.store_delete'):
+            self.remove_command(data)
+        with span('rm.fish_function'):
+            self.remove_fish_function(data)
+        with span('rm.completions'):
+            self._completions.remove_command(data.command_name)
 
     def remove_command(self, data: RemoveCommandDto):
-        with open(self._config.main_repository_commands_file, 'r+') as f:
-            commands = read_file_content(f)
-            if data.command_name in commands:
-                del commands[data.command_name]
-            else:
-                raise InvalidArgumentException(f'Command {data.command_name} does not exist.')
-            f.seek(0)
-            json.dump(commands, f)
-            f.truncate()
+        if not self._store.get(data.command_name):
+            raise InvalidArgumentException(f'Command {data.command_name} does not exist.')
+        self._store.delete(data.command_name)
 
     def remove_fish_function(self, data: RemoveCommandDto):
         func_file = self._config.internal_fish_function_file(data.command_name)
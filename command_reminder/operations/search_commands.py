@@ -0,0 +1,32 @@
+from dataclasses import dataclass
+
+from command_reminder.config.config import Configuration
+from command_reminder.exceptions import InvalidArgumentException
+from command_reminder.operations.base_processor import Processor, OperationData
+from command_reminder.operations.helpers.index import CommandsIndex
+from command_reminder.operations.helpers.output import write_lines
+from command_reminder.operations.helpers.search_index import SearchIndex
+from command_reminder.tracing import span
+
+DEFAULT_SEARCH_LIMIT = 10
+
+
+@dataclass
+class SearchCommandsDto(OperationData):
+    query: str
+    limit: int = DEFAULT_SEARCH_LIMIT
+
+
+class SearchCommandsProcessor(Processor):
+    def __init__(self, config: Configuration, index: CommandsIndex):
+        self._config = config
+        self._search_index = SearchIndex(config, index)
+
+    def process(self, data: OperationData) -> None:
+        if not isinstance(data, SearchCommandsDto):
+            return
+        if data.limit < 0:
+            raise InvalidArgumentException('Limit cannot be negative.')
+        with span('search.match'):
+            matches = self._search_index.search(data.query)[:data.limit]
+        write_lines(f'{m.name}: {m.command}' for m in matches)
@@ -0,0 +1,54 @@
+import os
+import shutil
+import subprocess
+import sys
+import typing
+from dataclasses import dataclass
+
+from command_reminder.config.config import Configuration
+from command_reminder.exceptions import InvalidArgumentException
+from command_reminder.operations.base_processor import Processor, OperationData
+from command_reminder.operations.helpers.index import CommandsIndex
+from command_reminder.operations.helpers.name_index import NameIndex, NamedCommand
+from command_reminder.tracing import span
+
+FALLBACK_SHELL = '/bin/sh'
+
+
+@dataclass
+class ShowCommandDto(OperationData):
+    name: str
+    repo: typing.Optional[str] = None
+
+
+@dataclass
+class RunCommandDto(OperationData):
+    name: str
+    repo: typing.Optional[str] = None
+
+
+class ShowCommandProcessor(Processor):
+    def __init__(self, config: Configuration, index: CommandsIndex):
+        self._config = config
+        self._names = NameIndex(config, index)
+
+    def process(self, data: OperationData) -> None:
+        if isinstance(data, ShowCommandDto):
+            print(self._find(data.name, data.repo).command)
+        elif isinstance(data, RunCommandDto):
+            command = self._find(data.name, data.repo).command
+            with span('run.command'):
+                sys.stdout.flush()
+                # commands are recorded for fish, other shells are only a fallback
+                shell = shutil.which('fish') or os.getenv('SHELL') or FALLBACK_SHELL
+                result = subprocess.run([shell, '-c', command])
+            if result.returncode:
+                raise SystemExit(result.returncode)
+
+    def _find(self, name: str, repo: typing.Optional[str]) -> NamedCommand:
+        with span('names.lookup'):
+            found = self._names.lookup(name, repo)
+        if not found:
+            location = f' in repository {repo}' if repo else ''
+            raise InvalidArgumentException(f'Command {name} does not exist{location}.')
+        return found
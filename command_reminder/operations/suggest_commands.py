@@ -0,0 +1,93 @@
+import re
+import typing
+from dataclasses import dataclass
+
+from command_reminder.config.config import Configuration
+from command_reminder.exceptions import InvalidArgumentException
+from command_reminder.operations.base_processor import Processor, OperationData
+from command_reminder.operations.helpers.fish_history import CommandFrequencies, read_history
+from command_reminder.operations.helpers.index import CommandsIndex
+from command_reminder.operations.helpers.tag_query import TagQuery
+from command_reminder.tracing import span
+
+DEFAULT_SUGGESTIONS_LIMIT = 10
+DEFAULT_MIN_COUNT = 3
+DEFAULT_TRACKED_COMMANDS = 10000
+# shorter commands are faster to type than to look up
+MIN_COMMAND_LENGTH = 8
+NAME_WORDS = 3
+NAME_WORD_REGEX = re.compile('[a-z][a-z0-9]*')
+
+
+@dataclass
+class SuggestCommandsDto(OperationData):
+    limit: int = DEFAULT_SUGGESTIONS_LIMIT
+    min_count: int = DEFAULT_MIN_COUNT
+    tracked: int = DEFAULT_TRACKED_COMMANDS
+
+
+@dataclass
+class SuggestedCommandDto(OperationData):
+    name: str
+    command: str
+    count: int
+
+
+class SuggestCommandsProcessor(Processor):
+    def __init__(self, config: Configuration, index: CommandsIndex):
+        self._config = config
+        self._index = index
+
+    def process(self, data: OperationData) -> None:
+        if not isinstance(data, SuggestCommandsDto):
+            return
+        if data.limit < 1 or data.tracked < 1:
+            raise InvalidArgumentException('Number of suggestions and tracked commands must be positive.')
+
+        with span('suggest.recorded_commands'):
+            (recorded_names, recorded_commands) = self._recorded_commands()
+        with span('suggest.read_history'):
+            frequencies = CommandFrequencies(max(data.tracked, data.limit))
+            for item in read_history(self._config.fish_history_file):
+                command = item.command.strip()
+                if len(command) >= MIN_COMMAND_LENGTH and command not in recorded_commands:
+                    frequencies.add(command, item.when)
+        with span('suggest.print'):
+            self._print_suggestions(self._suggest(frequencies, recorded_names, data))
+
+    def _recorded_commands(self) -> typing.Tuple[typing.Set[str], typing.Set[str]]:
+        names = set()
+        commands = set()
+        query = TagQuery.parse([])
+        for repo in self._index.repositories():
+            for (name, content, _) in self._index.find(repo, query):
+                names.add(name)
+                commands.add(content.strip())
+        # running a recorded function shows up in the history under its name
+        return names, commands | names
+
+    def _suggest(self, frequencies: CommandFrequencies, taken_names: typing.Set[str],
+                 data: SuggestCommandsDto) -> typing.List[SuggestedCommandDto]:
+        suggestions = []
+        taken_names = set(taken_names)
+        for f in frequencies.most_frequent():
+            if f.count < data.min_count or len(suggestions) == data.limit:
+                break
+            name = self._suggest_name(f.command, taken_names)
+            taken_names.add(name)
+            suggestions.append(SuggestedCommandDto(name=name, command=f.command, count=f.count))
+        return suggestions
+
+    @staticmethod
+    def _suggest_name(command: str, taken_names: typing.Set[str]) -> str:
+        name = '_'.join(NAME_WORD_REGEX.findall(command.lower())[:NAME_WORDS]) or 'command'
+        candidate = name
+        suffix = 2
+        while candidate in taken_names:
+            candidate = f'{name}_{suffix}'
+            suffix += 1
+        return candidate
+
+    def _print_suggestions(self, suggestions: typing.List[SuggestedCommandDto]) -> None:
+        for s in suggestions:
+            self._print_colored(f'{s.name}: {s.command} (used {s.count} times)')
@@ -0,0 +1,106 @@
+import json
+import os
+import sys
+import time
+import typing
+
+TRACE_FILE_ENV = 'CR_TRACE'
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ('_tracer', '_name', '_record')
+
+    def __init__(self, tracer: 'Tracer', name: str):
+        self._tracer = tracer
+        self._name = name
+
+    def __enter__(self):
+        self._record = self._tracer.start(self._name)
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self._tracer.finish(self._record)
+        return False
+
+
+# Collects nested timing spans of a single command, spans are a shared no-op object while disabled.
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self._to_stderr = False
+        self._trace_file: typing.Optional[str] = None
+        self._records: typing.List[list] = []
+        self._depth = 0
+        self._started_at = time.perf_counter()
+
+    # `started_at` is when the traced command started, spans in the trace file are timed from it
+    def configure(self, to_stderr: bool, trace_file: typing.Optional[str],
+                  started_at: typing.Optional[float] = None) -> None:
+        self._to_stderr = to_stderr
+        self._trace_file = trace_file
+        self.enabled = to_stderr or bool(trace_file)
+        self._records = []
+        self._depth = 0
+        self._started_at = started_at if started_at is not None else time.perf_counter()
+
+    def span(self, name: str):
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, name)
+
+    def record(self, name: str, started_at: float) -> None:
+        if self.enabled:
+            self._records.append([name, self._depth, started_at, time.perf_counter() - started_at])
+
+    def start(self, name: str) -> list:
+        record = [name, self._depth, time.perf_counter(), None]
+        self._records.append(record)
+        self._depth += 1
+        return record
+
+    def finish(self, record: list) -> None:
+        record[3] = time.perf_counter() - record[2]
+        self._depth -= 1
+
+    def report(self) -> None:
+        if not self.enabled:
+            return
+        records = [r for r in self._records if r[3] is not None]
+        if self._to_stderr:
+            self._print_breakdown(records)
+        if self._trace_file:
+            self._write_json_lines(records)
+
+    @staticmethod
+    def _print_breakdown(records: typing.List[list]) -> None:
+        lines = ['cr timings:']
+        for (name, depth, _, duration) in records:
+            label = '  ' * (depth + 1) + name
+            lines.append(f'{label:<48}{duration * 1000:10.3f} ms')
+        print('\n'.join(lines), file=sys.stderr)
+
+    def _write_json_lines(self, records: typing.List[list]) -> None:
+        pid = os.getpid()
+        with open(self._trace_file, 'a') as f:
+            for (name, depth, started_at, duration) in records:
+                f.write(json.dumps({'pid': pid, 'name': name, 'depth': depth,
+                                    'start_ms': (started_at - self._started_at) * 1000,
+                                    'duration_ms': duration * 1000}) + '\n')
+
+
+tracer = Tracer()
+
+
+def span(name: str):
+    return tracer.span(name)
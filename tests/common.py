@@ -14,9 +14,10 @@ class StdoutRedirectionContext:
             self.output = []
 
         def write(self, s):
-            if s in ("\n", ""):
-                return
-            self.output.append(s)
+            self.output.extend(line for line in s.split("\n") if line)
+
+        def flush(self):
+            pass
 
     def __enter__(self):
         buf = self.ListIO()
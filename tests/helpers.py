@@ -1,33 +1,79 @@
+import json
 import os
 import pathlib
 import shutil
+import subprocess
+import tempfile
+import time
+import typing
 from unittest import mock
 
 from command_reminder.operations.helpers.git import GitRepositoryManager
 
 TEST_PATH = pathlib.Path(__file__).parent.resolve()
 TEST_TMP_DIR_PATH = os.path.join(os.getcwd(), 'tmp')
+TEST_REMOTES_DIR_PATH = os.path.join(TEST_TMP_DIR_PATH, 'remotes')
+GIT_TEST_IDENTITY = ['-c', 'user.name=command-reminder', '-c', 'user.email=command-reminder@localhost']
+GIT_TEST_ENVIRONMENT = {'GIT_AUTHOR_NAME': 'command-reminder', 'GIT_AUTHOR_EMAIL': 'command-reminder@localhost',
+                        'GIT_COMMITTER_NAME': 'command-reminder', 'GIT_COMMITTER_EMAIL': 'command-reminder@localhost'}
+
+real_pull_changes_from_remote = GitRepositoryManager.__dict__['pull_changes_from_remote']
+real_clone_external_repo = GitRepositoryManager.clone_external_repo
+real_refresh_external_repo = GitRepositoryManager.refresh_external_repo
+real_remote_head = GitRepositoryManager.__dict__['remote_head']
+real_local_head = GitRepositoryManager.__dict__['local_head']
 
 from command_reminder.config.config import COMMAND_REMINDER_DIR_ENV, FISH_FUNCTIONS_PATH_ENV, HOME_DIR_ENV, \
-    COMMANDS_FILE_NAME, FISH_FUNCTIONS_DIR_NAME
+    COMMANDS_FILE_NAME, FISH_FUNCTIONS_DIR_NAME, REPOSITORIES_DIR_NAME, MAIN_REPOSITORY_DIR_NAME, \
+    COMMANDS_JOURNAL_FILE_NAME, EXTERNAL_REPOSITORIES_DIR_NAME
+
+MAIN_COMMANDS_FILE = os.path.join(TEST_TMP_DIR_PATH, REPOSITORIES_DIR_NAME, MAIN_REPOSITORY_DIR_NAME,
+                                  COMMANDS_FILE_NAME)
+MAIN_JOURNAL_FILE = os.path.join(TEST_TMP_DIR_PATH, REPOSITORIES_DIR_NAME, MAIN_REPOSITORY_DIR_NAME,
+                                 COMMANDS_JOURNAL_FILE_NAME)
+EXTERNAL_REPO_DIR = os.path.join(TEST_TMP_DIR_PATH, REPOSITORIES_DIR_NAME, EXTERNAL_REPOSITORIES_DIR_NAME,
+                                 'faderskd_common_commands')
 
 
 def with_mocked_environment(cls):
     GitRepositoryManager.pull_changes_from_remote = default_pull_changes_mock
+    GitRepositoryManager.clone_external_repo = default_clone_external_repo_mock
+    GitRepositoryManager.refresh_external_repo = default_refresh_external_repo_mock
+    GitRepositoryManager.remote_head = default_head_mock
+    GitRepositoryManager.local_head = default_head_mock
     return mock.patch.dict('os.environ',
                            {COMMAND_REMINDER_DIR_ENV: TEST_TMP_DIR_PATH, FISH_FUNCTIONS_PATH_ENV: '/some/path',
                             HOME_DIR_ENV: TEST_TMP_DIR_PATH})(cls)
 
 
-def default_pull_changes_mock(_, directory: str):
+def default_pull_changes_mock(_, directory: str, timeout=None, quiet=False):
     create_fake_commands_file(directory)
     create_fake_fish_dir(directory)
 
 
+def default_clone_external_repo_mock(_, directory: str, repo: str, timeout=None, quiet=False):
+    default_pull_changes_mock(_, directory)
+
+
+def default_refresh_external_repo_mock(_, directory: str, timeout=None, quiet=False):
+    pass
+
+
+def default_head_mock(_, directory: str, timeout=None):
+    return None
+
+
 def push_changes_mock(_, _directory: str):
     pass
 
 
+# moves a file's mtime out of the window in which the index does not trust it, so its shard is kept
+def make_old(path: str) -> None:
+    if os.path.exists(path):
+        old = time.time_ns() - 60 * 10 ** 9
+        os.utime(path, ns=(old, old))
+
+
 def create_fake_commands_file(directory: str, commands_file='fake_external_commands.json'):
     target_commands_file = os.path.join(directory, COMMANDS_FILE_NAME)
     fake_commands_file = os.path.join(TEST_PATH, 'files', commands_file)
@@ -40,3 +86,33 @@ def create_fake_fish_dir(directory: str, source_fish_file='fake_external_fish_fi
     os.makedirs(target_fish_dir)
     fake_fish_file = os.path.join(TEST_PATH, 'files', source_fish_file)
     shutil.copy(fake_fish_file, target_fish_dir)
+
+
+def create_bare_repository(name: str, commands: dict, other_files: typing.Optional[dict] = None) -> str:
+    bare_dir = os.path.join(TEST_REMOTES_DIR_PATH, 'team', name + '.git')
+    os.makedirs(bare_dir)
+    _git(bare_dir, 'init', '--bare', '--initial-branch=main')
+    commit_to_bare_repository(bare_dir, commands, other_files)
+    return 'file://' + bare_dir
+
+
+def commit_to_bare_repository(bare_dir: str, commands: dict, other_files: typing.Optional[dict] = None) -> None:
+    with tempfile.TemporaryDirectory() as work_dir:
+        _git(work_dir, 'clone', bare_dir, '.')
+        _git(work_dir, 'checkout', '-B', 'main')
+        os.makedirs(os.path.join(work_dir, FISH_FUNCTIONS_DIR_NAME), exist_ok=True)
+        for (path, content) in (other_files or {}).items():
+            with open(os.path.join(work_dir, path), 'w') as f:
+                f.write(content)
+        for (name, (command, _)) in commands.items():
+            with open(os.path.join(work_dir, FISH_FUNCTIONS_DIR_NAME, name + '.fish'), 'w') as f:
+                f.write(f"function {name}\n    echo '{command}'\nend")
+        with open(os.path.join(work_dir, COMMANDS_FILE_NAME), 'w') as f:
+            json.dump(commands, f)
+        _git(work_dir, 'add', '-A')
+        _git(work_dir, *GIT_TEST_IDENTITY, 'commit', '-m', 'update commands')
+        _git(work_dir, 'push', 'origin', 'main')
+
+
+def _git(directory: str, *args: str) -> None:
+    subprocess.run(['git', *args], cwd=directory, check=True, capture_output=True)
@@ -0,0 +1,107 @@
+import json
+import os
+from unittest import mock
+
+from command_reminder.cli import parser
+from command_reminder.config.config import REPOSITORIES_DIR_NAME, MAIN_REPOSITORY_DIR_NAME, COMMANDS_FILE_NAME, \
+    COMMAND_STORE_ENV, Configuration
+from command_reminder.exceptions import InvalidArgumentException
+from command_reminder.operations.helpers.sqlite_store import SqliteCommandStore
+from command_reminder.operations.helpers.store import JsonCommandStore, open_main_store
+from command_reminder.operations.helpers.tag_query import TagQuery
+from tests.common import BaseTestCase, assert_stdout
+from tests.helpers import with_mocked_environment, TEST_TMP_DIR_PATH
+
+MAIN_DIR = os.path.join(TEST_TMP_DIR_PATH, REPOSITORIES_DIR_NAME, MAIN_REPOSITORY_DIR_NAME)
+SQLITE_FILE = os.path.join(TEST_TMP_DIR_PATH, 'commands.sqlite')
+
+
+@with_mocked_environment
+class CommandStoreTestCase(BaseTestCase):
+    def test_both_stores_should_answer_tag_queries_in_recording_order(self):
+        # given
+        parser.parse_args(['init'])
+
+        for store in [JsonCommandStore(MAIN_DIR), SqliteCommandStore(SQLITE_FILE, MAIN_DIR)]:
+            with self.subTest(store=type(store).__name__):
+                store.put('mongo', 'mongo dburl', ['#db', '#mongo'])
+                store.put('kafka', 'kafka-console-consumer', ['#queue'])
+                store.put('psql', 'psql dburl', ['#db', '#prod'])
+                store.put('mongo', 'mongo otherurl', ['#db'])
+
+                # when
+                results = list(store.query(TagQuery.parse(['#db|#queue', '!#prod'])))
+
+                # then
+                self.assertEqual(results, [('mongo', 'mongo otherurl', ['#db']),
+                                           ('kafka', 'kafka-console-consumer', ['#queue'])])
+                self.assertEqual(store.get('psql'), ('psql', 'psql dburl', ['#db', '#prod']))
+
+                # when
+                store.delete('psql')
+
+                # then
+                self.assertIsNone(store.get('psql'))
+                self.assertEqual([name for (name, _, _) in store.iterate()], ['mongo', 'kafka'])
+
+    def test_sqlite_store_should_import_and_export_commands_file(self):
+        # given
+        parser.parse_args(['init'])
+        JsonCommandStore(MAIN_DIR).put('mongo', 'mongo dburl', ['#mongo'])
+        store = SqliteCommandStore(SQLITE_FILE, MAIN_DIR)
+
+        # when
+        store.put('kafka', 'kafka-console-consumer', ['#queue'])
+        store.export()
+
+        # then
+        with open(os.path.join(MAIN_DIR, COMMANDS_FILE_NAME), 'r') as f:
+            self.assertEqual(json.load(f), {'mongo': ['mongo dburl', ['#mongo']],
+                                            'kafka': ['kafka-console-consumer', ['#queue']]})
+
+        # when
+        JsonCommandStore(MAIN_DIR).put('psql', 'psql dburl', [])
+
+        # then
+        self.assertEqual(store.get('psql'), ('psql', 'psql dburl', []))
+
+    def test_sqlite_store_should_keep_unexported_commands_when_commands_file_changes(self):
+        # given
+        parser.parse_args(['init'])
+        JsonCommandStore(MAIN_DIR).put('mongo', 'mongo dburl', ['#mongo'])
+        JsonCommandStore(MAIN_DIR).put('redis', 'redis-cli', [])
+        store = SqliteCommandStore(SQLITE_FILE, MAIN_DIR)
+        store.put('kafka', 'kafka-console-consumer', ['#queue'])
+
+        # when
+        JsonCommandStore(MAIN_DIR).put('psql', 'psql dburl', ['#db'])
+        JsonCommandStore(MAIN_DIR).put('mongo', 'mongo otherurl', ['#mongo'])
+        JsonCommandStore(MAIN_DIR).delete('redis')
+
+        # then
+        self.assertEqual(list(store.iterate()), [('mongo', 'mongo otherurl', ['#mongo']),
+                                                 ('kafka', 'kafka-console-consumer', ['#queue']),
+                                                 ('psql', 'psql dburl', ['#db'])])
+        self.assertEqual(list(store.query(TagQuery.parse(['#db']))), [('psql', 'psql dburl', ['#db'])])
+
+    @mock.patch.dict('os.environ', {COMMAND_STORE_ENV: 'sqlite'})
+    def test_should_record_list_and_remove_commands_with_sqlite_store(self):
+        # given
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo dburl', '--tags', '#db,#mongo'])
+        parser.parse_args(['record', '--name', 'psql', '--command', 'psql dburl', '--tags', '#db'])
+
+        # when
+        parser.parse_args(['rm', '--command', 'mongo'])
+
+        # then
+        with assert_stdout() as stdout:
+            parser.parse_args(['list', '--tags', '#db'])
+            self.assertEqual(len(stdout.output), 1)
+            self.assertOutputContains(stdout.output, 'psql')
+        self.assertTrue(os.path.exists(SQLITE_FILE))
+
+    @mock.patch.dict('os.environ', {COMMAND_STORE_ENV: 'mysql'})
+    def test_should_reject_unknown_store(self):
+        with self.assertRaisesRegex(InvalidArgumentException, 'Unknown commands store "mysql"'):
+            open_main_store(Configuration.load_config())
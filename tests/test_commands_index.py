@@ -0,0 +1,113 @@
+import json
+import os
+import shutil
+from unittest import mock
+
+from command_reminder.cli import parser
+from command_reminder.config.config import COMMANDS_FILE_NAME, INDEX_DIR_NAME, INDEX_MANIFEST_FILE_NAME
+from command_reminder.operations.helpers.index import CommandsIndex
+from command_reminder.operations.helpers.journal import CommandsJournal
+from tests.common import BaseTestCase, assert_stdout
+from tests.helpers import with_mocked_environment, TEST_TMP_DIR_PATH, make_old, MAIN_COMMANDS_FILE, \
+    MAIN_JOURNAL_FILE, EXTERNAL_REPO_DIR
+
+
+@with_mocked_environment
+class CommandsIndexTestCase(BaseTestCase):
+    def _given_main_and_external_repository(self):
+        parser.parse_args(['init'])
+        parser.parse_args(['pull', '--repo', 'https://github.com/faderskd/common-commands'])
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo', '--tags', '#mongo'])
+        make_old(MAIN_COMMANDS_FILE)
+        make_old(MAIN_JOURNAL_FILE)
+        make_old(os.path.join(EXTERNAL_REPO_DIR, COMMANDS_FILE_NAME))
+
+    def test_should_persist_index_of_all_repositories(self):
+        # given
+        self._given_main_and_external_repository()
+
+        # when
+        parser.parse_args(['list'])
+
+        # then
+        self.assertTrue(os.path.exists(os.path.join(TEST_TMP_DIR_PATH, INDEX_DIR_NAME, INDEX_MANIFEST_FILE_NAME)))
+
+    def test_should_not_read_repositories_when_nothing_changed(self):
+        # given
+        self._given_main_and_external_repository()
+        parser.parse_args(['list'])
+
+        with mock.patch.object(CommandsJournal, 'load') as read_mock, assert_stdout() as stdout:
+            # when
+            parser.parse_args(['list'])
+            parser.parse_args(['tags'])
+
+            # then
+            read_mock.assert_not_called()
+            self.assertOutputContains(stdout.output, 'mongo: mongo')
+            self.assertOutputContains(stdout.output, 'external_command: some_external_command')
+            self.assertOutputContains(stdout.output, '#external')
+
+    def test_should_rebuild_only_changed_repository(self):
+        # given
+        self._given_main_and_external_repository()
+        parser.parse_args(['list'])
+        parser.parse_args(['record', '--name', 'cassandra', '--command', 'cassandra'])
+
+        with mock.patch.object(CommandsJournal, 'load', autospec=True, side_effect=CommandsJournal.load) as read_mock, \
+                assert_stdout() as stdout:
+            # when
+            parser.parse_args(['list'])
+
+            # then
+            self.assertEqual(read_mock.call_count, 1)
+            self.assertEqual(len(stdout.output), 3)
+            self.assertOutputContains(stdout.output, 'cassandra: cassandra')
+
+    def test_should_drop_removed_repository_from_index(self):
+        # given
+        self._given_main_and_external_repository()
+        parser.parse_args(['list'])
+        shutil.rmtree(EXTERNAL_REPO_DIR)
+
+        with assert_stdout() as stdout:
+            # when
+            parser.parse_args(['list'])
+
+            # then
+            self.assertEqual(len(stdout.output), 1)
+            self.assertOutputContains(stdout.output, 'mongo: mongo')
+
+    def test_should_not_open_repositories_without_requested_tags(self):
+        # given
+        self._given_main_and_external_repository()
+        parser.parse_args(['list'])
+
+        with mock.patch.object(CommandsIndex, '_load_shard', autospec=True,
+                               side_effect=CommandsIndex._load_shard) as load_mock, assert_stdout() as stdout:
+            # when
+            parser.parse_args(['list', '--tags', '#external'])
+
+            # then
+            self.assertEqual(stdout.output, ['external_command: some_external_command'])
+            self.assertEqual({call.args[1].repo_dir for call in load_mock.call_args_list}, {EXTERNAL_REPO_DIR})
+
+    def test_should_keep_indexed_at_when_content_did_not_change(self):
+        # given
+        self._given_main_and_external_repository()
+        parser.parse_args(['list'])
+        indexed_at = self._indexed_at(MAIN_COMMANDS_FILE)
+
+        # when
+        CommandsJournal(os.path.dirname(MAIN_COMMANDS_FILE)).compact()
+        with assert_stdout() as stdout:
+            parser.parse_args(['list'])
+
+        # then
+        self.assertOutputContains(stdout.output, 'mongo: mongo')
+        self.assertEqual(self._indexed_at(MAIN_COMMANDS_FILE), indexed_at)
+
+    @staticmethod
+    def _indexed_at(commands_file: str) -> int:
+        with open(os.path.join(TEST_TMP_DIR_PATH, INDEX_DIR_NAME, INDEX_MANIFEST_FILE_NAME), 'r') as f:
+            return json.load(f)['repos'][commands_file]['indexed_at']
@@ -0,0 +1,137 @@
+import json
+import multiprocessing
+import os
+from unittest import mock
+
+from command_reminder.cli import parser
+from command_reminder.config.config import REPOSITORIES_DIR_NAME, MAIN_REPOSITORY_DIR_NAME, COMMANDS_FILE_NAME, \
+    COMMANDS_JOURNAL_FILE_NAME
+from command_reminder.operations.helpers import journal
+from tests.common import BaseTestCase, assert_stdout
+from tests.helpers import with_mocked_environment, TEST_TMP_DIR_PATH
+
+MAIN_DIR = os.path.join(TEST_TMP_DIR_PATH, REPOSITORIES_DIR_NAME, MAIN_REPOSITORY_DIR_NAME)
+STRESS_WRITERS = 6
+STRESS_READERS = 3
+STRESS_COMMANDS_PER_WRITER = 60
+# the command after which the first writer simulates a writer interrupted mid-append
+STRESS_TORN_AFTER = 30
+
+
+@with_mocked_environment
+class CommandsJournalTestCase(BaseTestCase):
+    def test_should_append_recorded_and_removed_commands_to_journal(self):
+        # given
+        parser.parse_args(['init'])
+
+        # when
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo', '--tags', '#mongo'])
+        parser.parse_args(['record', '--name', 'kafka', '--command', 'kafka'])
+        parser.parse_args(['rm', '--command', 'kafka'])
+
+        # then
+        self.assertFileContent(os.path.join(MAIN_DIR, COMMANDS_FILE_NAME), '')
+        self.assertFileContent(os.path.join(MAIN_DIR, COMMANDS_JOURNAL_FILE_NAME),
+                               '["put", "mongo", "mongo", ["#mongo"]]\n'
+                               '["put", "kafka", "kafka", []]\n'
+                               '["del", "kafka"]\n')
+
+        # and
+        with assert_stdout() as stdout:
+            parser.parse_args(['list'])
+            self.assertEqual(stdout.output, ['mongo: mongo'])
+
+    @mock.patch.object(journal, 'COMPACTION_THRESHOLD_BYTES', 64)
+    def test_should_compact_journal_into_commands_file_when_it_grows(self):
+        # given
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo', '--tags', '#mongo'])
+
+        # when
+        parser.parse_args(['record', '--name', 'cassandra', '--command', 'cassandra', '--tags', '#cassandra'])
+
+        # then
+        self.assertFalse(os.path.exists(os.path.join(MAIN_DIR, COMMANDS_JOURNAL_FILE_NAME)))
+        with open(os.path.join(MAIN_DIR, COMMANDS_FILE_NAME)) as f:
+            self.assertEqual(json.load(f), {'mongo': ['mongo', ['#mongo']],
+                                            'cassandra': ['cassandra', ['#cassandra']]})
+
+    def test_should_ignore_partially_written_journal_entry(self):
+        # given
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo'])
+        with open(os.path.join(MAIN_DIR, COMMANDS_JOURNAL_FILE_NAME), 'a') as f:
+            f.write('["put", "kafk')
+
+        with assert_stdout() as stdout:
+            # when
+            parser.parse_args(['list'])
+
+            # then
+            self.assertEqual(stdout.output, ['mongo: mongo'])
+
+    def test_should_record_command_after_partially_written_journal_entry(self):
+        # given
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo'])
+        with open(os.path.join(MAIN_DIR, COMMANDS_JOURNAL_FILE_NAME), 'a') as f:
+            f.write('["put", "kafk')
+
+        # when
+        parser.parse_args(['record', '--name', 'psql', '--command', 'psql'])
+        parser.parse_args(['rm', '--command', 'mongo'])
+
+        # then
+        self.assertEqual(journal.CommandsJournal(MAIN_DIR).load(), {'psql': ['psql', []]})
+
+    @mock.patch.object(journal, 'COMPACTION_THRESHOLD_BYTES', 512)
+    def test_should_not_lose_or_tear_commands_with_concurrent_writers_and_readers(self):
+        # given
+        parser.parse_args(['init'])
+        context = multiprocessing.get_context('fork')
+        done = context.Event()
+        writers = [context.Process(target=_write_commands, args=(w,)) for w in range(STRESS_WRITERS)]
+        readers = [context.Process(target=_read_commands, args=(done,)) for _ in range(STRESS_READERS)]
+
+        # when
+        for p in readers + writers:
+            p.start()
+        for p in writers:
+            p.join()
+        done.set()
+        for p in readers:
+            p.join()
+
+        # then
+        self.assertEqual([p.exitcode for p in writers + readers], [0] * (STRESS_WRITERS + STRESS_READERS))
+        commands = journal.CommandsJournal(MAIN_DIR).load()
+        self.assertEqual(len(commands), STRESS_WRITERS * STRESS_COMMANDS_PER_WRITER)
+
+
+def _write_commands(writer: int) -> None:
+    commands = journal.CommandsJournal(MAIN_DIR)
+    for i in range(STRESS_COMMANDS_PER_WRITER):
+        if i % 10 == 0:
+            commands.put_many([(f'writer{writer}_{i}', f'echo {i}', ['#stress'])])
+        else:
+            commands.put(f'writer{writer}_{i}', f'echo {i}', ['#stress'])
+        if writer == 0 and i == STRESS_TORN_AFTER:
+            with commands._locked(), open(commands.journal_file, 'a') as f:
+                f.write('["put", "torn')
+    os._exit(0)
+
+
+def _read_commands(done) -> None:
+    # every reader sees whole snapshots and never loses a command it saw before, since commands are only added
+    commands = journal.CommandsJournal(MAIN_DIR)
+    seen = set()
+    while not done.is_set():
+        with open(commands.commands_file, 'r') as f:
+            content = f.read()
+        if content:
+            json.loads(content)
+        names = set(commands.load())
+        if not seen <= names:
+            os._exit(1)
+        seen = names
+    os._exit(0)
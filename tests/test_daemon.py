@@ -0,0 +1,97 @@
+import json
+import os
+import threading
+
+from command_reminder.cli import parser
+from command_reminder.cli.daemon import CommandsDaemon
+from command_reminder.cli.initializer import AppContext
+from command_reminder.config.config import REPOSITORIES_DIR_NAME, MAIN_REPOSITORY_DIR_NAME, COMMANDS_FILE_NAME, \
+    EXTERNAL_REPOSITORIES_DIR_NAME, DAEMON_SOCKET_FILE_NAME
+from command_reminder.exceptions import InvalidArgumentException
+from tests.common import BaseTestCase, assert_stdout
+from tests.helpers import with_mocked_environment, TEST_TMP_DIR_PATH
+
+SOCKET_FILE = os.path.join(TEST_TMP_DIR_PATH, DAEMON_SOCKET_FILE_NAME)
+
+
+@with_mocked_environment
+class DaemonTestCase(BaseTestCase):
+    def test_should_serve_commands_from_daemon(self):
+        # given
+        parser.parse_args(['init'])
+        daemon = self._start_daemon()
+
+        # when
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo', '--tags', '#mongo'])
+
+        with assert_stdout() as stdout:
+            parser.parse_args(['list', '--tags', '#mongo'])
+            parser.parse_args(['tags'])
+
+            # then
+            self.assertOutputContains(stdout.output, 'mongo: mongo')
+            self.assertOutputContains(stdout.output, '#mongo')
+
+        # and
+        self.assertEqual(daemon.requests_served, 3)
+
+        # and
+        with self.assertRaisesRegex(InvalidArgumentException, 'Command kafka does not exist'):
+            parser.parse_args(['rm', '--command', 'kafka'])
+
+    def test_should_reload_repository_changed_on_disk(self):
+        # given
+        parser.parse_args(['init'])
+        parser.parse_args(['pull', '--repo', 'https://github.com/faderskd/common-commands'])
+        self._start_daemon()
+        parser.parse_args(['list'])
+
+        # when
+        external_commands_file = os.path.join(TEST_TMP_DIR_PATH, REPOSITORIES_DIR_NAME,
+                                              EXTERNAL_REPOSITORIES_DIR_NAME, 'faderskd_common_commands',
+                                              COMMANDS_FILE_NAME)
+        with open(external_commands_file, 'w') as f:
+            json.dump({'new_external_command': ['some_new_external_command', []]}, f)
+
+        with assert_stdout() as stdout:
+            parser.parse_args(['list'])
+
+            # then
+            self.assertOutputContains(stdout.output, 'new_external_command: some_new_external_command')
+
+    def test_should_fall_back_to_local_processing_when_daemon_is_stopped(self):
+        # given
+        parser.parse_args(['init'])
+        daemon = self._start_daemon()
+
+        # when
+        parser.parse_args(['daemon', '--stop'])
+        self._daemon_thread.join(5)
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo'])
+
+        # then
+        self.assertFalse(os.path.exists(SOCKET_FILE))
+        self.assertEqual(daemon.requests_served, 0)
+        with assert_stdout() as stdout:
+            parser.parse_args(['list'])
+            self.assertOutputContains(stdout.output, 'mongo: mongo')
+
+    def _start_daemon(self) -> CommandsDaemon:
+        app_context = AppContext()
+        arg_parser = parser.define_parser()
+        daemon = CommandsDaemon(app_context.config.daemon_socket_file,
+                                lambda raw_args: parser.dispatch(app_context, arg_parser,
+                                                                 arg_parser.parse_args(raw_args)))
+        self._daemon_thread = threading.Thread(target=daemon.serve, daemon=True)
+        self._daemon_thread.start()
+        self.addCleanup(self._stop_daemon, daemon)
+        for _ in range(500):
+            if os.path.exists(SOCKET_FILE):
+                break
+            self._daemon_thread.join(0.01)
+        return daemon
+
+    def _stop_daemon(self, daemon: CommandsDaemon):
+        if self._daemon_thread.is_alive():
+            daemon.stop()
+            self._daemon_thread.join(5)
@@ -0,0 +1,110 @@
+import os
+import subprocess
+from unittest import mock
+
+from command_reminder.cli import parser
+from command_reminder.config.config import REPOSITORIES_DIR_NAME, MAIN_REPOSITORY_DIR_NAME, FISH_FUNCTIONS_DIR_NAME, \
+    FISH_COMPLETIONS_DIR_NAME, FISH_COMPLETIONS_FILE_NAME, FISH_COMPLETION_NAMES_DIR_NAME, \
+    FISH_COMPLETION_TAGS_FILE_NAME
+from command_reminder.operations.helpers.git import GitRepositoryManager
+from command_reminder.operations.helpers.index import CommandsIndex
+from command_reminder.operations.push_commands import PUSHED_PATHS
+from tests.common import BaseTestCase, assert_stdout
+from tests.helpers import with_mocked_environment, TEST_TMP_DIR_PATH
+
+COMPLETIONS_DIR = os.path.join(TEST_TMP_DIR_PATH, REPOSITORIES_DIR_NAME, MAIN_REPOSITORY_DIR_NAME,
+                               FISH_FUNCTIONS_DIR_NAME, FISH_COMPLETIONS_DIR_NAME)
+COMPLETIONS_FILE = os.path.join(COMPLETIONS_DIR, FISH_COMPLETIONS_FILE_NAME)
+NAMES_DIR = os.path.join(COMPLETIONS_DIR, FISH_COMPLETION_NAMES_DIR_NAME)
+TAGS_FILE = os.path.join(COMPLETIONS_DIR, FISH_COMPLETION_TAGS_FILE_NAME)
+
+
+@with_mocked_environment
+class FishCompletionsTestCase(BaseTestCase):
+    def test_should_complete_names_and_tags(self):
+        # given
+        parser.parse_args(['init'])
+        parser.parse_args(['pull', '--repo', 'https://github.com/faderskd/common-commands'])
+
+        # when
+        parser.parse_args(['record', '--name', 'mongo', '--command', "mongo 'dburl'", '--tags', '#db,#mongo'])
+
+        # then
+        with open(COMPLETIONS_FILE, 'r') as f:
+            completions = f.read()
+        self.assertIn("complete -c cr -f -n __fish_use_subcommand -a 'init record list", completions)
+        self.assertIn(f"complete -c cr -n '__fish_seen_subcommand_from show run' -f -a '(cat \\'{NAMES_DIR}\\'/*)'",
+                      completions)
+        self.assertIn("complete -c cr -n '__fish_seen_subcommand_from rm' -s c -l command -x "
+                      f"-a '(cat \\'{os.path.join(NAMES_DIR, MAIN_REPOSITORY_DIR_NAME)}\\')'", completions)
+        self.assertIn("complete -c cr -n '__fish_seen_subcommand_from list' -s t -l tags -x "
+                      f"-a '(cat \\'{TAGS_FILE}\\')'", completions)
+        self.assertFileContent(os.path.join(NAMES_DIR, MAIN_REPOSITORY_DIR_NAME), "mongo\tmongo 'dburl'\n")
+        self.assertFileContent(os.path.join(NAMES_DIR, 'faderskd_common_commands'),
+                               'external_command\tsome_external_command\n')
+        self.assertFileContent(TAGS_FILE, '#db\n#external\n#mongo\n')
+
+        # when
+        parser.parse_args(['rm', '--command', 'mongo'])
+
+        # then
+        self.assertFileContent(os.path.join(NAMES_DIR, MAIN_REPOSITORY_DIR_NAME), '')
+
+    def test_should_rewrite_names_only_of_changed_repository(self):
+        # given
+        parser.parse_args(['init'])
+        parser.parse_args(['pull', '--repo', 'https://github.com/faderskd/common-commands'])
+        external_names_inode = os.stat(os.path.join(NAMES_DIR, 'faderskd_common_commands')).st_ino
+
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo dburl'])
+
+        # when
+        parser.parse_args(['init'])
+
+        # then
+        self.assertEqual(os.stat(os.path.join(NAMES_DIR, 'faderskd_common_commands')).st_ino, external_names_inode)
+        self.assertFileContent(os.path.join(NAMES_DIR, MAIN_REPOSITORY_DIR_NAME), 'mongo\tmongo dburl\n')
+
+    def test_should_update_completions_without_reading_index_on_record_and_remove(self):
+        # given
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'psql', '--command', 'psql dburl', '--tags', '#db'])
+
+        with mock.patch.object(CommandsIndex, 'repositories') as repositories_mock:
+            # when
+            parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo dburl', '--tags', '#mongo,#db'])
+            parser.parse_args(['rm', '--command', 'psql'])
+
+            # then
+            repositories_mock.assert_not_called()
+        self.assertFileContent(os.path.join(NAMES_DIR, MAIN_REPOSITORY_DIR_NAME), 'mongo\tmongo dburl\n')
+        self.assertFileContent(TAGS_FILE, '#db\n#mongo\n')
+
+    def test_should_not_rewrite_completions_when_commands_did_not_change(self):
+        # given
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo dburl'])
+        parser.parse_args(['init'])
+
+        with mock.patch('command_reminder.operations.helpers.fish_completions.atomic_write') as write_mock, \
+                assert_stdout():
+            # when
+            parser.parse_args(['init'])
+
+            # then
+            write_mock.assert_not_called()
+
+    def test_should_not_push_completions(self):
+        # given
+        parser.parse_args(['init'])
+        main_dir = os.path.join(TEST_TMP_DIR_PATH, REPOSITORIES_DIR_NAME, MAIN_REPOSITORY_DIR_NAME)
+        subprocess.run(['git', 'init', '-q'], cwd=main_dir, check=True)
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo dburl'])
+
+        # when
+        changed = GitRepositoryManager.changed_paths(main_dir, PUSHED_PATHS)
+
+        # then
+        self.assertIn('fish/mongo.fish', changed)
+        self.assertTrue(os.path.exists(COMPLETIONS_FILE))
+        self.assertFalse(any(FISH_COMPLETIONS_DIR_NAME in p for p in changed))
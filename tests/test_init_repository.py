@@ -1,13 +1,18 @@
 import os
+import time
 from unittest import mock
 
 from command_reminder.cli import parser
 from command_reminder.config.config import COMMAND_REMINDER_DIR_ENV, HOME_DIR_ENV, REPOSITORIES_DIR_NAME, \
     MAIN_REPOSITORY_DIR_NAME, COMMANDS_FILE_NAME, FISH_FUNCTIONS_DIR_NAME, FISH_FUNCTIONS_PATH_ENV, \
-    HISTORY_LOAD_FILE_NAME, CONFIG_FILE_NAME
+    HISTORY_LOAD_FILE_NAME, CONFIG_FILE_NAME, BUNDLES_DIR_NAME, COMMANDS_JOURNAL_FILE_NAME, \
+    EXTERNAL_REPOSITORIES_DIR_NAME, FISH_COMPLETE_PATH_ENV, COMMAND_STORE_ENV, SQLITE_STORE_FILE_NAME, Configuration
 from command_reminder.exceptions import InvalidArgumentException
+from command_reminder.operations.helpers.store import open_main_store
 from tests.common import BaseTestCase, assert_stdout
-from tests.helpers import with_mocked_environment, TEST_TMP_DIR_PATH
+from tests.helpers import with_mocked_environment, make_old, TEST_TMP_DIR_PATH
+
+SQLITE_STORE_FILE = os.path.join(TEST_TMP_DIR_PATH, SQLITE_STORE_FILE_NAME)
 
 
 @with_mocked_environment
@@ -75,3 +80,168 @@ function h
     cr load && history merge
 end
 ''')
+
+    def test_should_return_bundled_init_script(self):
+        # given
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo dburl', '--tags', '#mongo'])
+
+        with assert_stdout() as stdout:
+            # when
+            parser.parse_args(['init', '--bundle'])
+
+            # then
+            self.assertEqual(len(stdout.output), 2)
+            self.assertTrue(stdout.output[0].startswith(f'source {TEST_TMP_DIR_PATH}/{BUNDLES_DIR_NAME}/'))
+            self.assertTrue(stdout.output[1].startswith(f'set -gx {FISH_COMPLETE_PATH_ENV} '))
+            bundle_file = stdout.output[0][len('source '):]
+
+        # and
+        with open(bundle_file, 'r') as f:
+            bundle = f.read()
+        self.assertIn("function mongo\n    set color blue; echo 'mongo dburl'\nend", bundle)
+        self.assertIn('function h\n    cr load && history merge\nend', bundle)
+        self.assertEqual(bundle.count('function mongo'), 1)
+
+    def test_should_regenerate_bundle_only_when_commands_change(self):
+        # given
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo dburl'])
+        main_dir = os.path.join(TEST_TMP_DIR_PATH, REPOSITORIES_DIR_NAME, MAIN_REPOSITORY_DIR_NAME)
+        an_hour_ago = time.time() - 3600
+        for file_name in (COMMANDS_FILE_NAME, COMMANDS_JOURNAL_FILE_NAME):
+            os.utime(os.path.join(main_dir, file_name), (an_hour_ago, an_hour_ago))
+        with assert_stdout() as stdout:
+            parser.parse_args(['init', '--bundle'])
+            bundle_file = stdout.output[0][len('source '):]
+        bundle_inode = os.stat(bundle_file).st_ino
+
+        # when
+        with assert_stdout():
+            parser.parse_args(['init', '--bundle'])
+
+        # then
+        self.assertEqual(os.stat(bundle_file).st_ino, bundle_inode)
+
+        # when
+        parser.parse_args(['record', '--name', 'redis', '--command', 'redis-cli'])
+        with assert_stdout():
+            parser.parse_args(['init', '--bundle'])
+
+        # then
+        self.assertNotEqual(os.stat(bundle_file).st_ino, bundle_inode)
+        with open(bundle_file, 'r') as f:
+            self.assertIn('function redis', f.read())
+
+    def test_should_regenerate_bundle_when_hand_written_function_is_edited(self):
+        # given
+        parser.parse_args(['init'])
+        main_dir = os.path.join(TEST_TMP_DIR_PATH, REPOSITORIES_DIR_NAME, MAIN_REPOSITORY_DIR_NAME)
+        function_file = os.path.join(main_dir, FISH_FUNCTIONS_DIR_NAME, 'h.fish')
+        with assert_stdout() as stdout:
+            parser.parse_args(['init', '--bundle'])
+            bundle_file = stdout.output[0][len('source '):]
+
+        # when
+        with open(function_file, 'w') as f:
+            f.write('function h\n    cr load --window 0 && history merge\nend')
+        with assert_stdout():
+            parser.parse_args(['init', '--bundle'])
+
+        # then
+        with open(bundle_file, 'r') as f:
+            self.assertIn('cr load --window 0 && history merge', f.read())
+
+    def test_should_emit_cached_init_script_without_app_context(self):
+        # given
+        with assert_stdout() as stdout:
+            parser.parse_args(['init'])
+            script = stdout.output
+        self._backdate_repositories()
+        with assert_stdout():
+            parser.parse_args(['init'])
+
+        # when
+        with assert_stdout() as stdout, mock.patch('command_reminder.cli.parser.AppContext') as app_context_mock:
+            parser.parse_args(['init', '--emit-cached'])
+
+        # then
+        app_context_mock.assert_not_called()
+        self.assertEqual(''.join(stdout.output).strip(), ''.join(script).strip())
+
+    def test_should_regenerate_cached_init_script_after_new_external_repository(self):
+        # given
+        with assert_stdout():
+            parser.parse_args(['init'])
+        self._backdate_repositories()
+        with assert_stdout():
+            parser.parse_args(['init'])
+        external_fish_dir = os.path.join(TEST_TMP_DIR_PATH, REPOSITORIES_DIR_NAME, EXTERNAL_REPOSITORIES_DIR_NAME,
+                                         'ext', FISH_FUNCTIONS_DIR_NAME)
+        os.makedirs(external_fish_dir)
+
+        # when
+        with assert_stdout() as stdout:
+            parser.parse_args(['init', '--emit-cached'])
+
+        # then
+        self.assertOutputContains(stdout.output, external_fish_dir)
+
+    def test_should_regenerate_cached_bundled_init_script_after_hand_written_function_is_edited(self):
+        # given
+        with assert_stdout():
+            parser.parse_args(['init'])
+        self._backdate_repositories()
+        with assert_stdout() as stdout:
+            parser.parse_args(['init', '--bundle'])
+            bundle_file = stdout.output[0][len('source '):]
+        function_file = os.path.join(TEST_TMP_DIR_PATH, REPOSITORIES_DIR_NAME, MAIN_REPOSITORY_DIR_NAME,
+                                     FISH_FUNCTIONS_DIR_NAME, HISTORY_LOAD_FILE_NAME)
+
+        # when
+        with open(function_file, 'w') as f:
+            f.write('function h\n    cr load --window 0 && history merge\nend')
+        with assert_stdout():
+            parser.parse_args(['init', '--emit-cached', '--bundle'])
+
+        # then
+        with open(bundle_file, 'r') as f:
+            self.assertIn('cr load --window 0 && history merge', f.read())
+
+    @mock.patch.dict('os.environ', {COMMAND_STORE_ENV: 'sqlite'})
+    def test_should_regenerate_cached_bundled_init_script_after_command_is_stored_in_sqlite(self):
+        # given
+        with assert_stdout():
+            parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo dburl'])
+        self._backdate_repositories()
+        make_old(SQLITE_STORE_FILE)
+        with assert_stdout() as stdout:
+            parser.parse_args(['init', '--bundle'])
+            bundle_file = stdout.output[0][len('source '):]
+
+        # when
+        open_main_store(Configuration.load_config()).put('mongo', 'mongo otherurl', [])
+        with assert_stdout():
+            parser.parse_args(['init', '--emit-cached', '--bundle'])
+
+        # then
+        with open(bundle_file, 'r') as f:
+            self.assertIn('mongo otherurl', f.read())
+
+    def test_should_init_when_no_cached_script(self):
+        # when
+        with assert_stdout() as stdout:
+            parser.parse_args(['init', '--emit-cached'])
+
+        # then
+        self.assertOutputContains(stdout.output, f'set -gx {FISH_FUNCTIONS_PATH_ENV} ${FISH_FUNCTIONS_PATH_ENV}')
+        self.assertTrue(os.path.exists(os.path.join(TEST_TMP_DIR_PATH, REPOSITORIES_DIR_NAME,
+                                                    MAIN_REPOSITORY_DIR_NAME, COMMANDS_FILE_NAME)))
+
+    @staticmethod
+    def _backdate_repositories():
+        an_hour_ago = time.time() - 3600
+        for (directory, dirs, files) in os.walk(os.path.join(TEST_TMP_DIR_PATH, REPOSITORIES_DIR_NAME)):
+            for name in dirs + files:
+                os.utime(os.path.join(directory, name), (an_hour_ago, an_hour_ago))
@@ -1,6 +1,16 @@
+import json
+import os
+import subprocess
+import sys
+
 from command_reminder.cli import parser
 from tests.common import BaseTestCase, assert_stdout
-from tests.helpers import with_mocked_environment
+from tests.helpers import with_mocked_environment, TEST_TMP_DIR_PATH
+
+LIST_SCRIPT = '''
+from command_reminder.cli import parser
+parser.parse_args(['list'])
+'''
 
 
 @with_mocked_environment
@@ -70,3 +80,111 @@ class ListTestCase(BaseTestCase):
             self.assertEqual(len(stdout.output), 2)
             self.assertOutputContains(stdout.output, 'mongo1: mongo')
             self.assertOutputContains(stdout.output, 'mongo2: mongo')
+
+    def test_should_filter_commands_by_alternative_tags(self):
+        # given
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo', '--tags', '#onduty #mongo'])
+        parser.parse_args(['record', '--name', 'cassandra', '--command', 'cassandra', '--tags', '#cassandra'])
+        parser.parse_args(['record', '--name', 'kafka', '--command', 'kafka', '--tags', '#onduty #kafka'])
+
+        with assert_stdout() as stdout:
+            # when
+            parser.parse_args(['list', '--tags', '#mongo | #cassandra'])
+
+            # then
+            self.assertEqual(len(stdout.output), 2)
+            self.assertOutputContains(stdout.output, 'mongo: mongo')
+            self.assertOutputContains(stdout.output, 'cassandra: cassandra')
+
+    def test_should_exclude_commands_with_negated_tags(self):
+        # given
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo', '--tags', '#onduty #mongo'])
+        parser.parse_args(['record', '--name', 'cassandra', '--command', 'cassandra', '--tags', '#cassandra'])
+        parser.parse_args(['record', '--name', 'kafka', '--command', 'kafka', '--tags', '#onduty #kafka #prod'])
+
+        with assert_stdout() as stdout:
+            # when
+            parser.parse_args(['list', '--tags', '!#mongo'])
+
+            # then
+            self.assertEqual(len(stdout.output), 2)
+            self.assertOutputContains(stdout.output, 'cassandra: cassandra')
+            self.assertOutputContains(stdout.output, 'kafka: kafka')
+
+        with assert_stdout() as stdout:
+            # when
+            parser.parse_args(['list', '--tags', '#onduty,!#prod|#kafka'])
+
+            # then
+            self.assertEqual(len(stdout.output), 2)
+            self.assertOutputContains(stdout.output, 'mongo: mongo')
+            self.assertOutputContains(stdout.output, 'kafka: kafka')
+
+    def test_should_list_page_of_commands(self):
+        # given
+        parser.parse_args(['init'])
+        for name in ['mongo', 'cassandra', 'kafka', 'redis']:
+            parser.parse_args(['record', '--name', name, '--command', name, '--tags', '#db'])
+
+        with assert_stdout() as stdout:
+            # when
+            parser.parse_args(['list', '--tags', '#db', '--offset', '1', '--limit', '2'])
+
+            # then
+            self.assertEqual(stdout.output, ['cassandra: cassandra', 'kafka: kafka'])
+
+    def test_should_stop_listing_when_reader_closes_pipe(self):
+        # given
+        parser.parse_args(['init'])
+        records_file = os.path.join(TEST_TMP_DIR_PATH, 'records.jsonl')
+        with open(records_file, 'w') as f:
+            for i in range(20000):
+                f.write(json.dumps({'name': f'command_{i}', 'command': f'echo {i}'}) + '\n')
+        with assert_stdout():
+            parser.parse_args(['record', '--from-file', records_file])
+
+        # when
+        process = subprocess.Popen([sys.executable, '-c', LIST_SCRIPT], stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, env=dict(os.environ))
+        first_line = process.stdout.readline()
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.wait()
+
+        # then
+        self.assertEqual(first_line, b'command_0: echo 0\n')
+        self.assertEqual(process.returncode, 0, stderr)
+        self.assertEqual(stderr, b'')
+
+    def test_should_list_commands_with_tags_and_repo_in_structured_formats(self):
+        # given
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo dburl', '--tags', '#db,#mongo'])
+        parser.parse_args(['record', '--name', 'kafka', '--command', 'kafka-topics --list'])
+
+        # expect
+        with assert_stdout() as stdout:
+            parser.parse_args(['list', '--format', 'jsonl'])
+            self.assertEqual([json.loads(line) for line in stdout.output], [
+                {'name': 'mongo', 'command': 'mongo dburl', 'tags': ['#db', '#mongo'], 'repo': 'main'},
+                {'name': 'kafka', 'command': 'kafka-topics --list', 'tags': [], 'repo': 'main'},
+            ])
+
+        # and
+        with assert_stdout() as stdout:
+            parser.parse_args(['list', '--format', 'json', '--tags', '#db'])
+            self.assertEqual(json.loads('\n'.join(stdout.output)), [
+                {'name': 'mongo', 'command': 'mongo dburl', 'tags': ['#db', '#mongo'], 'repo': 'main'},
+            ])
+
+        # and
+        with assert_stdout() as stdout:
+            parser.parse_args(['list', '--format', 'tsv'])
+            self.assertEqual(stdout.output, ['mongo\tmongo dburl\t#db,#mongo\tmain', 'kafka\tkafka-topics --list\t\tmain'])
+
+        # and
+        with assert_stdout() as stdout:
+            parser.parse_args(['list', '--format', 'nul'])
+            self.assertEqual(stdout.output, ['mongo\tmongo dburl\t#db,#mongo\tmain\0kafka\tkafka-topics --list\t\tmain\0'])
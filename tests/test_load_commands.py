@@ -2,12 +2,14 @@ import os
 from unittest import mock
 
 from command_reminder.cli import parser
-from tests.common import BaseTestCase
+from command_reminder.operations import load_command
+from command_reminder.operations.helpers import history_index
+from tests.common import BaseTestCase, assert_stdout
 from tests.helpers import with_mocked_environment, TEST_TMP_DIR_PATH
 
 
 
-@mock.patch('command_reminder.cli.parser.sys.stdin.readlines')
+@mock.patch('command_reminder.cli.parser.sys.stdin')
 @mock.patch('command_reminder.common.get_timestamp')
 @with_mocked_environment
 class LoadCommandsListTestCase(BaseTestCase):
@@ -15,7 +17,7 @@ class LoadCommandsListTestCase(BaseTestCase):
     def test_should_load_single_command_to_history(self, get_timestamp_mock, stdin_mock):
         # given
         get_timestamp_mock.return_value = 1639436633
-        stdin_mock.return_value = ['mongo: dburl/dbname --username abc --password pass\n']
+        stdin_mock.__iter__.return_value = ['mongo: dburl/dbname --username abc --password pass\n']
 
         # when
         parser.parse_args(['load'])
@@ -32,7 +34,7 @@ class LoadCommandsListTestCase(BaseTestCase):
     def test_should_load_multiple_commands_to_history(self, get_timestamp_mock, stdin_mock):
         # given
         get_timestamp_mock.return_value = 1639436633
-        stdin_mock.return_value = [
+        stdin_mock.__iter__.return_value = [
             'mongo: dburl/dbname --username abc --password pass\n',
             'curl-local: curl http://localhost:8080\n',
             'ssh-machine: ssh somelogin@somemachine.domain.pl\n',
@@ -54,3 +56,213 @@ class LoadCommandsListTestCase(BaseTestCase):
   when: 1639436633
 ''')
 
+    @mock.patch.object(load_command, 'HISTORY_BATCH_SIZE', 2)
+    def test_should_write_history_in_batches_with_one_timestamp_each(self, get_timestamp_mock, stdin_mock):
+        # given
+        get_timestamp_mock.side_effect = [1639436633, 1639436634]
+        stdin_mock.__iter__.return_value = [
+            'mongo: dburl/dbname --username abc --password pass\n',
+            '\n',
+            'curl-local: curl http://localhost:8080\n',
+            'ssh-machine: ssh somelogin@somemachine.domain.pl\n',
+        ]
+
+        # when
+        parser.parse_args(['load'])
+
+        # then
+        history_file = os.path.join(TEST_TMP_DIR_PATH, '.local/share/fish/fish_history')
+        self.assertEqual(get_timestamp_mock.call_count, 2)
+        self.assertFileContent(history_file, f'''
+- cmd: brew install fish
+  when: 1639436632
+- cmd: dburl/dbname --username abc --password pass
+  when: 1639436633
+- cmd: curl http://localhost:8080
+  when: 1639436633
+- cmd: ssh somelogin@somemachine.domain.pl
+  when: 1639436634
+''')
+
+    def test_should_skip_commands_already_in_recent_history(self, get_timestamp_mock, stdin_mock):
+        # given
+        get_timestamp_mock.return_value = 1639436633
+        stdin_mock.__iter__.return_value = [
+            'brew: brew install fish\n',
+            'curl-local: curl http://localhost:8080\n',
+            'curl-local: curl http://localhost:8080\n',
+        ]
+
+        # when
+        parser.parse_args(['load'])
+        parser.parse_args(['load'])
+
+        # then
+        self.assertFileContent(self.history_file, f'''
+- cmd: brew install fish
+  when: 1639436632
+- cmd: curl http://localhost:8080
+  when: 1639436633
+''')
+
+    def test_should_skip_commands_appended_to_history_since_last_load(self, get_timestamp_mock, stdin_mock):
+        # given
+        get_timestamp_mock.return_value = 1639436633
+        stdin_mock.__iter__.return_value = ['curl-local: curl http://localhost:8080\n']
+        parser.parse_args(['load'])
+        with open(self.history_file, 'a') as f:
+            f.write('- cmd: ssh somelogin@somemachine.domain.pl\n  when: 1639436640\n')
+        stdin_mock.__iter__.return_value = ['ssh-machine: ssh somelogin@somemachine.domain.pl\n',
+                                            'curl-local: curl http://localhost:8080\n']
+
+        # when
+        parser.parse_args(['load'])
+
+        # then
+        self.assertFileContent(self.history_file, f'''
+- cmd: brew install fish
+  when: 1639436632
+- cmd: curl http://localhost:8080
+  when: 1639436633
+- cmd: ssh somelogin@somemachine.domain.pl
+  when: 1639436640
+''')
+
+    @mock.patch.object(history_index, 'TAIL_SCAN_BLOCK_BYTES', 16)
+    def test_should_rebuild_recent_history_when_history_is_rotated(self, get_timestamp_mock, stdin_mock):
+        # given
+        get_timestamp_mock.return_value = 1639436633
+        stdin_mock.__iter__.return_value = ['curl-local: curl http://localhost:8080\n']
+        parser.parse_args(['load'])
+        os.remove(self.history_file)
+        with open(self.history_file, 'w') as f:
+            f.write('- cmd: ls\n  when: 1639436640\n- cmd: curl http://localhost:9090\n  when: 1639436641\n')
+        stdin_mock.__iter__.return_value = ['curl-local: curl http://localhost:9090\n', 'ls: ls\n',
+                                            'curl-local: curl http://localhost:8080\n']
+
+        # when
+        parser.parse_args(['load', '--window', '1'])
+
+        # then
+        self.assertFileContent(self.history_file, f'''- cmd: ls
+  when: 1639436640
+- cmd: curl http://localhost:9090
+  when: 1639436641
+- cmd: ls
+  when: 1639436633
+- cmd: curl http://localhost:8080
+  when: 1639436633
+''')
+
+    def test_should_load_duplicates_when_window_is_disabled(self, get_timestamp_mock, stdin_mock):
+        # given
+        get_timestamp_mock.return_value = 1639436633
+        stdin_mock.__iter__.return_value = ['brew: brew install fish\n']
+
+        # when
+        parser.parse_args(['load', '--window', '0'])
+
+        # then
+        self.assertFileContent(self.history_file, f'''
+- cmd: brew install fish
+  when: 1639436632
+- cmd: brew install fish
+  when: 1639436633
+''')
+
+    def test_should_load_commands_in_every_list_format(self, get_timestamp_mock, stdin_mock):
+        # given
+        get_timestamp_mock.return_value = 1639436633
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'kafka.topics', '--command', 'kafka-topics --list', '--tags', '#kafka'])
+
+        for fmt in ['json', 'jsonl', 'tsv', 'nul']:
+            with self.subTest(format=fmt):
+                with assert_stdout() as stdout:
+                    parser.parse_args(['list', '--format', fmt])
+                stdin_mock.__iter__.return_value = ['\n'.join(stdout.output) + '\n']
+
+                # when
+                parser.parse_args(['load', '--window', '0'])
+
+                # then
+                with open(self.history_file, 'r') as f:
+                    self.assertTrue(f.read().endswith('- cmd: kafka-topics --list\n  when: 1639436633\n'))
+
+    def test_should_load_text_listed_command_containing_tab(self, get_timestamp_mock, stdin_mock):
+        # given
+        get_timestamp_mock.return_value = 1639436633
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'awk_tsv', '--command', "awk -F'\t' '{print $1}' file.tsv"])
+        with assert_stdout() as stdout:
+            parser.parse_args(['list'])
+        stdin_mock.__iter__.return_value = ['\n'.join(stdout.output) + '\n']
+
+        # when
+        parser.parse_args(['load', '--window', '0'])
+
+        # then
+        with open(self.history_file, 'r') as f:
+            self.assertTrue(f.read().endswith("- cmd: awk -F'\t' '{print $1}' file.tsv\n  when: 1639436633\n"))
+
+    def test_should_load_commands_with_tags_without_reading_stdin(self, get_timestamp_mock, stdin_mock):
+        # given
+        get_timestamp_mock.return_value = 1639436633
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo dburl', '--tags', '#db,#mongo'])
+        parser.parse_args(['record', '--name', 'kafka', '--command', 'kafka-topics --list', '--tags', '#kafka'])
+        parser.parse_args(['record', '--name', 'psql', '--command', 'psql dburl', '--tags', '#db'])
+
+        # when
+        parser.parse_args(['load', '--tags', '#db'])
+
+        # then
+        stdin_mock.__iter__.assert_not_called()
+        self.assertFileContent(self.history_file, f'''
+- cmd: brew install fish
+  when: 1639436632
+- cmd: mongo dburl
+  when: 1639436633
+- cmd: psql dburl
+  when: 1639436633
+''')
+
+    def test_should_escape_multiline_commands_as_fish_does(self, get_timestamp_mock, stdin_mock):
+        # given
+        get_timestamp_mock.return_value = 1639436633
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'cleanup', '--command', 'echo a\\b\nrm -rf /tmp/x', '--tags', '#tmp'])
+
+        # when
+        parser.parse_args(['load', '--tags', '#tmp'])
+
+        # then
+        self.assertFileContent(self.history_file, f'''
+- cmd: brew install fish
+  when: 1639436632
+- cmd: echo a\\\\b\\nrm -rf /tmp/x
+  when: 1639436633
+''')
+
+    def test_should_skip_escaped_commands_already_in_recent_history(self, get_timestamp_mock, stdin_mock):
+        # given
+        get_timestamp_mock.return_value = 1639436633
+        with open(self.history_file, 'a') as f:
+            f.write('- cmd: grep -E \'a\\\\|b\' log\n  when: 1639436634\n')
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'grep', '--command', "grep -E 'a\\|b' log", '--tags', '#grep'])
+        parser.parse_args(['record', '--name', 'twice', '--command', 'echo a\necho b', '--tags', '#grep'])
+
+        # when
+        parser.parse_args(['load', '--tags', '#grep'])
+        parser.parse_args(['load', '--tags', '#grep'])
+
+        # then
+        self.assertFileContent(self.history_file, f'''
+- cmd: brew install fish
+  when: 1639436632
+- cmd: grep -E 'a\\\\|b' log
+  when: 1639436634
+- cmd: echo a\\necho b
+  when: 1639436633
+''')
@@ -1,11 +1,18 @@
 import os
 import shutil
+import subprocess
+import time
+from unittest import mock
 
 from command_reminder.cli import parser
 from command_reminder.config.config import REPOSITORIES_DIR_NAME, COMMANDS_FILE_NAME, FISH_FUNCTIONS_DIR_NAME, \
     EXTERNAL_REPOSITORIES_DIR_NAME, FISH_FUNCTIONS_PATH_ENV, MAIN_REPOSITORY_DIR_NAME
+from command_reminder.exceptions import RefreshFailedException
+from command_reminder.operations.helpers.git import GitRepositoryManager
 from tests.common import BaseTestCase, assert_stdout
-from tests.helpers import with_mocked_environment, TEST_TMP_DIR_PATH
+from tests.helpers import with_mocked_environment, TEST_TMP_DIR_PATH, create_bare_repository, \
+    commit_to_bare_repository, real_pull_changes_from_remote, real_clone_external_repo, real_refresh_external_repo, \
+    real_remote_head, real_local_head
 
 
 @with_mocked_environment
@@ -87,3 +94,160 @@ class PullExternalRepositoryTestCase(BaseTestCase):
             # then
             self.assertTrue(len(stdout.output), 1)
             self.assertOutputContains(stdout.output, 'external_command: some_external_command')
+
+
+@mock.patch.object(GitRepositoryManager, 'pull_changes_from_remote', real_pull_changes_from_remote)
+@mock.patch.object(GitRepositoryManager, 'clone_external_repo', real_clone_external_repo)
+@mock.patch.object(GitRepositoryManager, 'refresh_external_repo', real_refresh_external_repo)
+@mock.patch.object(GitRepositoryManager, 'remote_head', real_remote_head)
+@mock.patch.object(GitRepositoryManager, 'local_head', real_local_head)
+@with_mocked_environment
+class RefreshExternalRepositoriesTestCase(BaseTestCase):
+    def test_should_refresh_all_repositories_in_parallel(self):
+        # given
+        parser.parse_args(['init'])
+        ops_repo = create_bare_repository('ops', {'ops_command': ['ops', ['#ops']]})
+        db_repo = create_bare_repository('db', {'db_command': ['db', ['#db']]})
+        parser.parse_args(['pull', '--repo', ops_repo])
+        parser.parse_args(['pull', '--repo', db_repo])
+
+        # and
+        commit_to_bare_repository(ops_repo[len('file://'):], {'ops_command': ['ops', ['#ops']],
+                                                              'ops_new_command': ['ops new', ['#ops']]})
+
+        with assert_stdout() as stdout:
+            # when
+            parser.parse_args(['pull', '--update_all', '--jobs', '2'])
+
+            # then
+            self.assertOutputContains(stdout.output, f'{ops_repo}: updated')
+            self.assertOutputContains(stdout.output, f'{db_repo}: unchanged')
+
+        with assert_stdout() as stdout:
+            # when
+            parser.parse_args(['list'])
+
+            # then
+            self.assertEqual(len(stdout.output), 3)
+            self.assertOutputContains(stdout.output, 'ops_new_command: ops new')
+
+    def test_should_skip_repositories_whose_remote_did_not_move(self):
+        # given
+        parser.parse_args(['init'])
+        ops_repo = create_bare_repository('ops', {'ops_command': ['ops', ['#ops']]})
+        parser.parse_args(['pull', '--repo', ops_repo])
+
+        with assert_stdout() as stdout, \
+                mock.patch.object(GitRepositoryManager, 'refresh_external_repo') as refresh_mock:
+            # when
+            parser.parse_args(['pull', '--update_all'])
+
+            # then
+            self.assertEqual(stdout.output, [f'{ops_repo}: unchanged'])
+            refresh_mock.assert_not_called()
+
+    def test_should_refresh_remaining_repositories_when_one_fails(self):
+        # given
+        parser.parse_args(['init'])
+        ops_repo = create_bare_repository('ops', {'ops_command': ['ops', ['#ops']]})
+        db_repo = create_bare_repository('db', {'db_command': ['db', ['#db']]})
+        parser.parse_args(['pull', '--repo', ops_repo])
+        parser.parse_args(['pull', '--repo', db_repo])
+
+        # and
+        shutil.rmtree(ops_repo[len('file://'):])
+        commit_to_bare_repository(db_repo[len('file://'):], {'db_new_command': ['db new', ['#db']]})
+
+        with assert_stdout() as stdout:
+            # when
+            with self.assertRaisesRegex(RefreshFailedException, 'Failed to refresh 1 of 2 external repositories'):
+                parser.parse_args(['pull', '--update_all'])
+
+            # then
+            self.assertOutputContains(stdout.output, f'{ops_repo}: failed')
+            self.assertOutputContains(stdout.output, f'{db_repo}: updated')
+
+        with assert_stdout() as stdout:
+            # when
+            parser.parse_args(['list'])
+
+            # then
+            self.assertOutputContains(stdout.output, 'db_new_command: db new')
+
+    def test_should_give_up_repository_once_its_timeout_is_spent(self):
+        # given
+        parser.parse_args(['init'])
+        ops_repo = create_bare_repository('ops', {'ops_command': ['ops', ['#ops']]})
+        parser.parse_args(['pull', '--repo', ops_repo])
+
+        def slow_remote_head(_, directory, timeout=None):
+            time.sleep(0.3)
+            return 'moved'
+
+        with assert_stdout() as stdout, \
+                mock.patch.object(GitRepositoryManager, 'remote_head', slow_remote_head), \
+                mock.patch.object(GitRepositoryManager, 'refresh_external_repo') as refresh_mock:
+            # when
+            with self.assertRaises(RefreshFailedException):
+                parser.parse_args(['pull', '--update_all', '--timeout', '0.2'])
+
+            # then
+            self.assertEqual(stdout.output, [f'{ops_repo}: failed (timed out after 0.2s)'])
+            refresh_mock.assert_not_called()
+
+    def test_should_report_repository_failing_to_run_git(self):
+        # given
+        parser.parse_args(['init'])
+        ops_repo = create_bare_repository('ops', {'ops_command': ['ops', ['#ops']]})
+        db_repo = create_bare_repository('db', {'db_command': ['db', ['#db']]})
+        parser.parse_args(['pull', '--repo', ops_repo])
+        parser.parse_args(['pull', '--repo', db_repo])
+        commit_to_bare_repository(db_repo[len('file://'):], {'db_new_command': ['db new', ['#db']]})
+
+        def remote_head(manager, directory, timeout=None):
+            if directory.endswith('team_ops'):
+                raise FileNotFoundError(2, 'No such file or directory', 'git')
+            return real_remote_head(directory, timeout)
+
+        with assert_stdout() as stdout, mock.patch.object(GitRepositoryManager, 'remote_head', remote_head):
+            # when
+            with self.assertRaisesRegex(RefreshFailedException, 'Failed to refresh 1 of 2 external repositories'):
+                parser.parse_args(['pull', '--update_all'])
+
+            # then
+            self.assertOutputContains(stdout.output, f'{ops_repo}: failed ([Errno 2] No such file or directory')
+            self.assertOutputContains(stdout.output, f'{db_repo}: updated')
+
+    def test_should_clone_only_latest_commands_and_fish_functions(self):
+        # given
+        parser.parse_args(['init'])
+        ops_repo = create_bare_repository('ops', {'ops_command': ['ops', ['#ops']]}, {'README.md': 'ops commands'})
+        commit_to_bare_repository(ops_repo[len('file://'):], {'ops_command': ['ops', ['#ops']],
+                                                              'ops_new_command': ['ops new', ['#ops']]})
+
+        # when
+        parser.parse_args(['pull', '--repo', ops_repo])
+
+        # then
+        external_dir = os.path.join(TEST_TMP_DIR_PATH, REPOSITORIES_DIR_NAME, EXTERNAL_REPOSITORIES_DIR_NAME,
+                                    'team_ops')
+        self.assertEqual(sorted(f for f in os.listdir(external_dir) if f != '.git'),
+                         [COMMANDS_FILE_NAME, FISH_FUNCTIONS_DIR_NAME])
+        self.assertEqual(self._commits(external_dir), 1)
+
+        # when
+        commit_to_bare_repository(ops_repo[len('file://'):], {'ops_command': ['ops', ['#ops']]})
+        with assert_stdout():
+            parser.parse_args(['pull', '--update_all'])
+
+        # then
+        self.assertEqual(self._commits(external_dir), 2)
+        with assert_stdout() as stdout:
+            parser.parse_args(['list'])
+            self.assertEqual(stdout.output, ['ops_command: ops'])
+
+    @staticmethod
+    def _commits(directory: str) -> int:
+        result = subprocess.run(['git', 'rev-list', '--count', 'HEAD'], cwd=directory, check=True,
+                                capture_output=True, text=True)
+        return int(result.stdout)
@@ -1,22 +1,29 @@
 import os
+import subprocess
 from unittest import mock
 from unittest.mock import call
 
 from command_reminder.exceptions import InvalidArgumentException
 
-from command_reminder.config.config import REPOSITORIES_DIR_NAME, MAIN_REPOSITORY_DIR_NAME
+from command_reminder.config.config import REPOSITORIES_DIR_NAME, MAIN_REPOSITORY_DIR_NAME, COMMANDS_FILE_NAME, \
+    COMMAND_STORE_ENV
 
 from command_reminder.cli import parser
-from tests.common import BaseTestCase
-from tests.helpers import with_mocked_environment, TEST_TMP_DIR_PATH
+from command_reminder.operations.helpers.git import GitRepositoryManager
+from tests.common import BaseTestCase, assert_stdout
+from tests.helpers import with_mocked_environment, TEST_TMP_DIR_PATH, create_bare_repository, \
+    commit_to_bare_repository, real_pull_changes_from_remote, real_remote_head, real_local_head, \
+    GIT_TEST_ENVIRONMENT
 
 
 @with_mocked_environment
 class PullExternalRepositoryTestCase(BaseTestCase):
-    @mock.patch('command_reminder.cli.initializer.GitRepositoryManager')
+    @mock.patch('command_reminder.operations.helpers.git.GitRepositoryManager')
     def test_should_push_command(self, git_mock):
         # given
         parser.parse_args(['init', '--repo', 'https://github.com/faderskd/common-commands'])
+        git_mock().changed_paths.return_value = [COMMANDS_FILE_NAME]
+        git_mock().file_at_head.return_value = None
 
         # when
         parser.parse_args(['push'])
@@ -32,3 +39,107 @@ class PullExternalRepositoryTestCase(BaseTestCase):
         with self.assertRaisesRegex(InvalidArgumentException, 'is not a git repo'):
             # when
             parser.parse_args(['push'])
+
+
+@mock.patch.dict('os.environ', GIT_TEST_ENVIRONMENT)
+@mock.patch.object(GitRepositoryManager, 'pull_changes_from_remote', real_pull_changes_from_remote)
+@mock.patch.object(GitRepositoryManager, 'remote_head', real_remote_head)
+@mock.patch.object(GitRepositoryManager, 'local_head', real_local_head)
+@with_mocked_environment
+class ChangeAwarePushTestCase(BaseTestCase):
+    def test_should_commit_changed_commands_with_summary(self):
+        # given
+        remote = self._init_with_remote({'old_command': ['old', []], 'kept_command': ['kept', []]})
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo dburl'])
+        parser.parse_args(['rm', '--command', 'old_command'])
+
+        # when
+        parser.parse_args(['push'])
+
+        # then
+        self.assertEqual(self._git(remote, 'log', '-1', '--format=%s'), 'Add mongo; Remove old_command')
+        self.assertIn('fish/mongo.fish', self._git(remote, 'show', '--name-only', '--format=', 'HEAD'))
+
+    @mock.patch.dict('os.environ', {COMMAND_STORE_ENV: 'sqlite'})
+    def test_should_export_sqlite_store_before_committing(self):
+        # given
+        remote = self._init_with_remote({'old_command': ['old', []]})
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo dburl'])
+
+        # when
+        parser.parse_args(['push'])
+
+        # then
+        self.assertEqual(self._git(remote, 'log', '-1', '--format=%s'), 'Add mongo')
+        self.assertIn('"mongo"', self._git(remote, 'show', f'main:{COMMANDS_FILE_NAME}'))
+
+    def test_should_commit_renamed_files(self):
+        # given
+        remote = self._init_with_remote({'old_command': ['old', []]})
+        main_dir = os.path.join(TEST_TMP_DIR_PATH, REPOSITORIES_DIR_NAME, MAIN_REPOSITORY_DIR_NAME)
+        self._git(main_dir, 'mv', 'fish/old_command.fish', 'fish/renamed_command.fish')
+
+        # when
+        parser.parse_args(['push'])
+
+        # then
+        pushed_files = self._git(remote, 'ls-tree', '--name-only', 'main', 'fish/').splitlines()
+        self.assertIn('fish/renamed_command.fish', pushed_files)
+        self.assertNotIn('fish/old_command.fish', pushed_files)
+
+    def test_should_do_nothing_when_nothing_changed(self):
+        # given
+        remote = self._init_with_remote({'kept_command': ['kept', []]})
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo dburl'])
+        parser.parse_args(['push'])
+        pushed_head = self._git(remote, 'rev-parse', 'main')
+
+        with assert_stdout() as stdout, mock.patch.object(GitRepositoryManager, 'remote_moved') as remote_moved_mock:
+            # when
+            parser.parse_args(['push'])
+
+            # then
+            self.assertEqual(stdout.output, ['Nothing to push.'])
+            remote_moved_mock.assert_not_called()
+        self.assertEqual(self._git(remote, 'rev-parse', 'main'), pushed_head)
+
+    def test_should_pull_before_pushing_when_remote_moved(self):
+        # given
+        remote = self._init_with_remote({'kept_command': ['kept', []]})
+        commit_to_bare_repository(remote, {'kept_command': ['kept', []]}, {'README.md': 'team commands'})
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo dburl'])
+
+        # when
+        with mock.patch.object(GitRepositoryManager, 'pull_changes_from_remote',
+                               wraps=GitRepositoryManager.pull_changes_from_remote) as pull_mock:
+            parser.parse_args(['push'])
+
+        # then
+        pull_mock.assert_called_once()
+        self.assertIn('Add mongo', self._git(remote, 'log', '-2', '--format=%s'))
+        self.assertIn('README.md', self._git(remote, 'ls-tree', '--name-only', 'main'))
+
+    def test_should_push_without_pull_when_remote_did_not_move(self):
+        # given
+        remote = self._init_with_remote({'kept_command': ['kept', []]})
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo dburl'])
+
+        # when
+        with mock.patch.object(GitRepositoryManager, 'pull_changes_from_remote') as pull_mock:
+            parser.parse_args(['push'])
+
+        # then
+        pull_mock.assert_not_called()
+        self.assertEqual(self._git(remote, 'log', '-1', '--format=%s'), 'Add mongo')
+
+    @staticmethod
+    def _init_with_remote(commands: dict) -> str:
+        remote_url = create_bare_repository('main', commands)
+        with assert_stdout():
+            parser.parse_args(['init', '--repo', remote_url])
+        return remote_url[len('file://'):]
+
+    @staticmethod
+    def _git(directory: str, *args: str) -> str:
+        return subprocess.run(['git', *args], cwd=directory, check=True, capture_output=True,
+                              text=True).stdout.strip()
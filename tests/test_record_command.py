@@ -3,8 +3,9 @@ import os
 from command_reminder.cli import parser
 from command_reminder.config.config import COMMAND_REMINDER_DIR_ENV, REPOSITORIES_DIR_NAME, \
     MAIN_REPOSITORY_DIR_NAME, COMMANDS_FILE_NAME, FISH_FUNCTIONS_DIR_NAME
+from command_reminder.exceptions import InvalidArgumentException
 from tests.common import BaseTestCase, assert_stdout
-from tests.helpers import with_mocked_environment
+from tests.helpers import with_mocked_environment, TEST_TMP_DIR_PATH
 
 
 @with_mocked_environment
@@ -45,3 +46,67 @@ class RecordTestCase(BaseTestCase):
 function mongo_login
     set color blue; echo 'mongo dburl/dbname --username abc --password pass'
 end''')
+
+    def test_should_import_commands_from_jsonl_file(self):
+        # given
+        parser.parse_args(['init'])
+        records_file = self._write_records_file('commands.jsonl', '''
+{"name": "mongo login", "command": "mongo dburl", "tags": ["#mongo", "#onduty"]}
+{"name": "kafka-topics", "command": "kafka-topics --list", "tags": "#kafka #onduty"}
+''')
+
+        # when
+        parser.parse_args(['record', '--from-file', records_file])
+
+        # then
+        with assert_stdout() as stdout:
+            parser.parse_args(['list', '--tags', '#onduty'])
+            self.assertEqual(stdout.output, ['mongo_login: mongo dburl', 'kafka_topics: kafka-topics --list'])
+
+        # and
+        self.assertTrue(os.path.exists(os.path.join(os.environ[COMMAND_REMINDER_DIR_ENV], REPOSITORIES_DIR_NAME,
+                                                    MAIN_REPOSITORY_DIR_NAME, FISH_FUNCTIONS_DIR_NAME,
+                                                    'kafka_topics.fish')))
+
+    def test_should_import_commands_from_tsv_and_yaml_files(self):
+        # given
+        parser.parse_args(['init'])
+        tsv_file = self._write_records_file('commands.tsv', 'mongo\tmongo dburl\t#mongo\nls\tls -la\n')
+        yaml_file = self._write_records_file('commands.yml', '''
+- name: kafka
+  command: kafka-topics --list
+  tags: ['#kafka']
+''')
+
+        # when
+        parser.parse_args(['record', '--from-file', tsv_file])
+        parser.parse_args(['record', '--from-file', yaml_file])
+
+        # then
+        with assert_stdout() as stdout:
+            parser.parse_args(['list'])
+            self.assertEqual(stdout.output, ['mongo: mongo dburl', 'ls: ls -la', 'kafka: kafka-topics --list'])
+
+    def test_should_not_import_anything_when_some_records_are_invalid(self):
+        # given
+        parser.parse_args(['init'])
+        records_file = self._write_records_file('commands.jsonl', '''
+{"name": "mongo", "command": "mongo dburl"}
+{"name": "kafka"}
+''')
+
+        # expect
+        with self.assertRaisesRegex(InvalidArgumentException, 'line 3: command must be a non empty string'):
+            parser.parse_args(['record', '--from-file', records_file])
+
+        # and
+        with assert_stdout() as stdout:
+            parser.parse_args(['list'])
+            self.assertEqual(len(stdout.output), 0)
+
+    @staticmethod
+    def _write_records_file(name: str, content: str) -> str:
+        path = os.path.join(TEST_TMP_DIR_PATH, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
@@ -0,0 +1,72 @@
+from unittest import mock
+
+from command_reminder.cli import parser
+from command_reminder.operations.helpers.search_index import SearchIndex
+from tests.common import BaseTestCase, assert_stdout
+from tests.helpers import with_mocked_environment, make_old, MAIN_COMMANDS_FILE, MAIN_JOURNAL_FILE
+
+
+@with_mocked_environment
+class SearchCommandsTestCase(BaseTestCase):
+    def _given_commands(self):
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'restart', '--command', 'kubectl rollout restart deployment/app'])
+        parser.parse_args(['record', '--name', 'rollout', '--command', 'kubectl rollout status deployment/app'])
+        parser.parse_args(['record', '--name', 'pods', '--command', 'kubectl get pods'])
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo dburl'])
+
+    def test_should_rank_name_matches_above_command_matches(self):
+        # given
+        self._given_commands()
+
+        with assert_stdout() as stdout:
+            # when
+            parser.parse_args(['search', 'rollout'])
+
+            # then
+            self.assertEqual(stdout.output, ['rollout: kubectl rollout status deployment/app',
+                                             'restart: kubectl rollout restart deployment/app'])
+
+    def test_should_find_commands_by_fragment_with_typos(self):
+        # given
+        self._given_commands()
+
+        with assert_stdout() as stdout:
+            # when
+            parser.parse_args(['search', 'kubctl', 'rolout', '--limit', '1'])
+
+            # then
+            self.assertEqual(len(stdout.output), 1)
+            self.assertOutputContains(stdout.output, 'kubectl rollout')
+
+        with assert_stdout() as stdout:
+            # when
+            parser.parse_args(['search', 'mo'])
+
+            # then
+            self.assertEqual(stdout.output, ['mongo: mongo dburl'])
+
+    def test_should_rebuild_trigrams_only_when_repository_changed(self):
+        # given
+        self._given_commands()
+        make_old(MAIN_COMMANDS_FILE)
+        make_old(MAIN_JOURNAL_FILE)
+        with assert_stdout():
+            parser.parse_args(['search', 'pods'])
+
+        with mock.patch.object(SearchIndex, '_build_postings', autospec=True,
+                               side_effect=SearchIndex._build_postings) as build_mock, assert_stdout() as stdout:
+            # when
+            parser.parse_args(['search', 'pods'])
+
+            # then
+            build_mock.assert_not_called()
+            self.assertEqual(stdout.output, ['pods: kubectl get pods'])
+
+        # when
+        parser.parse_args(['record', '--name', 'all_pods', '--command', 'kubectl get pods -A'])
+
+        # then
+        with assert_stdout() as stdout:
+            parser.parse_args(['search', 'get pods'])
+            self.assertEqual(stdout.output, ['pods: kubectl get pods', 'all_pods: kubectl get pods -A'])
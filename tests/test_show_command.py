@@ -0,0 +1,84 @@
+import os
+from unittest import mock
+
+from command_reminder.cli import parser
+from command_reminder.config.config import COMMANDS_FILE_NAME
+from command_reminder.exceptions import InvalidArgumentException
+from command_reminder.operations.helpers.name_index import NameIndex
+from tests.common import BaseTestCase, assert_stdout
+from tests.helpers import with_mocked_environment, TEST_TMP_DIR_PATH, make_old, MAIN_COMMANDS_FILE, \
+    MAIN_JOURNAL_FILE, EXTERNAL_REPO_DIR
+
+
+@with_mocked_environment
+class ShowCommandTestCase(BaseTestCase):
+    def _given_main_and_external_repository(self):
+        parser.parse_args(['init'])
+        parser.parse_args(['pull', '--repo', 'https://github.com/faderskd/common-commands'])
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo dburl'])
+
+    def test_should_show_command_from_any_repository(self):
+        # given
+        self._given_main_and_external_repository()
+
+        with assert_stdout() as stdout:
+            # when
+            parser.parse_args(['show', 'mongo'])
+            parser.parse_args(['show', 'external_command'])
+
+            # then
+            self.assertEqual(stdout.output, ['mongo dburl', 'some_external_command'])
+
+    def test_should_prefer_main_repository_unless_repository_given(self):
+        # given
+        self._given_main_and_external_repository()
+        parser.parse_args(['record', '--name', 'external_command', '--command', 'my_command'])
+
+        with assert_stdout() as stdout:
+            # when
+            parser.parse_args(['show', 'external_command'])
+            parser.parse_args(['show', 'external_command', '--repo', os.path.basename(EXTERNAL_REPO_DIR)])
+
+            # then
+            self.assertEqual(stdout.output, ['my_command', 'some_external_command'])
+
+        # expect
+        with self.assertRaisesRegex(InvalidArgumentException, 'Command mongo does not exist in repository'):
+            parser.parse_args(['show', 'mongo', '--repo', os.path.basename(EXTERNAL_REPO_DIR)])
+        with self.assertRaisesRegex(InvalidArgumentException, 'Command missing does not exist.'):
+            parser.parse_args(['show', 'missing'])
+
+    def test_should_not_rebuild_names_when_nothing_changed(self):
+        # given
+        self._given_main_and_external_repository()
+        make_old(MAIN_COMMANDS_FILE)
+        make_old(MAIN_JOURNAL_FILE)
+        make_old(os.path.join(EXTERNAL_REPO_DIR, COMMANDS_FILE_NAME))
+        with assert_stdout():
+            parser.parse_args(['show', 'mongo'])
+
+        with mock.patch.object(NameIndex, '_build_names') as build_mock, assert_stdout() as stdout:
+            # when
+            parser.parse_args(['show', 'external_command'])
+
+            # then
+            build_mock.assert_not_called()
+            self.assertEqual(stdout.output, ['some_external_command'])
+
+    def test_should_run_command(self):
+        # given
+        parser.parse_args(['init'])
+        output_file = os.path.join(TEST_TMP_DIR_PATH, 'run_output')
+        parser.parse_args(['record', '--name', 'greet', '--command', f'echo hello > {output_file}'])
+        parser.parse_args(['record', '--name', 'fail', '--command', 'exit 3'])
+
+        # when
+        parser.parse_args(['run', 'greet'])
+
+        # then
+        self.assertFileContent(output_file, 'hello\n')
+
+        # expect
+        with self.assertRaises(SystemExit) as exit_context:
+            parser.parse_args(['run', 'fail'])
+        self.assertEqual(exit_context.exception.code, 3)
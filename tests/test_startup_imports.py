@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+
+from command_reminder.cli import parser
+from tests.common import BaseTestCase
+from tests.helpers import with_mocked_environment
+
+IMPORTS_CHECK_SCRIPT = '''
+import sys
+from command_reminder.cli import parser
+parser.parse_args(sys.argv[1:])
+heavy_modules = [m for m in ('yaml', 'giturlparse') if m in sys.modules]
+if heavy_modules:
+    sys.exit('Imported on startup: ' + ', '.join(heavy_modules))
+'''
+
+
+@with_mocked_environment
+class StartupImportsTestCase(BaseTestCase):
+    def test_list_should_not_import_heavy_modules(self):
+        # given
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo', '--tags', '#mongo'])
+
+        # expect
+        self._assert_no_heavy_imports(['list'])
+        self._assert_no_heavy_imports(['list', '--tags', '#mongo'])
+
+    def test_tags_should_not_import_heavy_modules(self):
+        # given
+        parser.parse_args(['init'])
+
+        # expect
+        self._assert_no_heavy_imports(['tags'])
+
+    def _assert_no_heavy_imports(self, args):
+        result = subprocess.run([sys.executable, '-c', IMPORTS_CHECK_SCRIPT, *args], env=dict(os.environ),
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
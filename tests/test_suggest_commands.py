@@ -0,0 +1,83 @@
+from command_reminder.cli import parser
+from command_reminder.operations.helpers.fish_history import CommandFrequencies, read_history
+from tests.common import BaseTestCase, assert_stdout
+from tests.helpers import with_mocked_environment
+
+
+@with_mocked_environment
+class SuggestCommandsTestCase(BaseTestCase):
+    def test_should_suggest_frequent_unrecorded_commands(self):
+        # given
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'pods', '--command', 'kubectl get pods -n prod'])
+        self._append_history(['kubectl get pods -n prod'] * 5 + ['git log --oneline --graph'] * 4 +
+                             ['docker ps -a --no-trunc'] * 3 + ['terraform plan'] * 2 + ['pods'] * 6)
+
+        with assert_stdout() as stdout:
+            # when
+            parser.parse_args(['suggest'])
+
+            # then
+            self.assertEqual(len(stdout.output), 2)
+            self.assertIn('git_log_oneline: git log --oneline --graph (used 4 times)', stdout.output[0])
+            self.assertIn('docker_ps_a: docker ps -a --no-trunc (used 3 times)', stdout.output[1])
+
+    def test_should_limit_suggestions(self):
+        # given
+        parser.parse_args(['init'])
+        self._append_history(['git log --oneline --graph'] * 4 + ['docker ps -a --no-trunc'] * 3)
+
+        with assert_stdout() as stdout:
+            # when
+            parser.parse_args(['suggest', '--limit', '1', '--min-count', '1'])
+
+            # then
+            self.assertEqual(len(stdout.output), 1)
+            self.assertOutputContains(stdout.output, 'git log --oneline --graph')
+
+    def test_should_suggest_unique_names(self):
+        # given
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'git_log_oneline', '--command', 'git log --oneline'])
+        self._append_history(['git log --oneline --graph'] * 3)
+
+        with assert_stdout() as stdout:
+            # when
+            parser.parse_args(['suggest'])
+
+            # then
+            self.assertOutputContains(stdout.output, 'git_log_oneline_2: git log --oneline --graph')
+
+    def test_should_read_escaped_multiline_commands(self):
+        # given
+        with open(self.history_file, 'a') as f:
+            f.write('- cmd: for f in *\\n  echo \\\\$f\\nend\n  when: 1639436640\n  paths:\n    - *\n'
+                    '- cmd: ls\n')
+
+        # when
+        items = list(read_history(self.history_file))
+
+        # then
+        self.assertEqual([(i.command, i.when) for i in items],
+                         [('brew install fish', 1639436632), ('for f in *\n  echo \\$f\nend', 1639436640), ('ls', 0)])
+
+    def test_should_keep_most_frequent_commands_in_bounded_table(self):
+        # given
+        frequencies = CommandFrequencies(capacity=3)
+
+        # when
+        for i in range(100):
+            frequencies.add('frequent', i)
+            frequencies.add(f'rare {i}', i)
+
+        # then
+        most_frequent = frequencies.most_frequent()
+        self.assertEqual(len(most_frequent), 3)
+        self.assertEqual(most_frequent[0].command, 'frequent')
+        self.assertEqual(most_frequent[0].count, 100)
+        self.assertEqual(most_frequent[0].last_used, 99)
+
+    def _append_history(self, commands):
+        with open(self.history_file, 'a') as f:
+            for (i, c) in enumerate(commands):
+                f.write(f'- cmd: {c}\n  when: {1639436700 + i}\n')
@@ -0,0 +1,62 @@
+import io
+import json
+import os
+import time
+from contextlib import redirect_stderr
+from unittest import mock
+
+from command_reminder import tracing
+from command_reminder.cli import parser
+from tests.common import BaseTestCase, assert_stdout
+from tests.helpers import with_mocked_environment, TEST_TMP_DIR_PATH
+
+
+@with_mocked_environment
+class TimingsTestCase(BaseTestCase):
+    def test_should_print_timings_breakdown_to_stderr(self):
+        # given
+        parser.parse_args(['init'])
+        parser.parse_args(['record', '--name', 'mongo', '--command', 'mongo', '--tags', '#mongo'])
+        stderr = io.StringIO()
+
+        with assert_stdout() as stdout, redirect_stderr(stderr):
+            # when
+            parser.parse_args(['--timings', 'list'], started_at=time.perf_counter())
+
+        # then
+        self.assertOutputContains(stdout.output, 'mongo: mongo')
+        breakdown = stderr.getvalue()
+        self.assertIn('cr timings:', breakdown)
+        for step in ('imports', 'app_context', 'process.list', 'index.list_repo_directories', 'index.read_shard',
+                     'list.search_and_print'):
+            self.assertIn(step, breakdown)
+
+    def test_should_append_spans_to_trace_file(self):
+        # given
+        trace_file = os.path.join(TEST_TMP_DIR_PATH, 'trace.jsonl')
+        parser.parse_args(['init'])
+
+        # when
+        with mock.patch.dict('os.environ', {tracing.TRACE_FILE_ENV: trace_file}), assert_stdout():
+            parser.parse_args(['tags'])
+            parser.parse_args(['tags'])
+
+        # then
+        with open(trace_file, 'r') as f:
+            spans = [json.loads(line) for line in f]
+        names = [s['name'] for s in spans]
+        self.assertEqual(names.count('process.tags'), 2)
+        self.assertNotIn('imports', names)
+        process_span = spans[names.index('process.tags')]
+        self.assertEqual(process_span['depth'], 0)
+        self.assertGreaterEqual(process_span['duration_ms'], 0)
+        self.assertEqual(spans[names.index('tags.print')]['depth'], 1)
+
+    def test_should_not_trace_when_disabled(self):
+        # when
+        with assert_stdout():
+            parser.parse_args(['init'])
+
+        # then
+        self.assertFalse(tracing.tracer.enabled)
+        self.assertIs(tracing.span('index.read_shard'), tracing.span('list.print'))